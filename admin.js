@@ -236,91 +236,106 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
 
-  function renderAdminApplicationsSection() {
-    const container = document.getElementById('admin-applications-section');
-    container.innerHTML = `<h2>Printer Applications</h2>
-      <button id="toggle-history-btn" class="cta-button" style="margin-bottom:12px;">Show Application History</button>
-      <div id="admin-applications-list"><div class="loading">Loading applications...</div></div>
-      <div id="admin-applications-history" style="display:none; max-height:350px; overflow-y:auto; margin-top:18px;"></div>`;
-    fetch('/api/admin/applications')
+  // Fields the application cards show; full printer specs are never fetched for the list
+  const APPLICATION_LIST_FIELDS = 'name,email,status,materials,colors,bio,printerCount,submittedAt,createdAt';
+  const APPLICATIONS_PAGE_SIZE = 20;
+
+  // Helper to format Firestore timestamp or ISO string
+  function formatDate(val) {
+    if (!val) return '';
+    if (typeof val === 'string') return new Date(val).toLocaleString();
+    if (val.seconds) return new Date(val.seconds * 1000).toLocaleString();
+    return '';
+  }
+
+  function renderApplicationCard(app) {
+    const status = (app.status || 'pending').toLowerCase();
+    const printerCount = app.printerCount != null ? app.printerCount : (app.printers ? app.printers.length : null);
+    return `
+      <div class="application-card ${status}">
+        <div class="app-row"><span class="app-label">Date:</span> <span class="app-value">${formatDate(app.submittedAt || app.createdAt)}</span></div>
+        <div class="app-row"><span class="app-label">Name:</span> <span class="app-value">${app.name || ''}</span></div>
+        <div class="app-row"><span class="app-label">Email:</span> <span class="app-value">${app.email || ''}</span></div>
+        <div class="app-row"><span class="app-label">Status:</span> <span class="app-value"><span class="app-status ${status}">${app.status || 'pending'}</span></span></div>
+        <div class="app-row"><span class="app-label">Materials:</span> <span class="app-value">${app.materials || ''}</span></div>
+        <div class="app-row"><span class="app-label">Colors:</span> <span class="app-value">${app.colors || ''}</span></div>
+        <div class="app-row"><span class="app-label">Experience:</span> <span class="app-value">${app.bio || ''}</span></div>
+        <div class="app-row"><span class="app-label">Printers:</span> <span class="app-value">${printerCount != null ? printerCount + ' printers' : ''}</span></div>
+        <div class="app-row app-actions">
+          <button class="accept-btn" onclick="acceptApplication('${app.id}')">Accept</button>
+          <button class="deny-btn" onclick="denyApplication('${app.id}')">Deny</button>
+          <button class="deny-btn" onclick="deleteApplication('${app.id}')">Delete</button>
+        </div>
+      </div>
+    `;
+  }
+
+  // Loads one page of applications with the given status filter into a container,
+  // appending a "Load more" button while the server reports a next page
+  function loadApplicationsPage(container, status, emptyMessage, cursor) {
+    const params = new URLSearchParams({ status, limit: APPLICATIONS_PAGE_SIZE, fields: APPLICATION_LIST_FIELDS });
+    if (cursor) params.set('startAfter', cursor);
+    const oldButton = container.querySelector('.load-more-btn');
+    if (oldButton) oldButton.remove();
+
+    return fetch(`/api/admin/applications?${params}`)
       .then(res => {
         if (!res.ok) { console.error('Failed to fetch applications:', res.status, res.statusText); }
         return res.json();
       })
-      .then(apps => {
-        const list = document.getElementById('admin-applications-list');
-        const history = document.getElementById('admin-applications-history');
-        if (!Array.isArray(apps) || apps.length === 0) {
-          list.innerHTML = '<div class="empty">No applications found.</div>';
-          history.innerHTML = '';
+      .then(page => {
+        if (!cursor) container.innerHTML = '';
+        const apps = (page && page.applications) || [];
+        if (!cursor && apps.length === 0) {
+          container.innerHTML = `<div class="empty">${emptyMessage}</div>`;
           return;
         }
-        // Helper to format Firestore timestamp or ISO string
-        function formatDate(val) {
-          if (!val) return '';
-          if (typeof val === 'string') return new Date(val).toLocaleString();
-          if (val.seconds) return new Date(val.seconds * 1000).toLocaleString();
-          return '';
+        container.insertAdjacentHTML('beforeend', apps.map(renderApplicationCard).join(''));
+        if (page.nextCursor) {
+          const button = document.createElement('button');
+          button.className = 'cta-button load-more-btn';
+          button.textContent = 'Load more';
+          button.onclick = () => loadApplicationsPage(container, status, emptyMessage, page.nextCursor);
+          container.appendChild(button);
         }
-        // Pending applications
-        const pendingApps = apps.filter(app => (app.status || 'pending').toLowerCase() === 'pending');
-        // History (accepted/denied)
-        const historyApps = apps.filter(app => ['accepted','denied'].includes((app.status||'pending').toLowerCase()));
-        list.innerHTML = pendingApps.length === 0 ? '<div class="empty">No pending applications.</div>' : pendingApps.map(app => {
-          const status = (app.status || 'pending').toLowerCase();
-          return `
-            <div class="application-card ${status}">
-              <div class="app-row"><span class="app-label">Date:</span> <span class="app-value">${formatDate(app.createdAt)}</span></div>
-              <div class="app-row"><span class="app-label">Name:</span> <span class="app-value">${app.name || ''}</span></div>
-              <div class="app-row"><span class="app-label">Email:</span> <span class="app-value">${app.email || ''}</span></div>
-              <div class="app-row"><span class="app-label">Status:</span> <span class="app-value"><span class="app-status ${status}">${app.status || 'pending'}</span></span></div>
-              <div class="app-row"><span class="app-label">Materials:</span> <span class="app-value">${app.materials || ''}</span></div>
-              <div class="app-row"><span class="app-label">Colors:</span> <span class="app-value">${app.colors || ''}</span></div>
-              <div class="app-row"><span class="app-label">Experience:</span> <span class="app-value">${app.bio || ''}</span></div>
-              <div class="app-row"><span class="app-label">Printers:</span> <span class="app-value">${app.printers ? app.printers.length + ' printers' : ''}</span></div>
-              <div class="app-row app-actions">
-                <button class="accept-btn" onclick="acceptApplication('${app.id}')">Accept</button>
-                <button class="deny-btn" onclick="denyApplication('${app.id}')">Deny</button>
-                <button class="deny-btn" onclick="deleteApplication('${app.id}')">Delete</button>
-              </div>
-            </div>
-          `;
-        }).join('');
-        history.innerHTML = historyApps.length === 0 ? '<div class="empty">No application history.</div>' : historyApps.map(app => {
-          const status = (app.status || 'pending').toLowerCase();
-          return `
-            <div class="application-card ${status}">
-              <div class="app-row"><span class="app-label">Date:</span> <span class="app-value">${formatDate(app.createdAt)}</span></div>
-              <div class="app-row"><span class="app-label">Name:</span> <span class="app-value">${app.name || ''}</span></div>
-              <div class="app-row"><span class="app-label">Email:</span> <span class="app-value">${app.email || ''}</span></div>
-              <div class="app-row"><span class="app-label">Status:</span> <span class="app-value"><span class="app-status ${status}">${app.status || 'pending'}</span></span></div>
-              <div class="app-row"><span class="app-label">Materials:</span> <span class="app-value">${app.materials || ''}</span></div>
-              <div class="app-row"><span class="app-label">Colors:</span> <span class="app-value">${app.colors || ''}</span></div>
-              <div class="app-row"><span class="app-label">Experience:</span> <span class="app-value">${app.bio || ''}</span></div>
-              <div class="app-row"><span class="app-label">Printers:</span> <span class="app-value">${app.printers ? app.printers.length + ' printers' : ''}</span></div>
-              <div class="app-row app-actions">
-                <button class="accept-btn" onclick="acceptApplication('${app.id}')">Accept</button>
-                <button class="deny-btn" onclick="denyApplication('${app.id}')">Deny</button>
-                <button class="deny-btn" onclick="deleteApplication('${app.id}')">Delete</button>
-              </div>
-            </div>
-          `;
-        }).join('');
-        // Toggle logic
-        const toggleBtn = document.getElementById('toggle-history-btn');
-        toggleBtn.onclick = function() {
-          if (history.style.display === 'none') {
-            history.style.display = 'block';
-            toggleBtn.textContent = 'Hide Application History';
-          } else {
-            history.style.display = 'none';
-            toggleBtn.textContent = 'Show Application History';
-          }
-        };
-      })
+      });
+  }
+
+  function renderAdminApplicationsSection() {
+    const container = document.getElementById('admin-applications-section');
+    container.innerHTML = `<h2>Printer Applications</h2>
+      <button id="toggle-history-btn" class="cta-button" style="margin-bottom:12px;">Show Application History</button>
+      <div id="admin-applications-list"><div class="loading">Loading applications...</div></div>
+      <div id="admin-applications-history" style="display:none; max-height:350px; overflow-y:auto; margin-top:18px;"></div>`;
+    const list = document.getElementById('admin-applications-list');
+    const history = document.getElementById('admin-applications-history');
+
+    loadApplicationsPage(list, 'pending', 'No pending applications.')
       .catch((err) => {
         console.error('Error fetching applications:', err);
-        document.getElementById('admin-applications-list').innerHTML = '<div class="error">Failed to load applications.</div>';
+        list.innerHTML = '<div class="error">Failed to load applications.</div>';
       });
+
+    // History (accepted/denied) is only fetched the first time it is shown
+    let historyLoaded = false;
+    const toggleBtn = document.getElementById('toggle-history-btn');
+    toggleBtn.onclick = function() {
+      if (history.style.display === 'none') {
+        history.style.display = 'block';
+        toggleBtn.textContent = 'Hide Application History';
+        if (!historyLoaded) {
+          historyLoaded = true;
+          history.innerHTML = '<div class="loading">Loading history...</div>';
+          loadApplicationsPage(history, 'accepted,denied', 'No application history.')
+            .catch((err) => {
+              console.error('Error fetching application history:', err);
+              history.innerHTML = '<div class="error">Failed to load application history.</div>';
+            });
+        }
+      } else {
+        history.style.display = 'none';
+        toggleBtn.textContent = 'Show Application History';
+      }
+    };
   }
 }); 
\ No newline at end of file
@@ -1,29 +1,170 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, request, jsonify, render_template, send_from_directory, Response, stream_with_context, g
 from flask_cors import CORS
 import os
 import firebase_admin
 from firebase_admin import credentials, firestore, auth as firebase_auth
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import subprocess
 import tempfile
+import shutil
 import werkzeug
 import struct
 import math
 import trimesh
+import numpy as np
 import requests
 import random
+import json
+import time
+import threading
+from quote_cache import QuoteCache, make_quote_key
+from quoting import (STL_API_URL, WEIGHT_ESTIMATOR, run_quote, call_stl_weight_api, quote_combinations,
+                     calculate_volume_with_trimesh, calculate_wall_and_infill_volume)
+from jobs import JobQueue, QueueFullError
+from materials_catalog import MaterialsCatalog
+from printer_index import PrinterIndex
+from stl_upload import STLUploadRequest, UploadRejected
+from health import HealthProber
+from http_client import http_client, CircuitOpenError
+from swr_cache import StaleWhileRevalidateCache
+from dispatcher import SideEffectDispatcher
+from email_outbox import EmailOutbox
+from static_assets import StaticAssets, IMMUTABLE_CACHE_CONTROL
+from metrics import MetricsRegistry, PROMETHEUS_CONTENT_TYPE
+from mesh_analysis import MeshAnalysis
+from previews import PreviewStore, generate_preview, GLB_CONTENT_TYPE
 
 app = Flask(__name__)
+# STL uploads are hashed and analyzed as the body streams in (see stl_upload.py)
+app.request_class = STLUploadRequest
+app.config['STL_MAX_UPLOAD_BYTES'] = int(os.environ.get('STL_MAX_UPLOAD_BYTES', 200 * 1024 * 1024))
+app.config['STL_MAX_TRIANGLES'] = int(os.environ.get('STL_MAX_TRIANGLES', 5000000))
+app.config['STL_SPOOL_BYTES'] = int(os.environ.get('STL_SPOOL_BYTES', 1024 * 1024))
 CORS(app)  # Allows cross-origin requests from your frontend
 
+# Request and quote pipeline metrics, scraped from /metrics
+metrics_registry = MetricsRegistry()
+http_requests_total = metrics_registry.counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+http_request_seconds = metrics_registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method'))
+http_requests_in_flight = metrics_registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled', ('route',))
+quote_stage_seconds = metrics_registry.histogram(
+    'quote_stage_seconds', 'Time spent in each /upload-stl stage', ('stage',))
+quotes_total = metrics_registry.counter(
+    'quotes_total', 'Quotes by the path that produced the weight (cache, remote_api, local_engine, fallback, emergency)',
+    ('path',))
+firestore_operation_seconds = metrics_registry.histogram(
+    'firestore_operation_seconds', 'Latency of Firestore reads and writes', ('operation',))
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.metrics_started = time.perf_counter()
+    http_requests_in_flight.inc(route=g.metrics_route)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        route = g.metrics_route
+        http_request_seconds.observe(time.perf_counter() - started, route=route, method=request.method)
+        http_requests_total.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        http_requests_in_flight.dec(route=route)
+
+def record_quote_metrics(quote):
+    """
+    Record the per-stage timings run_quote attaches to a quote, and strip them from it
+    
+    Returns:
+        str: The stage that produced the weight (remote_api, local_engine, fallback or
+             emergency), or None if the quote has no timings
+    """
+    timings = quote.pop('timings', None) or {}
+    for stage, seconds in timings.items():
+        quote_stage_seconds.observe(seconds, stage=stage)
+    if not timings:
+        return None
+    path = list(timings)[-1]
+    quotes_total.inc(path=path)
+    return path
+
+def quote_is_cacheable(path):
+    """
+    Whether a quote produced by `path` may be cached
+    
+    Only quotes from the configured primary estimator are: a slicer fallback, emergency
+    estimate or local engine run forced by the STL API's open circuit breaker would
+    otherwise stay the file's price for good.
+    """
+    if path == 'local_engine':
+        return WEIGHT_ESTIMATOR == 'local'
+    return path == 'remote_api'
+
 # Get price multiplier from environment variable, default to 1.0 for local development
 PRICE_MULTIPLIER = float(os.environ.get('PRICE_MULTIPLIER', '1.0'))
 
-# STL Weight Estimator API configuration
-STL_API_URL = "https://stl-api-66l8.onrender.com/estimate-weight"
+# Machine time charged per print hour when /calculate is asked for time-based pricing
+PRINT_HOURLY_RATE = float(os.environ.get('PRINT_HOURLY_RATE', '1.0'))
+
+# Quote cache: in-memory LRU bounded by size, plus optional on-disk tier
+quote_cache = QuoteCache(
+    max_bytes=int(os.environ.get('QUOTE_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+    cache_dir=os.environ.get('QUOTE_CACHE_DIR') or None
+)
+
+# Post-commit side effects (emails, notifications) run off the request thread
+side_effects = SideEffectDispatcher(workers=int(os.environ.get('SIDE_EFFECT_WORKERS', 1)))
+
+# Outgoing email is queued and sent by a background worker over one SMTP connection;
+# without SMTP_HOST messages are only printed
+email_outbox = EmailOutbox(
+    host=os.environ.get('SMTP_HOST') or None,
+    port=int(os.environ.get('SMTP_PORT', 587)),
+    username=os.environ.get('SMTP_USERNAME'),
+    password=os.environ.get('SMTP_PASSWORD'),
+    use_tls=os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true',
+    sender=os.environ.get('EMAIL_SENDER', 'your-email@outprint.com'),
+    max_attempts=int(os.environ.get('EMAIL_MAX_ATTEMPTS', 5)),
+    dead_letter_path=os.environ.get('EMAIL_DEAD_LETTER_PATH') or None
+)
+
+# Google Sheets counters: served from memory, refreshed in the background once stale
+sheets_cache = StaleWhileRevalidateCache(ttl=int(os.environ.get('SHEETS_CACHE_TTL', 300)))
+
+# Background quote jobs for /upload-stl?async=1
+quote_jobs = JobQueue(
+    max_workers=int(os.environ.get('QUOTE_WORKERS', 0)) or None,
+    max_pending=int(os.environ.get('QUOTE_QUEUE_SIZE', 32))
+)
+
+# Files accepted by one /api/quote/batch request
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 10))
+
+# Decimated GLB previews of uploads, by content hash, built by background jobs
+preview_store = PreviewStore(
+    os.environ.get('PREVIEW_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'outprint-previews'),
+    max_bytes=int(os.environ.get('PREVIEW_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+)
+# Previews have their own small pool and queue, so they never take a slot a quote needs
+preview_jobs = JobQueue(
+    max_workers=int(os.environ.get('PREVIEW_WORKERS', 1)),
+    max_pending=int(os.environ.get('PREVIEW_QUEUE_SIZE', 8))
+)
+# Hashes with a preview job queued or running; guarded by previews_lock
+previews_pending = set()
+previews_lock = threading.Lock()
+
+# Uploads asking for the orientation search (orient=1) or a support estimate (support=1)
+# above this size are quoted as background jobs
+ANALYSIS_INLINE_MAX_TRIANGLES = int(os.environ.get('ANALYSIS_INLINE_MAX_TRIANGLES', 200000))
 
 # Initialize Firebase Admin SDK (if not already done)
 if not firebase_admin._apps:
@@ -64,75 +205,136 @@ else:
         print(f"Firebase client error: {e}")
         db = None
 
+# Materials are served from memory and kept current by a Firestore listener
+materials_catalog = MaterialsCatalog(
+    db,
+    ttl=int(os.environ.get('MATERIALS_CACHE_TTL', 300)),
+    # Lookups are in memory; only the collection reads behind them touch Firestore
+    on_read=lambda seconds: firestore_operation_seconds.observe(seconds, operation='materials.stream')
+)
+
+# Accepted makers' printers by material and bed size; admin status changes update it in place
+printer_index = PrinterIndex(db)
+
+# Dependency checks run in the background; /health only reads their latest results
+HEALTH_CHECK_INTERVAL = int(os.environ.get('HEALTH_CHECK_INTERVAL', 30))
+health_prober = HealthProber()
+
+def check_firebase():
+    """Firestore is reachable and answers a one-document read"""
+    if db is None:
+        return {'healthy': False, 'connected': False}
+    db.collection('materials').limit(1).get(timeout=5)
+    return {'connected': True}
+
+def check_meshlab():
+    """meshlabserver is installed and runs"""
+    try:
+        result = subprocess.run(['meshlabserver', '--version'],
+                                capture_output=True, text=True, timeout=5)
+    except Exception:
+        return {'healthy': False, 'version': 'Not installed'}
+    available = result.returncode == 0
+    return {'healthy': available, 'version': result.stdout.strip() if available else 'Not available'}
+
+def check_stl_api():
+    """External STL Weight Estimator API answers its health endpoint"""
+    try:
+        # Shares the API's circuit breaker, so a recovered API is noticed without a customer request
+        response = http_client.get('stl_api', STL_API_URL.rsplit('/', 1)[0] + '/health', timeout=5)
+    except CircuitOpenError:
+        return {'healthy': False, 'status': 'circuit open'}
+    except requests.RequestException:
+        return {'healthy': False, 'status': 'unreachable'}
+    healthy = response.status_code == 200
+    return {'healthy': healthy, 'status': 'healthy' if healthy else 'unhealthy'}
+
+health_prober.register('firebase', check_firebase, interval=HEALTH_CHECK_INTERVAL * 2)
+# MeshLab and the STL API both have fallbacks, so they don't degrade the service
+health_prober.register('meshlab', check_meshlab, interval=HEALTH_CHECK_INTERVAL * 10, critical=False)
+health_prober.register('stl_api', check_stl_api, interval=HEALTH_CHECK_INTERVAL, critical=False)
+
+# Pages, scripts and styles are served from memory with ETags and precompression;
+# set STATIC_ASSET_CACHE=false while editing them locally
+static_assets = StaticAssets('.')
+if os.environ.get('STATIC_ASSET_CACHE', 'true').lower() == 'true':
+    static_assets.build()
+
+def serve_asset(filename):
+    """Serve a file from the static asset manifest, falling back to disk"""
+    response = static_assets.response(filename, request)
+    if response is None:
+        return send_from_directory('.', filename)
+    return response
+
 # Serve main pages
 @app.route('/')
 def index():
-    return send_from_directory('.', 'index.html')
+    return serve_asset('index.html')
 
 @app.route('/apply')
 def apply():
-    return send_from_directory('.', 'apply.html')
+    return serve_asset('apply.html')
 
 @app.route('/about')
 def about():
-    return send_from_directory('.', 'about.html')
+    return serve_asset('about.html')
 
 @app.route('/orders')
 def orders():
-    return send_from_directory('.', 'orders.html')
+    return serve_asset('orders.html')
 
 @app.route('/account')
 def account():
-    return send_from_directory('.', 'account.html')
+    return serve_asset('account.html')
 
 @app.route('/login')
 def login():
-    return send_from_directory('.', 'login.html')
+    return serve_asset('login.html')
 
 @app.route('/signup')
 def signup():
-    return send_from_directory('.', 'signup.html')
+    return serve_asset('signup.html')
 
 @app.route('/admin')
 def admin():
-    return send_from_directory('.', 'admin.html')
+    return serve_asset('admin.html')
 
 # Serve static files
 @app.route('/<path:filename>')
 def serve_static(filename):
-    return send_from_directory('.', filename)
+    return serve_asset(filename)
 
 @app.route('/health')
 def health_check():
-    """Health check endpoint to verify server and MeshLab status"""
-    try:
-        # Check if MeshLab is available
-        result = subprocess.run(['meshlabserver', '--version'], 
-                              capture_output=True, text=True, timeout=5)
-        meshlab_available = result.returncode == 0
-        meshlab_version = result.stdout.strip() if meshlab_available else "Not available"
-    except:
-        meshlab_available = False
-        meshlab_version = "Not installed"
-    
-    # Check external STL API status
-    stl_api_status = "unknown"
-    try:
-        response = requests.get("https://stl-api-66l8.onrender.com/health", timeout=5)
-        stl_api_status = "healthy" if response.status_code == 200 else "unhealthy"
-    except:
-        stl_api_status = "unreachable"
+    """Health check endpoint serving the latest background probe results"""
+    snapshot = health_prober.snapshot()
+    checks = snapshot['checks']
+    meshlab = checks['meshlab']
+    stl_api = checks['stl_api']
     
     return jsonify({
-        'status': 'healthy',
+        'status': snapshot['status'],
         'firebase_connected': db is not None,
-        'meshlab_available': meshlab_available,
-        'meshlab_version': meshlab_version,
-        'stl_api_status': stl_api_status,
+        'meshlab_available': bool(meshlab['healthy']),
+        'meshlab_version': meshlab['details'].get('version', 'unknown'),
+        'stl_api_status': stl_api['details'].get('status', 'unknown'),
         'stl_api_url': STL_API_URL,
+        'weight_estimator': WEIGHT_ESTIMATOR,
+        'checks': checks,
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Request, quote stage and Firestore metrics in the Prometheus text format"""
+    return Response(metrics_registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/health/live')
+def liveness_check():
+    """Liveness probe: the process is up and serving requests (no I/O)"""
+    return jsonify({'status': 'alive'})
+
 @app.route('/test-db')
 def test_database():
     """Test endpoint to check database connection and available materials"""
@@ -173,134 +375,98 @@ def test_database():
             'firebase_connected': db is not None
         })
 
-def calculate_volume_with_trimesh(stl_file_path, units='mm'):
-    try:
-        mesh = trimesh.load(stl_file_path)
-        if not mesh.is_watertight:
-            mesh = mesh.fill_holes()
-        volume = mesh.volume  # in mm³ if STL is in mm
-
-        # Convert units if needed
-        if units == 'mm':
-            volume_cm3 = abs(volume) / 1000.0
-        elif units == 'cm':
-            volume_cm3 = abs(volume)
-        elif units == 'in':
-            # 1 in³ = 16.387 cm³
-            volume_cm3 = abs(volume) * 16.387
-        else:
-            volume_cm3 = abs(volume) / 1000.0  # default to mm
-
-        return volume_cm3
-    except Exception as e:
-        print(f"Trimesh volume calc failed: {e}")
-        return None
+# Thinnest layer a quote may be sliced at; thinner ones only multiply the slicing work
+MIN_LAYER_HEIGHT_MM = 0.05
 
-def calculate_wall_and_infill_volume(stl_file_path, infill=0.2, wall_thickness_mm=1.2, layer_height_mm=0.2, top_bottom_layers=3, perimeters=2, density=1.24, units='mm'):
-    mesh = trimesh.load(stl_file_path)
-    
-    if not mesh.is_watertight:
-        mesh = mesh.fill_holes()
-    
-    total_volume_mm3 = abs(mesh.volume)
-    surface_area_mm2 = mesh.area
-    
-    # Calculate expected volume from bounding box
-    extents = mesh.extents
-    expected_volume_mm3 = extents[0] * extents[1] * extents[2]
-    
-    # Calculate shell volume more realistically
-    cube_side_length = max(extents)  # Assuming it's roughly cubic
-    perimeter_length = 4 * cube_side_length  # Perimeter of one layer
-    wall_height = cube_side_length  # Height of the walls
-    
-    # Wall volume = perimeter × wall height × wall thickness × perimeters
-    wall_thickness_mm = 0.6  # Each perimeter is 0.6mm wide
-    wall_volume_mm3 = perimeter_length * wall_height * wall_thickness_mm * perimeters
-    
-    # Top/bottom layers volume (only the top and bottom faces)
-    top_bottom_area_mm2 = cube_side_length * cube_side_length  # Area of one face
-    top_bottom_volume_mm3 = top_bottom_area_mm2 * layer_height_mm * top_bottom_layers * 2  # Top and bottom
-    
-    # Total shell volume
-    shell_volume_mm3 = wall_volume_mm3 + top_bottom_volume_mm3
-    shell_volume_mm3 = min(shell_volume_mm3, total_volume_mm3)  # Can't exceed total volume
-    
-    # Inner volume (what gets infill)
-    inner_volume_mm3 = max(0, total_volume_mm3 - shell_volume_mm3)
-    
-    # Calculate material volume
-    # Shell is 100% infill, inner volume gets user's infill percentage
-    material_volume_mm3 = shell_volume_mm3 + (inner_volume_mm3 * infill)
+def parse_quote_params(source):
+    """
+    Read and validate print parameters from form data or a JSON object
     
-    # Convert to cm³
-    shell_volume_cm3 = shell_volume_mm3 / 1000.0
-    inner_volume_cm3 = inner_volume_mm3 / 1000.0
-    total_volume_cm3 = total_volume_mm3 / 1000.0
-    material_volume_cm3 = material_volume_mm3 / 1000.0
+    Raises:
+        ValueError: If a parameter is not a number or is out of range
+    """
+    infill = float(source.get('infill', 20)) / 100  # Default 20%
     
-    # Calculate weights
-    shell_weight = shell_volume_cm3 * density
-    infill_weight = inner_volume_cm3 * infill * density
-    total_weight = shell_weight + infill_weight
+    # Validate infill percentage (minimum 10%)
+    if infill < 0.1:
+        infill = 0.1
+    elif infill > 1.0:
+        infill = 1.0
     
-    print(f"Trimesh: {total_weight:.1f}g, {total_volume_cm3:.1f}cm³")
+    wall_thickness = float(source.get('wallThickness', 1.2))
+    layer_height = float(source.get('layerHeight', 0.2))
+    top_bottom_layers = int(source.get('topBottomLayers', 3))
+    perimeters = int(source.get('perimeters', 2))
+    density = float(source.get('density', 1.24))
+    # "not x > 0" also rejects NaN
+    if not layer_height >= MIN_LAYER_HEIGHT_MM:
+        raise ValueError(f'layerHeight must be at least {MIN_LAYER_HEIGHT_MM} mm')
+    if not wall_thickness > 0:
+        raise ValueError('wallThickness must be greater than 0')
+    if not density > 0:
+        raise ValueError('density must be greater than 0')
+    if top_bottom_layers <= 0 or perimeters <= 0:
+        raise ValueError('topBottomLayers and perimeters must be at least 1')
     
     return {
-        'material_volume_cm3': material_volume_cm3,
-        'shell_volume_cm3': shell_volume_cm3,
-        'inner_volume_cm3': inner_volume_cm3,
-        'total_volume_cm3': total_volume_cm3,
-        'shell_weight': shell_weight,
-        'infill_weight': infill_weight,
-        'total_weight': total_weight
+        'units': source.get('units', 'mm'),
+        'infill': infill,
+        'wallThickness': wall_thickness,
+        'layerHeight': layer_height,
+        'topBottomLayers': top_bottom_layers,
+        'perimeters': perimeters,
+        'density': density,
+        # Opt-in: the orientation search and support estimate take seconds on large meshes
+        'orient': str(source.get('orient', '')).strip().lower() in ('1', 'true'),
+        'support': str(source.get('support', '')).strip().lower() in ('1', 'true')
     }
 
-def call_stl_weight_api(stl_file_path, infill_percentage, material_density):
+def prepare_preview(upload, content_hash, stl_stats):
     """
-    Call the external STL Weight Estimator API for accurate weight calculation
-    
-    Args:
-        stl_file_path: Path to the STL file
-        infill_percentage: Infill percentage (0-100)
-        material_density: Material density in g/cm³
-    
+    Make sure an upload has a preview, queueing a background job to decimate it if it doesn't
+
+    The request never waits on decimation, and only touches the spooled file when
+    the preview is missing.
+
     Returns:
-        float: Weight in grams, or None if failed
+        dict: The preview's url and status ('ready' or 'pending'), or None if there is none
     """
-    try:
-        # Prepare the API request with fixed parameters
-        with open(stl_file_path, 'rb') as stl_file:
-            files = {'file': stl_file}
-            data = {
-                'infill_percentage': infill_percentage,
-                'material_density': material_density,
-                'line_thickness': 0.2,  # Fixed at 0.2mm
-                'layer_height': 0.2,    # Fixed at 0.2mm
-                'shell_count': 2        # Fixed at 2 shells
-            }
-            
-            # Make the API call
-            response = requests.post(STL_API_URL, files=files, data=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                weight_grams = result.get('weight_grams', 0)
-                print(f"STL API: {weight_grams:.1f}g")
-                return weight_grams
-            else:
-                print(f"STL API failed: {response.status_code}")
-                return None
-                
-    except requests.exceptions.Timeout:
-        print("STL API timeout")
+    if stl_stats is None:
         return None
-    except requests.exceptions.RequestException as e:
-        print(f"STL API error: {e}")
-        return None
-    except Exception as e:
-        print(f"STL API unexpected error: {e}")
+    preview = {'url': f'/previews/{content_hash}', 'status': 'ready'}
+    if preview_store.exists(content_hash):
+        return preview
+    
+    with previews_lock:
+        if content_hash in previews_pending:
+            return dict(preview, status='pending')
+        previews_pending.add(content_hash)
+    
+    # The job gets its own link to the spooled file, which the request removes when it closes
+    job_path = upload.path() + '.preview'
+    
+    def finish_preview(job):
+        with previews_lock:
+            previews_pending.discard(content_hash)
+        try:
+            os.unlink(job_path)
+        except OSError:
+            pass
+    
+    try:
+        try:
+            os.link(upload.path(), job_path)
+        except OSError:
+            shutil.copyfile(upload.path(), job_path)
+        preview_jobs.submit(generate_preview, job_path, content_hash, preview_store.cache_dir,
+                            preview_store.max_bytes, on_done=finish_preview)
+    except QueueFullError:
+        finish_preview(None)
         return None
+    except Exception:
+        finish_preview(None)
+        raise
+    return dict(preview, status='pending')
 
 @app.route('/upload-stl', methods=['POST'])
 def upload_stl():
@@ -316,104 +482,163 @@ def upload_stl():
             return jsonify({'error': 'File must be an STL file'}), 400
         
         # Get parameters from request
-        units = request.form.get('units', 'mm')
-        infill = float(request.form.get('infill', 20)) / 100  # Default 20%
-        
-        # Validate infill percentage (minimum 10%)
-        if infill < 0.1:
-            infill = 0.1
-        elif infill > 1.0:
-            infill = 1.0
-            
-        wall_thickness = float(request.form.get('wallThickness', 1.2))
-        layer_height = float(request.form.get('layerHeight', 0.2))
-        top_bottom_layers = int(request.form.get('topBottomLayers', 3))
-        perimeters = int(request.form.get('perimeters', 2))
-        density = float(request.form.get('density', 1.24))
+        try:
+            params = parse_quote_params(request.form)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid print parameters: {str(e)}'}), 400
         
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.stl') as temp_file:
-            file.save(temp_file.name)
-            temp_path = temp_file.name
+        # Identical file + parameters always produce the same quote; the hash was
+        # computed while the upload streamed in
+        upload = file.stream
+        for stage, seconds in upload.timings.items():
+            quote_stage_seconds.observe(seconds, stage=stage)
+        content_hash = upload.sha256()
+        stl_stats = upload.analysis(params['units'])
+        cache_key = make_quote_key(content_hash, params)
+        cached_quote = quote_cache.get(cache_key)
         
+        # The viewer loads a small decimated mesh instead of the raw STL; never fail a quote over it.
+        # A file quoted before normally has its preview already, so cache hits stay in memory.
         try:
-            # First, try the external STL Weight Estimator API for accurate weight
-            infill_percentage = infill * 100
-            
-            # Call the external API
-            weight_grams = call_stl_weight_api(
-                stl_file_path=temp_path,
-                infill_percentage=infill_percentage,
-                material_density=density
-            )
-            
-            if weight_grams is not None:
-                # API call successful - return the weight
-                calculation_method = f'External STL API (infill {infill_percentage}%, density {density}g/cm³)'
-                
-                return jsonify({
-                    'success': True,
-                    'weight': weight_grams,
-                    'filename': file.filename,
-                    'calculationMethod': calculation_method,
-                    'apiUsed': True
-                })
-            
-            # Fallback to existing trimesh calculation
-            import trimesh
+            preview = prepare_preview(upload, content_hash, stl_stats)
+        except Exception as e:
+            print(f"Preview generation failed: {e}")
+            preview = None
+        
+        if cached_quote is not None:
+            quotes_total.inc(path='cache')
+            cached_quote.update({'filename': file.filename, 'cached': True, 'preview': preview})
+            return jsonify(cached_quote)
+        
+        # Print analysis of a large mesh would hold the request for seconds: queue it instead
+        run_in_background = request.args.get('async') == '1' or (
+            (params['orient'] or params['support']) and stl_stats is not None
+            and stl_stats['triangle_count'] > ANALYSIS_INLINE_MAX_TRIANGLES)
+        if run_in_background:
+            # Queue the analysis and return a job id right away; the job owns the spooled file
+            temp_path = upload.detach()
             
-            result = calculate_wall_and_infill_volume(
-                temp_path,
-                infill=infill,
-                wall_thickness_mm=wall_thickness,
-                layer_height_mm=layer_height,
-                top_bottom_layers=top_bottom_layers,
-                perimeters=perimeters,
-                density=density,
-                units=units
-            )
-            calculation_method = f'Trimesh fallback (infill {infill_percentage}%, density {density}g/cm³)'
+            def finish_job(job):
+                try:
+                    os.unlink(temp_path)
+                except:
+                    pass
+                quote = job.get('result')
+                if quote and quote_is_cacheable(record_quote_metrics(quote)):
+                    quote_cache.put(cache_key, quote)
             
-            return jsonify({
-                'success': True,
-                'weight': result['total_weight'],
-                'filename': file.filename,
-                'calculationMethod': calculation_method,
-                'apiUsed': False
-            })
-        except Exception as e:
-            # Emergency fallback
             try:
-                mesh = trimesh.load(temp_path)
-                if mesh.is_watertight:
-                    total_volume_mm3 = abs(mesh.volume)
-                    total_volume_cm3 = total_volume_mm3 / 1000.0
-                else:
-                    extents = mesh.extents
-                    estimated_volume_cm3 = (extents[0] * extents[1] * extents[2]) / 1000.0
-                    total_volume_cm3 = estimated_volume_cm3
-            except Exception as fallback_error:
-                total_volume_cm3 = 10.0
-            
-            emergency_weight = total_volume_cm3 * 0.3 * density
+                job_id = quote_jobs.submit(run_quote, temp_path, params, None, stl_stats, on_done=finish_job)
+            except QueueFullError:
+                os.unlink(temp_path)
+                return jsonify({'error': 'Quote queue is full, please retry shortly'}), 503
             
             return jsonify({
                 'success': True,
-                'weight': emergency_weight,
+                'jobId': job_id,
+                'status': 'queued',
                 'filename': file.filename,
-                'calculationMethod': 'Emergency estimation',
-                'warning': 'Volume calculation failed, using fallback estimation',
-                'apiUsed': False
-            })
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+                'statusUrl': f'/jobs/{job_id}',
+                'preview': preview
+            }), 202
+        
+        # The spooled upload is removed when the request closes
+        quote = run_quote(upload.path(), params, stl_stats=stl_stats)
+        if quote_is_cacheable(record_quote_metrics(quote)):
+            quote_cache.put(cache_key, quote)
+        return jsonify(dict(quote, filename=file.filename, cached=False, preview=preview))
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/previews/<content_hash>')
+def get_preview(content_hash):
+    """Decimated GLB preview of an upload; immutable, since the name is the STL's hash"""
+    if not preview_store.exists(content_hash):
+        with previews_lock:
+            pending = content_hash in previews_pending
+        if pending:
+            return jsonify({'status': 'pending'}), 202, {'Retry-After': '2'}
+        return jsonify({'error': 'Preview not found'}), 404
+    
+    headers = {'ETag': f'"{content_hash}"', 'Cache-Control': IMMUTABLE_CACHE_CONTROL}
+    if request.if_none_match and (request.if_none_match.star_tag or content_hash in request.if_none_match):
+        return Response(status=304, headers=headers)
+    with open(preview_store.path(content_hash), 'rb') as f:
+        body = f.read()
+    return Response(body, status=200, headers=headers, content_type=GLB_CONTENT_TYPE)
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Report the status, progress and result of a background quote job"""
+    job = quote_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def stream_job(job_id):
+    """Server-sent events stream of a job's progress until it finishes"""
+    if quote_jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        last_update = None
+        while True:
+            job = quote_jobs.get(job_id)
+            if job is None:
+                break
+            if job['updatedAt'] != last_update:
+                last_update = job['updatedAt']
+                yield f"data: {json.dumps(job)}\n\n"
+            if job['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.25)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+def find_material(material):
+    """Look up a material document by name in the in-memory catalog, or None if it doesn't exist"""
+    return materials_catalog.get(material)
+
+def price_weight(weight_grams, price_per_gram, support_grams=0.0):
+    """Cost and breakdown for a weight (plus any support material), in the shape /calculate returns"""
+    # Calculate cost: (weight + support) × price per gram × multiplier
+    cost = (weight_grams + support_grams) * price_per_gram * PRICE_MULTIPLIER
+    return {
+        'cost': round(cost, 2),
+        'breakdown': {
+            'weight': round(weight_grams, 2),
+            'supportWeight': round(support_grams, 2),
+            'pricePerGram': round(price_per_gram, 4),
+            'priceMultiplier': PRICE_MULTIPLIER,
+            'calculationMethod': '(Weight + Support) × Price per gram' if support_grams else 'Weight × Price per gram'
+        }
+    }
+
+def price_weight_and_time(weight_grams, price_per_gram, print_hours, support_grams=0.0):
+    """Cost and breakdown for material plus machine time, in the shape /calculate returns"""
+    material_cost = (weight_grams + support_grams) * price_per_gram
+    machine_cost = print_hours * PRINT_HOURLY_RATE
+    cost = (material_cost + machine_cost) * PRICE_MULTIPLIER
+    return {
+        'cost': round(cost, 2),
+        'breakdown': {
+            'weight': round(weight_grams, 2),
+            'supportWeight': round(support_grams, 2),
+            'pricePerGram': round(price_per_gram, 4),
+            'printHours': round(print_hours, 2),
+            'hourlyRate': PRINT_HOURLY_RATE,
+            'materialCost': round(material_cost, 2),
+            'machineCost': round(machine_cost, 2),
+            'priceMultiplier': PRICE_MULTIPLIER,
+            'calculationMethod': ('(Weight + Support)' if support_grams else 'Weight')
+                                 + ' × Price per gram + Print hours × Hourly rate'
+        }
+    }
+
 @app.route('/calculate', methods=['POST'])
 def calculate_cost():
     try:
@@ -423,49 +648,126 @@ def calculate_cost():
         material = data.get('material')
         color = data.get('color')
         weight_grams = float(data.get('weight', 0))  # Weight in grams from STL API
+        # Support material in grams, from the support line of /upload-stl
+        support_grams = float(data.get('supportWeight') or 0)
+        # 'time' adds machine time, using a printTime estimate from /upload-stl
+        pricing = data.get('pricing', 'weight')
         
         if not material or weight_grams <= 0:
             return jsonify({'error': 'Missing material or invalid weight'}), 400
+        if support_grams < 0:
+            return jsonify({'error': 'Invalid supportWeight'}), 400
+        if pricing not in ('weight', 'time'):
+            return jsonify({'error': "pricing must be 'weight' or 'time'"}), 400
+        if pricing == 'time':
+            print_hours = float(data.get('printHours', 0))
+            if print_hours <= 0:
+                return jsonify({'error': 'Time-based pricing needs printHours'}), 400
 
         # Get material data from database
         if db is None:
             return jsonify({'error': 'Database not available'}), 500
 
         try:
-            materials_ref = db.collection('materials')
-            material_docs = materials_ref.where('name', '==', material).limit(1).stream()
-            material_data = None
-            for doc in material_docs:
-                material_data = doc.to_dict()
-                break
+            material_data = find_material(material)
             if not material_data:
                 return jsonify({'error': f'Material "{material}" not found in database'}), 404
-
-            price_per_gram = float(material_data.get('price', 0.05))
-            if color and 'colors' in material_data:
-                for color_data in material_data['colors']:
-                    if color_data.get('hex') == color:
-                        price_per_gram = float(color_data.get('price', material_data.get('price', 0.05)))
-                        break
         except Exception as db_error:
             return jsonify({'error': 'Database query failed'}), 500
 
-        # Calculate cost: weight × price per gram × multiplier
-        cost = weight_grams * price_per_gram * PRICE_MULTIPLIER
+        price_per_gram = materials_catalog.price_per_gram(material, color)
+        if pricing == 'time':
+            quote = price_weight_and_time(weight_grams, price_per_gram, print_hours, support_grams)
+        else:
+            quote = price_weight(weight_grams, price_per_gram, support_grams)
+        quote['catalogVersion'] = materials_catalog.version
+
+        print(f"Cost calc: {weight_grams + support_grams:.1f}g × ${price_per_gram:.4f} = ${quote['cost']:.2f}")
 
-        print(f"Cost calc: {weight_grams:.1f}g × ${price_per_gram:.4f} = ${cost:.2f}")
+        return jsonify(quote)
+    except Exception as e:
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
+@app.route('/api/quote/batch', methods=['POST'])
+def quote_batch():
+    """Quote several STL files under several material/print combinations in one request"""
+    try:
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'error': 'No files provided'}), 400
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({'error': f'At most {BATCH_MAX_FILES} files per batch'}), 400
+        for file in files:
+            if not file.filename.lower().endswith('.stl'):
+                return jsonify({'error': f'File must be an STL file: {file.filename}'}), 400
+        
+        try:
+            raw_combinations = json.loads(request.form.get('combinations', '[{}]'))
+            if not isinstance(raw_combinations, list) or not raw_combinations:
+                raise ValueError('combinations must be a non-empty list')
+            units = request.form.get('units', 'mm')
+            combinations = [parse_quote_params(dict(c, units=units)) for c in raw_combinations]
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid combinations: {str(e)}'}), 400
+        
+        # Price and density come from the material each combination names
+        materials = {}
+        for raw, combination in zip(raw_combinations, combinations):
+            material = raw.get('material')
+            if material and material not in materials:
+                if db is None:
+                    return jsonify({'error': 'Database not available'}), 500
+                try:
+                    materials[material] = find_material(material)
+                except Exception as db_error:
+                    return jsonify({'error': 'Database query failed'}), 500
+            material_data = materials.get(material)
+            if material_data and 'density' not in raw and material_data.get('density'):
+                combination['density'] = float(material_data['density'])
+        
+        # Uploads were spooled while streaming in and are removed when the request closes
+        temp_paths = [file.stream.path() for file in files]
+        
+        # Each file is loaded and sliced once for all combinations; multi-file carts use every core,
+        # taking their slots in the bounded job queue like any other quote
+        if len(temp_paths) == 1:
+            weights = [quote_combinations(temp_paths[0], units, combinations)]
+        else:
+            try:
+                weights = quote_jobs.map(quote_combinations, temp_paths,
+                                         [units] * len(temp_paths), [combinations] * len(temp_paths))
+            except QueueFullError:
+                return jsonify({'error': 'Quote queue is full, please retry shortly'}), 503
+        
+        results = []
+        for file, file_weights in zip(files, weights):
+            quotes = []
+            for raw, combination, result in zip(raw_combinations, combinations, file_weights):
+                weight_grams = result['total_weight']
+                quote = {'combination': raw, 'weight': weight_grams}
+                material_data = materials.get(raw.get('material'))
+                if material_data:
+                    price_per_gram = materials_catalog.price_per_gram(raw['material'], raw.get('color'))
+                    quote.update(price_weight(weight_grams, price_per_gram))
+                elif raw.get('material'):
+                    quote['error'] = f'Material "{raw.get("material")}" not found in database'
+                quotes.append(quote)
+            results.append({'filename': file.filename, 'quotes': quotes})
+        
         return jsonify({
-            'cost': round(cost, 2),
-            'breakdown': {
-                'weight': round(weight_grams, 2),
-                'pricePerGram': round(price_per_gram, 4),
-                'priceMultiplier': PRICE_MULTIPLIER,
-                'calculationMethod': 'Weight × Price per gram'
-            }
+            'success': True,
+            'calculationMethod': 'Slicer',
+            'catalogVersion': materials_catalog.version,
+            'files': results
         })
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        # Empty or unreadable STL
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+        print(f"Batch quote error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/submit-printer-application', methods=['POST'])
 def submit_printer_application():
@@ -482,6 +784,8 @@ def submit_printer_application():
         # Add timestamp and status
         data['submittedAt'] = datetime.now()
         data['status'] = 'pending'
+        # Lets list views show the printer count without fetching the printer specs
+        data['printerCount'] = len(data['printers'])
         
         # Save to Firestore
         if db is None:
@@ -503,18 +807,8 @@ def submit_printer_application():
         return jsonify({'error': 'Internal server error'}), 500
 
 def send_application_email(email, name):
-    """Send confirmation email to applicant"""
+    """Queue the confirmation email to an applicant"""
     try:
-        # Email configuration - update with your email settings
-        sender_email = "your-email@outprint.com"  # Update with your email
-        sender_password = "your-app-password"     # Update with your app password
-        
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = email
-        msg['Subject'] = "Your Outprint Printer Application is Under Review"
-        
         # Email body
         body = f"""
         Dear {name},
@@ -535,19 +829,7 @@ def send_application_email(email, name):
         This is an automated message. Please do not reply to this email.
         """
         
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Send email (you'll need to configure your email service)
-        # For Gmail, you might use:
-        # server = smtplib.SMTP('smtp.gmail.com', 587)
-        # server.starttls()
-        # server.login(sender_email, sender_password)
-        # server.send_message(msg)
-        # server.quit()
-        
-        # For now, just print the email (remove this in production)
-        print(f"Email would be sent to {email}:")
-        print(body)
+        email_outbox.enqueue(email, "Your Outprint Printer Application is Under Review", body)
         
     except Exception as e:
         print(f"Error sending email: {str(e)}")
@@ -585,19 +867,95 @@ def get_user_applications():
         print('Error fetching applications:', e)
         return jsonify({'error': 'Failed to fetch applications'}), 500
 
+@app.route('/api/admin/http-stats', methods=['GET'])
+def admin_http_stats():
+    """Outbound HTTP circuit breaker states and connection pool usage"""
+    # TODO: Add admin check here!
+    return jsonify(http_client.stats())
+
+@app.route('/api/admin/cache-stats', methods=['GET'])
+def admin_cache_stats():
+    """Hit/miss counters for the in-process caches"""
+    # TODO: Add admin check here!
+    return jsonify({
+        'quotes': quote_cache.stats(),
+        'sheets': sheets_cache.stats(),
+        'sideEffects': side_effects.stats(),
+        'emailOutbox': email_outbox.stats()
+    })
+
+def paginate_query(query, collection, default_limit=50, max_limit=200, default_fields=None):
+    """
+    Apply the request's ?limit=, ?startAfter= and ?fields= to an ordered Firestore query
+    
+    Args:
+        query: Query with its order_by already applied
+        collection: Collection the cursor document ids belong to
+        default_fields: Projection used when the request doesn't give ?fields=
+    
+    Returns:
+        tuple: (query, limit)
+    """
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    limit = min(max(limit, 1), max_limit)
+    
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    fields = fields or default_fields
+    if fields:
+        query = query.select(fields)
+    
+    cursor = request.args.get('startAfter')
+    if cursor:
+        snapshot = collection.document(cursor).get()
+        if not snapshot.exists:
+            raise ValueError('Invalid startAfter cursor')
+        query = query.start_after(snapshot)
+    
+    # One extra document tells whether there is a next page
+    return query.limit(limit + 1), limit
+
+def query_page(query, limit):
+    """Run a paginated query, returning its documents (with ids) and the next-page cursor"""
+    docs = list(query.stream())
+    items = []
+    for doc in docs[:limit]:
+        item = doc.to_dict()
+        item['id'] = doc.id
+        items.append(item)
+    next_cursor = docs[limit - 1].id if len(docs) > limit else None
+    return items, next_cursor
+
 @app.route('/api/admin/applications', methods=['GET'])
 def admin_get_all_applications():
+    """
+    One page of printer applications, newest first
+    
+    Query parameters: status (one or a comma-separated list), limit, startAfter
+    (the previous page's nextCursor) and fields (comma-separated projection)
+    """
     if db is None:
         return jsonify({'error': 'Database not available'}), 500
     # TODO: Add admin check here!
-    applications = []
     try:
-        docs = db.collection('printer-applications').stream()
-        for doc in docs:
-            app_data = doc.to_dict()
-            app_data['id'] = doc.id
-            applications.append(app_data)
-        return jsonify(applications)
+        collection = db.collection('printer-applications')
+        query = collection
+        statuses = [s.strip() for s in request.args.get('status', '').split(',') if s.strip()]
+        if len(statuses) == 1:
+            query = query.where('status', '==', statuses[0])
+        elif statuses:
+            query = query.where('status', 'in', statuses)
+        query = query.order_by('submittedAt', direction=firestore.Query.DESCENDING)
+        
+        try:
+            query, limit = paginate_query(query, collection)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        applications, next_cursor = query_page(query, limit)
+        return jsonify({'applications': applications, 'nextCursor': next_cursor})
     except Exception as e:
         print('Error fetching applications:', e)
         return jsonify({'error': 'Failed to fetch applications'}), 500
@@ -613,7 +971,13 @@ def admin_update_or_delete_application(app_id):
         if not status or status not in ['accepted', 'denied']:
             return jsonify({'error': 'Invalid status'}), 400
         try:
-            db.collection('printer-applications').document(app_id).update({'status': status})
+            doc_ref = db.collection('printer-applications').document(app_id)
+            doc_ref.update({'status': status})
+            if printer_index.loaded:
+                if status == 'accepted':
+                    printer_index.add_application(app_id, doc_ref.get().to_dict() or {})
+                else:
+                    printer_index.remove_application(app_id)
             return jsonify({'success': True})
         except Exception as e:
             print('Error updating application:', e)
@@ -621,11 +985,40 @@ def admin_update_or_delete_application(app_id):
     elif request.method == 'DELETE':
         try:
             db.collection('printer-applications').document(app_id).delete()
+            printer_index.remove_application(app_id)
             return jsonify({'success': True})
         except Exception as e:
             print('Error deleting application:', e)
             return jsonify({'error': 'Failed to delete application'}), 500
 
+@app.route('/api/printers/match', methods=['POST'])
+def match_printers():
+    """
+    Accepted makers with a printer that fits a part in a material
+
+    Body: extents ([x, y, z] in mm, any orientation) and material. Public, so makers
+    are identified by application id and printer capabilities only.
+    """
+    if db is None:
+        return jsonify({'error': 'Database not available'}), 500
+    data = request.get_json(silent=True) or {}
+    material = data.get('material')
+    extents = data.get('extents')
+    if not material:
+        return jsonify({'error': 'Missing required field: material'}), 400
+    try:
+        extents = [float(value) for value in extents]
+    except (TypeError, ValueError):
+        extents = None
+    if not extents or len(extents) != 3 or any(value < 0 for value in extents):
+        return jsonify({'error': 'extents must be three non-negative sizes in mm'}), 400
+    try:
+        makers = printer_index.match(extents, material)
+    except Exception as e:
+        print('Error matching printers:', e)
+        return jsonify({'error': 'Failed to match printers'}), 500
+    return jsonify({'makers': makers, 'indexVersion': printer_index.version})
+
 @app.route('/api/firebase-config')
 def get_firebase_config():
     """Serve Firebase config from environment variables"""
@@ -667,21 +1060,32 @@ def get_sheets_data():
     
     url = f"https://sheets.googleapis.com/v4/spreadsheets/{sheet_id}/values/A2:B2?alt=json&key={api_key}"
     
-    try:
-        response = requests.get(url)
+    def load_counters():
+        response = http_client.get('google_sheets', url)
         response.raise_for_status()
         data = response.json()
-        
-        if data.get('values') and data['values'][0]:
-            return jsonify({
-                'printers': data['values'][0][0],
-                'orders': data['values'][0][1]
-            })
-        else:
-            return jsonify({'error': 'No data found in sheet'}), 404
-            
+        if not (data.get('values') and data['values'][0]):
+            raise LookupError('No data found in sheet')
+        return {
+            'printers': data['values'][0][0],
+            'orders': data['values'][0][1]
+        }
+    
+    try:
+        counters, info = sheets_cache.get(sheet_id, load_counters)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except requests.RequestException as e:
         return jsonify({'error': f'Failed to fetch sheet data: {str(e)}'}), 500
+    
+    if info['error']:
+        # Sheets is failing; keep the counters up with the last good values
+        return jsonify(dict(counters, stale=True, ageSeconds=info['ageSeconds'],
+                            warning=f"Sheet data may be out of date: {info['error']}"))
+    return jsonify(counters)
+
+# Fields returned by GET /api/orders?view=summary
+ORDER_SUMMARY_FIELDS = ['orderNumber', 'status', 'createdAt', 'total', 'itemCount']
 
 @app.route('/api/orders', methods=['GET', 'POST'])
 def handle_orders():
@@ -705,31 +1109,36 @@ def handle_orders():
             order_data['createdAt'] = datetime.now().isoformat()
             order_data['status'] = 'pending'
             order_data['orderNumber'] = order_data.get('orderNumber', generate_order_number())
+            # Lets order lists render from the summary projection without the items
+            order_data['itemCount'] = len(order_data['items'])
             
             # Save to Firestore if available
             if db:
                 try:
-                    # Add to orders collection
-                    order_ref = db.collection('orders').add(order_data)
-                    order_data['firestoreId'] = order_ref[1].id
+                    # Both documents are written in one atomic batch: one round trip, never half-saved
+                    order_ref = db.collection('orders').document()
+                    batch = db.batch()
+                    batch.set(order_ref, dict(order_data))
+                    saved_ids = {'firestoreId': order_ref.id}
                     
                     # Also save to user's orders if user is logged in
                     if 'userId' in order_data:
-                        user_orders_ref = db.collection('users').document(order_data['userId']).collection('orders').add(order_data)
-                        order_data['userOrderId'] = user_orders_ref[1].id
+                        user_order_ref = db.collection('users').document(order_data['userId']).collection('orders').document()
+                        batch.set(user_order_ref, dict(order_data, **saved_ids))
+                        saved_ids['userOrderId'] = user_order_ref.id
                     
+                    with firestore_operation_seconds.time(operation='orders.batch_commit'):
+                        batch.commit()
+                    order_data.update(saved_ids)
                     print(f"Order saved: {order_data['orderNumber']}")
                     
                 except Exception as e:
+                    # Nothing was saved, so don't confirm an order that doesn't exist
                     print(f"Order save error: {e}")
-                    # Continue without Firestore if it fails
+                    return jsonify({'error': 'Failed to save order'}), 500
             
-            # Send confirmation email (if email service is configured)
-            try:
-                send_order_confirmation_email(order_data)
-            except Exception as e:
-                print(f"Email error: {e}")
-                # Continue without email if it fails
+            # Confirmation email and other side effects run after the response
+            side_effects.dispatch('order confirmation email', send_order_confirmation_email, dict(order_data))
             
             return jsonify({
                 'success': True,
@@ -753,24 +1162,26 @@ def handle_orders():
             if not db:
                 return jsonify({'error': 'Database not available'}), 500
             
-            # Get orders from Firestore
+            # Newest first, one page at a time, ordered and limited by Firestore
             try:
-                # Get orders from user's orders subcollection
                 user_orders_ref = db.collection('users').document(user_id).collection('orders')
-                orders = []
-                
-                for doc in user_orders_ref.stream():
-                    order_data = doc.to_dict()
-                    order_data['id'] = doc.id
-                    orders.append(order_data)
+                query = user_orders_ref.order_by('createdAt', direction=firestore.Query.DESCENDING)
                 
-                # Sort by creation date (newest first)
-                orders.sort(key=lambda x: x.get('createdAt', ''), reverse=True)
+                # ?view=summary leaves out the heavy items payload
+                default_fields = ORDER_SUMMARY_FIELDS if request.args.get('view') == 'summary' else None
+                with firestore_operation_seconds.time(operation='orders.list'):
+                    try:
+                        query, limit = paginate_query(query, user_orders_ref, default_fields=default_fields)
+                    except ValueError as e:
+                        return jsonify({'error': str(e)}), 400
+                    
+                    orders, next_cursor = query_page(query, limit)
                 
                 return jsonify({
                     'success': True,
                     'orders': orders,
-                    'count': len(orders)
+                    'count': len(orders),
+                    'nextCursor': next_cursor
                 })
                 
             except Exception as e:
@@ -788,7 +1199,7 @@ def generate_order_number():
     return f"ORD{timestamp[-6:]}{random_suffix}"
 
 def send_order_confirmation_email(order_data):
-    """Send order confirmation email"""
+    """Queue the order confirmation email"""
     try:
         customer_email = order_data['customer']['email']
         order_number = order_data['orderNumber']
@@ -808,8 +1219,7 @@ def send_order_confirmation_email(order_data):
         The Outprint Team
         """
         
-        # For now, just log the email (you can implement actual email sending later)
-        print(f"Email: {customer_email} - {order_number} - ${total:.2f}")
+        email_outbox.enqueue(customer_email, subject, body)
         
     except Exception as e:
         print(f"Email creation error: {e}")
@@ -827,17 +1237,18 @@ def test_trimesh():
                 [0, 4, 5], [0, 5, 1], [1, 5, 6], [1, 6, 2],
                 [2, 6, 7], [2, 7, 3], [3, 7, 4], [3, 4, 0]]
         
-        mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-        volume = mesh.volume
+        # Same analysis object the quote pipeline uses
+        mesh = MeshAnalysis(np.array(vertices, dtype=np.float32)[np.array(faces)])
         
         return jsonify({
             'success': True,
             'trimesh_version': trimesh.__version__,
-            'test_volume': volume,
+            'test_volume': mesh.volume_mm3,
             'expected_volume': 1000.0,
             'is_watertight': mesh.is_watertight,
-            'bounds': mesh.bounds.tolist(),
-            'extents': mesh.extents.tolist()
+            'components': mesh.components,
+            'bounds': mesh.bounds,
+            'extents': mesh.extents
         })
     except Exception as e:
         return jsonify({
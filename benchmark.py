@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the geometry and quoting pipeline.
+
+Generates a corpus of synthetic meshes (cubes, spheres and tori at several
+tessellation levels, plus open and ASCII variants) and times volume
+calculation, the slicer, the orientation search, the support estimate, and
+end-to-end /upload-stl and /calculate through the Flask test client with the
+remote STL API replaced by a local stub. Results are written as JSON so runs
+on different commits can be compared:
+
+    python benchmark.py --output before.json
+    git checkout <other commit>
+    python benchmark.py --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import trimesh
+
+# (shape, level) pairs; triangle counts are roughly 12·4^n cubes, 20·4^n spheres, 2·m² tori
+TESSELLATION_LEVELS = {
+    'cube': [0, 3, 5, 7, 9],
+    'sphere': [2, 4, 6, 7, 8],
+    'torus': [16, 64, 256, 512, 1024],
+}
+
+STUB_WEIGHT_GRAMS = 42.0
+
+
+def make_mesh(shape, level):
+    """Build one synthetic mesh, sized to a few centimetres like a typical print"""
+    if shape == 'cube':
+        mesh = trimesh.creation.box(extents=(40, 40, 40))
+        for _ in range(level):
+            mesh = mesh.subdivide()
+        return mesh
+    if shape == 'sphere':
+        return trimesh.creation.icosphere(subdivisions=level, radius=25)
+    if shape == 'torus':
+        return trimesh.creation.torus(major_radius=30, minor_radius=10,
+                                      major_sections=level, minor_sections=max(level // 2, 8))
+    raise ValueError(f'Unknown shape: {shape}')
+
+
+def estimated_triangles(shape, level):
+    if shape == 'cube':
+        return 12 * 4 ** level
+    if shape == 'sphere':
+        return 20 * 4 ** level
+    return 2 * level * max(level // 2, 8)
+
+
+def build_corpus(directory, max_triangles, ascii_max_triangles):
+    """
+    Write the mesh corpus to `directory`
+
+    Returns:
+        list: One dict per file with name, path, shape, format, watertight, triangles and bytes
+    """
+    corpus = []
+    for shape, levels in TESSELLATION_LEVELS.items():
+        for level in levels:
+            if estimated_triangles(shape, level) > max_triangles:
+                continue
+            mesh = make_mesh(shape, level)
+            # Every 100th face removed: an open mesh with ~1% missing surface
+            open_mesh = trimesh.Trimesh(mesh.vertices, np.delete(mesh.faces, np.s_[::100], axis=0),
+                                        process=False)
+            variants = [('binary', True, mesh), ('binary', False, open_mesh)]
+            if len(mesh.faces) <= ascii_max_triangles:
+                variants.append(('ascii', True, mesh))
+
+            for stl_format, watertight, variant in variants:
+                name = f"{shape}-{len(variant.faces)}{'' if watertight else '-open'}-{stl_format}.stl"
+                path = os.path.join(directory, name)
+                with open(path, 'wb') as f:
+                    if stl_format == 'ascii':
+                        f.write(trimesh.exchange.stl.export_stl_ascii(variant).encode())
+                    else:
+                        f.write(trimesh.exchange.stl.export_stl(variant))
+                corpus.append({
+                    'name': name,
+                    'path': path,
+                    'shape': shape,
+                    'format': stl_format,
+                    'watertight': watertight,
+                    'triangles': len(variant.faces),
+                    'bytes': os.path.getsize(path),
+                })
+    return corpus
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter (Linux); elsewhere the peak only grows"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if platform.system() == 'Darwin' else peak / 1024.0
+
+
+def measure(func, repeats, time_budget):
+    """
+    Call `func` up to `repeats` times (at least once), stopping early once `time_budget` seconds pass
+
+    Returns:
+        dict: Per-call latencies in seconds and the peak RSS seen while running
+    """
+    reset_peak_rss()
+    latencies = []
+    started = time.perf_counter()
+    # The pipeline logs every step with print(); keep it out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            call_started = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - call_started)
+            if time.perf_counter() - started > time_budget:
+                break
+    return {'latencies': latencies, 'peak_rss_mb': peak_rss_mb()}
+
+
+def summarize(benchmark, item, measurement):
+    """Turn raw latencies into the JSON record for one benchmark × mesh"""
+    latencies = np.array(measurement['latencies'])
+    total = latencies.sum()
+    record = {
+        'benchmark': benchmark,
+        'mesh': item['name'] if item else None,
+        'runs': len(latencies),
+        'latency_ms': {
+            'mean': float(latencies.mean() * 1000),
+            'min': float(latencies.min() * 1000),
+            'p50': float(np.percentile(latencies, 50) * 1000),
+            'p90': float(np.percentile(latencies, 90) * 1000),
+            'p99': float(np.percentile(latencies, 99) * 1000),
+            'max': float(latencies.max() * 1000),
+        },
+        'throughput': {'calls_per_s': len(latencies) / total if total else None},
+        'peak_rss_mb': round(measurement['peak_rss_mb'], 1),
+    }
+    if item:
+        record.update({key: item[key] for key in ('shape', 'format', 'watertight', 'triangles', 'bytes')})
+        if total:
+            record['throughput']['triangles_per_s'] = item['triangles'] * len(latencies) / total
+            record['throughput']['mb_per_s'] = item['bytes'] * len(latencies) / total / 1e6
+    return record
+
+
+class StubSTLAPIHandler(BaseHTTPRequestHandler):
+    """Stands in for the remote STL weight API: reads the upload, returns a fixed weight"""
+    protocol_version = 'HTTP/1.1'
+    # Without this, delayed ACKs add ~40 ms to every stubbed call
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({'weight_grams': STUB_WEIGHT_GRAMS}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def setup_app():
+    """
+    Import the Flask app with the STL API stubbed, an in-memory materials catalog
+    and quote caching disabled, so every upload runs the full pipeline
+
+    Returns:
+        tuple: (test client, stub server)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    import quoting
+    from materials_catalog import MaterialsCatalog
+    from quote_cache import QuoteCache
+    from test_materials_catalog import FakeCollection, FakeDB, MATERIALS
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubSTLAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    quoting.STL_API_URL = f'http://127.0.0.1:{server.server_port}/estimate-weight'
+    quoting.WEIGHT_ESTIMATOR = 'api'
+
+    app_module.db = FakeDB(FakeCollection(MATERIALS))
+    app_module.materials_catalog = MaterialsCatalog(app_module.db)
+    app_module.quote_cache = QuoteCache(max_bytes=0)
+    return app_module.app.test_client(), server
+
+
+def run_benchmarks(corpus, args):
+    from quoting import calculate_volume_with_trimesh, calculate_wall_and_infill_volume
+    from orientation import optimize_orientation
+    from mesh_analysis import MeshAnalysis
+
+    client, server = setup_app()
+    selected = set(args.only) if args.only else None
+    results = []
+
+    def record(benchmark, item, func, repeats):
+        if selected and benchmark not in selected:
+            return
+        result = summarize(benchmark, item, measure(func, repeats, args.time_budget))
+        results.append(result)
+        where = f" {item['name']}" if item else ''
+        print(f"{benchmark:>10}{where}: p50 {result['latency_ms']['p50']:.1f} ms, "
+              f"{result['runs']} runs, peak RSS {result['peak_rss_mb']:.0f} MB")
+
+    def upload(item):
+        with open(item['path'], 'rb') as f:
+            data = f.read()
+
+        def call():
+            response = client.post('/upload-stl', data={'file': (io.BytesIO(data), item['name'])},
+                                   content_type='multipart/form-data')
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return call
+
+    try:
+        for item in corpus:
+            record('volume', item, lambda: calculate_volume_with_trimesh(item['path']), args.repeats)
+            record('slicer', item, lambda: calculate_wall_and_infill_volume(item['path']), args.repeats)
+            record('orient', item, lambda: optimize_orientation(item['path']), args.repeats)
+            record('support', item, lambda: MeshAnalysis.load(item['path']).estimate_support(), args.repeats)
+            record('upload', item, upload(item), args.repeats)
+
+        def calculate():
+            response = client.post('/calculate', json={'material': 'PLA', 'weight': STUB_WEIGHT_GRAMS})
+            assert response.status_code == 200, response.get_data(as_text=True)
+        record('calculate', None, calculate, args.repeats * 20)
+    finally:
+        server.shutdown()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the p50 change of every benchmark also present in a previous run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['benchmark'], r['mesh']): r for r in baseline['results']}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for result in results:
+        before = previous.get((result['benchmark'], result['mesh']))
+        if before is None:
+            continue
+        ratio = result['latency_ms']['p50'] / before['latency_ms']['p50']
+        flag = '  <-- slower' if ratio > 1.1 else ''
+        print(f"{result['benchmark']:>10} {result['mesh'] or '':<40} "
+              f"{before['latency_ms']['p50']:9.1f} -> {result['latency_ms']['p50']:9.1f} ms "
+              f"({ratio:.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='bench_output.json', help='JSON results file')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    parser.add_argument('--max-triangles', type=int, default=3_500_000,
+                        help='Skip tessellation levels above this many triangles')
+    parser.add_argument('--ascii-max-triangles', type=int, default=300_000,
+                        help='Only write ASCII variants up to this many triangles')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per benchmark and mesh')
+    parser.add_argument('--time-budget', type=float, default=20.0,
+                        help='Stop repeating a benchmark after this many seconds')
+    parser.add_argument('--only', nargs='+', choices=['volume', 'slicer', 'orient', 'support', 'upload', 'calculate'],
+                        help='Run only these benchmarks')
+    parser.add_argument('--quick', action='store_true',
+                        help='Small meshes only (max 50,000 triangles, 3 repeats)')
+    args = parser.parse_args()
+    if args.quick:
+        args.max_triangles = min(args.max_triangles, 50_000)
+        args.repeats = min(args.repeats, 3)
+
+    directory = tempfile.mkdtemp(prefix='stl-bench-')
+    try:
+        print("Generating corpus...")
+        corpus = build_corpus(directory, args.max_triangles, args.ascii_max_triangles)
+        print(f"{len(corpus)} meshes, {sum(item['bytes'] for item in corpus) / 1e6:.1f} MB")
+        results = run_benchmarks(corpus, args)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    output = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'trimesh': trimesh.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': vars(args),
+        },
+        'corpus': [{key: value for key, value in item.items() if key != 'path'} for item in corpus],
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
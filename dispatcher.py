@@ -0,0 +1,89 @@
+"""
+Background dispatcher for post-commit side effects.
+
+Work that must happen after a request succeeds but that the client should
+not wait for (confirmation emails, notifications, analytics) is queued
+here and run by a small pool of daemon threads. Failures are logged and
+counted; they never reach the request that queued them.
+"""
+
+import queue
+import threading
+import time
+
+
+class SideEffectDispatcher:
+    """Bounded in-process queue of callables run on background threads"""
+
+    def __init__(self, workers=1, max_queue=1000):
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._started = False
+        self.dispatched = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._work, daemon=True, name=f'side-effects-{i}').start()
+
+    def _work(self):
+        while True:
+            name, func, args, kwargs = self._queue.get()
+            try:
+                func(*args, **kwargs)
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                print(f"Side effect {name} failed: {e}")
+                with self._lock:
+                    self.failed += 1
+            finally:
+                self._queue.task_done()
+
+    def dispatch(self, name, func, *args, **kwargs):
+        """
+        Queue `func(*args, **kwargs)` to run after the current request
+
+        Returns:
+            bool: False if the queue was full and the side effect was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((name, func, args, kwargs))
+        except queue.Full:
+            print(f"Side effect queue full, dropping {name}")
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.dispatched += 1
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued side effect has run; returns False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Return queue depth and completion counters"""
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'dispatched': self.dispatched,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,211 @@
+"""
+Background email outbox.
+
+Requests only enqueue messages. A single worker thread drains the queue in
+batches over one persistent SMTP connection, reconnecting when the server
+drops it. Failed messages are retried with exponential backoff and, once
+out of attempts, recorded as dead letters instead of being lost silently.
+Without an SMTP host configured, messages are printed instead of sent.
+"""
+
+import heapq
+import itertools
+import json
+import smtplib
+import threading
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# Dead letters kept in memory for the stats endpoint
+DEAD_LETTER_MEMORY = 100
+
+
+class EmailOutbox:
+    """
+    Queue of outgoing emails sent by a background worker
+
+    Args:
+        host: SMTP server host, or None to print messages instead of sending
+        port: SMTP server port
+        username: SMTP login (skipped when empty)
+        password: SMTP password
+        use_tls: Upgrade the connection with STARTTLS
+        sender: From address
+        batch_size: Messages sent per wake-up before checking for retries again
+        max_attempts: Attempts per message before it is dead-lettered
+        backoff: Base retry delay in seconds; attempt n waits backoff * 2**(n-1)
+        idle_timeout: Close the SMTP connection after this many idle seconds
+        dead_letter_path: Optional JSON-lines file dead letters are appended to
+    """
+
+    def __init__(self, host=None, port=587, username=None, password=None, use_tls=True,
+                 sender='noreply@outprint.com', batch_size=20, max_attempts=5, backoff=2.0,
+                 idle_timeout=60, dead_letter_path=None, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.dead_letter_path = dead_letter_path
+        self.timeout = timeout
+
+        # Min-heap of (ready_at, sequence, envelope)
+        self._pending = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._started = False
+        self._connection = None
+        self._in_flight = 0
+        self.dead_letters = []
+        self.counters = {'enqueued': 0, 'sent': 0, 'retried': 0, 'deadLettered': 0,
+                         'connectionsOpened': 0}
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._work, daemon=True, name='email-outbox').start()
+
+    def enqueue(self, to, subject, body):
+        """Queue a plain-text email; returns immediately"""
+        envelope = {'to': to, 'subject': subject, 'body': body, 'attempts': 0,
+                    'queuedAt': time.time()}
+        with self._condition:
+            self._ensure_started()
+            heapq.heappush(self._pending, (time.time(), next(self._sequence), envelope))
+            self.counters['enqueued'] += 1
+            self._condition.notify()
+
+    def _build_message(self, envelope):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender
+        msg['To'] = envelope['to']
+        msg['Subject'] = envelope['subject']
+        msg.attach(MIMEText(envelope['body'], 'plain'))
+        return msg
+
+    def _next_batch(self):
+        """Wait for messages that are due, and take up to batch_size of them"""
+        with self._condition:
+            while True:
+                now = time.time()
+                if self._pending and self._pending[0][0] <= now:
+                    break
+                wait = self._pending[0][0] - now if self._pending else self.idle_timeout
+                if not self._condition.wait(timeout=wait) and not self._pending:
+                    # Idle: don't hold the SMTP connection open
+                    self._disconnect()
+            batch = []
+            while self._pending and self._pending[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._pending)[2])
+            self._in_flight = len(batch)
+            return batch
+
+    def _connect(self):
+        if self._connection is not None:
+            return self._connection
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        self._connection = connection
+        self.counters['connectionsOpened'] += 1
+        return connection
+
+    def _disconnect(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _send(self, envelope):
+        if not self.host:
+            print(f"Email would be sent to {envelope['to']}: {envelope['subject']}")
+            print(envelope['body'])
+            return
+        msg = self._build_message(envelope)
+        try:
+            self._connect().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server closed our kept-alive connection; one fresh connection, same attempt
+            self._connection = None
+            self._connect().send_message(msg)
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            for envelope in batch:
+                envelope['attempts'] += 1
+                try:
+                    self._send(envelope)
+                    self.counters['sent'] += 1
+                except Exception as e:
+                    if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                        self._connection = None
+                    self._retry_or_dead_letter(envelope, e)
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def _retry_or_dead_letter(self, envelope, error):
+        envelope['lastError'] = str(error)
+        # 5xx replies (unknown mailbox, rejected sender) won't succeed on retry
+        permanent = isinstance(error, smtplib.SMTPRecipientsRefused) or (
+            isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500)
+        if not permanent and envelope['attempts'] < self.max_attempts:
+            delay = self.backoff * 2 ** (envelope['attempts'] - 1)
+            print(f"Email to {envelope['to']} failed ({error}), retrying in {delay:.1f}s")
+            with self._condition:
+                heapq.heappush(self._pending, (time.time() + delay, next(self._sequence), envelope))
+                self.counters['retried'] += 1
+            return
+
+        print(f"Email to {envelope['to']} dead-lettered after {envelope['attempts']} attempts: {error}")
+        record = {
+            'to': envelope['to'],
+            'subject': envelope['subject'],
+            'attempts': envelope['attempts'],
+            'error': str(error),
+            'failedAt': datetime.now().isoformat(),
+        }
+        self.dead_letters = (self.dead_letters + [record])[-DEAD_LETTER_MEMORY:]
+        self.counters['deadLettered'] += 1
+        if self.dead_letter_path:
+            try:
+                with open(self.dead_letter_path, 'a') as f:
+                    f.write(json.dumps(dict(record, body=envelope['body'])) + '\n')
+            except OSError as e:
+                print(f"Dead letter write error: {e}")
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or being sent; returns False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(timeout=remaining)
+        return True
+
+    def stats(self):
+        """Return queue depth, counters and the most recent dead letters"""
+        with self._condition:
+            return dict(
+                self.counters,
+                queued=len(self._pending),
+                connected=self._connection is not None,
+                smtpConfigured=bool(self.host),
+                deadLetters=list(self.dead_letters[-10:]),
+            )
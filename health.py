@@ -0,0 +1,115 @@
+"""
+Background dependency health prober.
+
+Each registered check runs on its own daemon thread at its own interval, so
+a slow dependency (a MeshLab subprocess, a cold STL API) never delays the
+others or the /health request itself: /health only reads the latest
+results.
+"""
+
+import threading
+import time
+
+
+class HealthProber:
+    """Runs health checks in the background and serves their latest results"""
+
+    def __init__(self):
+        self._checks = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+
+    def register(self, name, check, interval=30, critical=True):
+        """
+        Add a dependency check
+
+        Args:
+            name: Key the result is reported under
+            check: Callable returning a dict of details; a 'healthy' key (default True)
+                   marks the result, and raising marks it unhealthy
+            interval: Seconds between runs
+            critical: Whether a failure degrades the overall status
+        """
+        self._checks[name] = {'check': check, 'interval': interval, 'critical': critical}
+        if self._started:
+            self._start_check(name)
+
+    def _start_check(self, name):
+        threading.Thread(target=self._probe_loop, args=(name,), daemon=True,
+                         name=f'health-{name}').start()
+
+    def _probe_loop(self, name):
+        spec = self._checks[name]
+        while not self._stop.is_set():
+            self.run_check(name)
+            self._stop.wait(spec['interval'])
+
+    def run_check(self, name):
+        """Run one check now and record its result"""
+        spec = self._checks[name]
+        started = time.perf_counter()
+        try:
+            details = dict(spec['check']() or {})
+            healthy = bool(details.pop('healthy', True))
+            error = None
+        except Exception as e:
+            details = {}
+            healthy = False
+            error = str(e)
+
+        result = {
+            'healthy': healthy,
+            'critical': spec['critical'],
+            'details': details,
+            'error': error,
+            'latencyMs': round((time.perf_counter() - started) * 1000.0, 2),
+            'checkedAt': time.time(),
+        }
+        with self._lock:
+            self._results[name] = result
+        return result
+
+    def ensure_started(self):
+        """Start the probe threads on first use, so importing never spawns threads"""
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for name in self._checks:
+            self._start_check(name)
+
+    def snapshot(self):
+        """
+        Latest result of every check, without doing any I/O
+
+        Returns:
+            dict: Overall 'status' ('healthy', 'degraded' or 'starting') and per-check
+                  results with 'ageSeconds'
+        """
+        self.ensure_started()
+        now = time.time()
+        with self._lock:
+            results = {name: dict(result, ageSeconds=round(now - result['checkedAt'], 3))
+                       for name, result in self._results.items()}
+
+        for name, spec in self._checks.items():
+            if name not in results:
+                results[name] = {'healthy': None, 'critical': spec['critical'], 'details': {},
+                                 'error': None, 'latencyMs': None, 'checkedAt': None,
+                                 'ageSeconds': None}
+
+        if any(r['critical'] and r['healthy'] is False for r in results.values()):
+            status = 'degraded'
+        elif any(r['healthy'] is None for r in results.values()):
+            status = 'starting'
+        else:
+            status = 'healthy'
+        return {'status': status, 'checks': results}
+
+    def stop(self):
+        """Stop all probe threads after their current run"""
+        self._stop.set()
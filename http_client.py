@@ -0,0 +1,224 @@
+"""
+Shared outbound HTTP client.
+
+All calls to remote services go through one requests.Session, so
+connections are kept alive and reused instead of paying a TLS handshake
+per call. Each named endpoint has its own timeout, retry budget and
+circuit breaker: after repeated failures or slow responses the breaker
+opens and calls fail immediately with CircuitOpenError until a single
+probe request succeeds after the cool-down.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool sizing: hosts kept, and idle connections kept per host
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout` seconds, where one probe decides whether
+    to close again or re-open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Whether a call may go out now; in half-open state only one probe is let through"""
+        with self._lock:
+            if self.state == 'open' and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def is_open(self):
+        """Whether calls are currently being short-circuited (no probe is due yet)"""
+        with self._lock:
+            return self.state == 'open' and time.time() - self.opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"Circuit breaker opened after {self.consecutive_failures} failures")
+                self.state = 'open'
+                self.opened_at = time.time()
+            self._probing = False
+
+
+class HttpClient:
+    """Keep-alive session plus per-endpoint timeouts, retries and circuit breakers"""
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def register_endpoint(self, name, timeout=10, retries=2, backoff=0.5, slow_after=None,
+                          failure_threshold=5, reset_timeout=30):
+        """
+        Configure a named remote endpoint
+
+        Args:
+            name: Endpoint name used in request() and stats()
+            timeout: Per-attempt timeout in seconds
+            retries: Extra attempts after connection errors, timeouts and 5xx responses
+            backoff: Base delay in seconds; attempt n waits a random time up to backoff * 2**n
+            slow_after: Responses slower than this many seconds count as breaker failures
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before probing
+        """
+        self._endpoints[name] = {
+            'timeout': timeout,
+            'retries': retries,
+            'backoff': backoff,
+            'slow_after': slow_after,
+            'breaker': CircuitBreaker(failure_threshold, reset_timeout),
+            'counters': {'requests': 0, 'successes': 0, 'failures': 0, 'retries': 0,
+                         'slow': 0, 'shortCircuited': 0},
+            'last_latency': None,
+        }
+
+    def _count(self, endpoint, counter):
+        with self._lock:
+            endpoint['counters'][counter] += 1
+
+    def available(self, name):
+        """False while the endpoint's breaker is open and not yet due for a probe"""
+        endpoint = self._endpoints.get(name)
+        return endpoint is None or not endpoint['breaker'].is_open()
+
+    def request(self, name, method, url, **kwargs):
+        """
+        Send a request to a registered endpoint
+
+        Returns:
+            requests.Response: The final response (4xx responses are returned, not retried)
+
+        Raises:
+            CircuitOpenError: The endpoint's breaker is open
+            requests.RequestException: Every attempt failed
+        """
+        endpoint = self._endpoints[name]
+        breaker = endpoint['breaker']
+        if not breaker.allow_request():
+            self._count(endpoint, 'shortCircuited')
+            raise CircuitOpenError(f'{name} circuit is open')
+
+        kwargs.setdefault('timeout', endpoint['timeout'])
+        attempts = endpoint['retries'] + 1
+        for attempt in range(attempts):
+            if attempt:
+                self._count(endpoint, 'retries')
+                time.sleep(random.uniform(0, endpoint['backoff'] * 2 ** (attempt - 1)))
+                # Rewind uploaded files consumed by the previous attempt
+                for value in (kwargs.get('files') or {}).values():
+                    if hasattr(value, 'seek'):
+                        value.seek(0)
+
+            self._count(endpoint, 'requests')
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                error = e
+                response = None
+            latency = time.perf_counter() - started
+            endpoint['last_latency'] = latency
+
+            if response is not None and response.status_code < 500:
+                slow = endpoint['slow_after'] is not None and latency > endpoint['slow_after']
+                if slow:
+                    self._count(endpoint, 'slow')
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                self._count(endpoint, 'successes')
+                return response
+
+            self._count(endpoint, 'failures')
+            if attempt == attempts - 1 or breaker.state != 'closed':
+                break
+
+        breaker.record_failure()
+        # A 5xx response is handed back like any other; the caller checks the status
+        if response is not None:
+            return response
+        raise error
+
+    def get(self, name, url, **kwargs):
+        return self.request(name, 'GET', url, **kwargs)
+
+    def post(self, name, url, **kwargs):
+        return self.request(name, 'POST', url, **kwargs)
+
+    def stats(self):
+        """Breaker state and counters per endpoint, plus connection pool usage per host"""
+        endpoints = {}
+        with self._lock:
+            for name, endpoint in self._endpoints.items():
+                breaker = endpoint['breaker']
+                endpoints[name] = dict(
+                    endpoint['counters'],
+                    state=breaker.state,
+                    consecutiveFailures=breaker.consecutive_failures,
+                    openedAt=breaker.opened_at,
+                    lastLatencyMs=(round(endpoint['last_latency'] * 1000.0, 2)
+                                   if endpoint['last_latency'] is not None else None),
+                )
+
+        pools = {}
+        pool_manager = self._adapter.poolmanager
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                'connectionsOpened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle': pool.pool.qsize() if pool.pool is not None else 0,
+            }
+        return {'endpoints': endpoints, 'pools': pools}
+
+
+# Process-wide client shared by every outbound call
+http_client = HttpClient()
+# The upload POST isn't idempotent and a retry would double the 30 s worst case,
+# so a failed attempt goes straight to the slicer fallback instead
+http_client.register_endpoint('stl_api', timeout=30, retries=0, slow_after=20,
+                              failure_threshold=3, reset_timeout=60)
+http_client.register_endpoint('google_sheets', timeout=5, retries=2)
@@ -0,0 +1,204 @@
+"""
+Background job queue for slow quote work.
+
+Jobs run on a bounded process pool so one large STL can't stall the web
+worker, and throughput scales with cores. Workers push stage/progress
+updates back over a multiprocessing queue that a drain thread applies to
+the job table served by GET /jobs/<id>.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# Set inside worker processes by _init_worker / _run_job
+_progress_queue = None
+_current_job_id = None
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue already holds its maximum number of pending jobs"""
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def report_progress(stage, progress):
+    """Report the current job's stage and progress (0-1); a no-op outside job workers"""
+    if _progress_queue is None or _current_job_id is None:
+        return
+    try:
+        _progress_queue.put_nowait((_current_job_id, stage, progress))
+    except Exception:
+        pass
+
+
+def in_job_worker():
+    """True inside a job worker process"""
+    return _progress_queue is not None
+
+
+def _run_job(job_id, func, args):
+    global _current_job_id
+    _current_job_id = job_id
+    report_progress('running', 0.0)
+    try:
+        return func(*args)
+    finally:
+        _current_job_id = None
+
+
+class JobQueue:
+    """
+    Bounded process-pool job queue with an in-memory status table
+
+    The pool is started lazily on first submit, so importing this module (or
+    forking gunicorn workers) never spawns processes.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32, result_ttl=600):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._progress_queue = None
+
+    def _ensure_started(self):
+        if self._executor is not None:
+            return
+        # Spawn keeps workers free of the parent's Firebase/gRPC threads
+        context = multiprocessing.get_context('spawn')
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,)
+        )
+        threading.Thread(target=self._drain_progress, daemon=True).start()
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, stage, progress = self._progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job and job['status'] in ('queued', 'running'):
+                    job.update({
+                        'status': 'running',
+                        'stage': stage,
+                        'progress': progress,
+                        'updatedAt': time.time()
+                    })
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job['status'] in ('done', 'failed') and job['updatedAt'] < cutoff]:
+            del self._jobs[job_id]
+
+    def _pending(self):
+        return sum(1 for job in self._jobs.values() if job['status'] in ('queued', 'running'))
+
+    def pending_count(self):
+        """Number of jobs queued or running"""
+        with self._lock:
+            return self._pending()
+
+    def _reserve(self, count):
+        """Add `count` queued jobs to the table, or raise QueueFullError if they don't all fit"""
+        with self._lock:
+            self._prune()
+            pending = self._pending()
+            if pending + count > self.max_pending:
+                raise QueueFullError(f'{pending} jobs already pending')
+            self._ensure_started()
+
+            job_ids = []
+            now = time.time()
+            for _ in range(count):
+                job_id = uuid.uuid4().hex
+                self._jobs[job_id] = {
+                    'id': job_id,
+                    'status': 'queued',
+                    'stage': 'queued',
+                    'progress': 0.0,
+                    'result': None,
+                    'error': None,
+                    'createdAt': now,
+                    'updatedAt': now
+                }
+                job_ids.append(job_id)
+            return job_ids
+
+    def _start(self, job_id, func, args, on_done=None):
+        future = self._executor.submit(_run_job, job_id, func, args)
+        future.add_done_callback(lambda f: self._finish(job_id, f, on_done))
+        return future
+
+    def submit(self, func, *args, on_done=None):
+        """
+        Queue `func(*args)` on the process pool
+
+        Args:
+            func: Picklable top-level function
+            on_done: Optional callback(job) run in the parent once the job finishes
+
+        Returns:
+            str: Job id
+        """
+        job_id, = self._reserve(1)
+        self._start(job_id, func, args, on_done)
+        return job_id
+
+    def map(self, func, *iterables):
+        """
+        Run `func` over the iterables as jobs and wait for all results, in order
+
+        The calls count against max_pending like submitted jobs; QueueFullError is
+        raised, and nothing is queued, if they don't all fit.
+        """
+        calls = list(zip(*iterables))
+        job_ids = self._reserve(len(calls))
+        futures = [self._start(job_id, func, args) for job_id, args in zip(job_ids, calls)]
+        return [future.result() for future in futures]
+
+    def _finish(self, job_id, future, on_done):
+        try:
+            result = future.result()
+            update = {'status': 'done', 'stage': 'done', 'progress': 1.0, 'result': result}
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            update = {'status': 'failed', 'stage': 'failed', 'error': str(e)}
+        update['updatedAt'] = time.time()
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(update)
+            snapshot = dict(job)
+
+        if on_done is not None:
+            try:
+                on_done(snapshot)
+            except Exception as e:
+                print(f"Job {job_id} callback error: {e}")
+
+    def get(self, job_id):
+        """Return a snapshot of the job's state, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
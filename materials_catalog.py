@@ -0,0 +1,150 @@
+"""
+In-process materials catalog.
+
+Keeps the small, rarely changing `materials` collection in memory, indexed
+by name and by (name, color hex), so pricing needs no database reads. A
+Firestore on_snapshot listener keeps it current; if the listener can't be
+started, or later stops, the catalog is re-read whenever it is older than
+its TTL.
+"""
+
+import threading
+import time
+
+
+class MaterialsCatalog:
+    """
+    Materials indexed by name and (name, color hex), kept current from Firestore
+
+    Args:
+        on_read: Optional callable given the seconds each full collection read took
+    """
+
+    def __init__(self, db, collection='materials', ttl=300, on_read=None):
+        self.db = db
+        self.collection = collection
+        self.ttl = ttl
+        self.on_read = on_read
+        self.version = 0
+        self.updated_at = None
+        self.listening = False
+        self._by_name = {}
+        self._color_prices = {}
+        self._lock = threading.Lock()
+        # Held through the first load, so concurrent first requests wait for the index
+        self._load_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._refreshing = False
+        self._watch = None
+
+    def _index(self, docs):
+        """Rebuild both indexes from material documents"""
+        by_name = {}
+        color_prices = {}
+        for doc in docs:
+            material = doc.to_dict()
+            name = material.get('name')
+            if not name:
+                continue
+            by_name[name] = material
+            base_price = float(material.get('price', 0.05))
+            for color in material.get('colors') or []:
+                # Colors are either plain hex strings or {'hex', 'price'} overrides
+                if isinstance(color, dict) and color.get('hex'):
+                    color_prices[(name, color['hex'])] = float(color.get('price', base_price))
+
+        with self._lock:
+            self._by_name = by_name
+            self._color_prices = color_prices
+            self.version += 1
+            self.updated_at = time.time()
+        print(f"Materials catalog: {len(by_name)} materials (v{self.version})")
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        try:
+            self._index(col_snapshot)
+        except Exception as e:
+            self._listener_failed(e)
+
+    def _listener_failed(self, reason):
+        """Fall back to TTL refreshes once the listener has stopped delivering snapshots"""
+        if self.listening:
+            print(f"Materials catalog listener stopped, using {self.ttl}s TTL: {reason}")
+        self.listening = False
+        self._watch = None
+
+    def refresh(self):
+        """Re-read the whole collection"""
+        started = time.perf_counter()
+        docs = list(self.db.collection(self.collection).stream())
+        if self.on_read is not None:
+            self.on_read(time.perf_counter() - started)
+        self._index(docs)
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Materials catalog refresh error: {e}")
+        finally:
+            self._refreshing = False
+
+    def _load(self):
+        """Start the listener (or poll once) and wait for the first index"""
+        if self._watch is None:
+            try:
+                self._watch = self.db.collection(self.collection).on_snapshot(self._on_snapshot)
+                self.listening = True
+            except Exception as e:
+                print(f"Materials catalog listener unavailable, using {self.ttl}s TTL: {e}")
+        if not self.listening:
+            self.refresh()
+        else:
+            # The listener delivers its first snapshot asynchronously
+            deadline = time.time() + 10
+            while self.updated_at is None and time.time() < deadline:
+                time.sleep(0.05)
+            if self.updated_at is None:
+                self.refresh()
+
+    def ensure_loaded(self):
+        """Load the catalog on first use and keep it fresh afterwards"""
+        if not self._loaded.is_set():
+            with self._load_lock:
+                if not self._loaded.is_set():
+                    self._load()
+                    self._loaded.set()
+            return
+
+        # A Firestore watch that hits an unrecoverable error closes without telling its callback
+        watch = self._watch
+        if self.listening and watch is not None and getattr(watch, 'is_active', True) is False:
+            self._listener_failed('watch is no longer active')
+
+        # Without a listener, serve the current index and refresh stale data off the request path
+        if not self.listening and not self._refreshing and time.time() - (self.updated_at or 0) > self.ttl:
+            self._refreshing = True
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def get(self, name):
+        """Return the material document for `name`, or None"""
+        self.ensure_loaded()
+        return self._by_name.get(name)
+
+    def price_per_gram(self, name, color=None):
+        """Price per gram for a material, using the color's override if it has one; None if unknown"""
+        self.ensure_loaded()
+        material = self._by_name.get(name)
+        if material is None:
+            return None
+        price = self._color_prices.get((name, color)) if color else None
+        if price is None:
+            price = float(material.get('price', 0.05))
+        return price
+
+    def stop(self):
+        """Detach the Firestore listener"""
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        self.listening = False
@@ -0,0 +1,153 @@
+"""
+One mesh, loaded once, shared by every quoting path.
+
+MeshAnalysis wraps the triangles of one STL. Each derived property
+(volume, area, bounds, welded topology, validation, connected components,
+slices per layer height, weights, support) is computed the first time it is asked
+for and memoized. The primary estimator, the slicer fallback and the
+emergency estimate can then hand the same object around, and a request
+never parses the same bytes twice.
+"""
+
+from functools import cached_property
+
+import numpy as np
+
+from mesh_validation import REPAIR_MAX_FACES, REPAIR_SECONDS, check_welded, validate_welded, weld_vertices
+from slicer import slice_layers
+from stl_analysis import UNIT_SCALE_MM, analyze_triangles, load_triangles
+from support import estimate_support
+from weight_engine import estimate_weight_from_triangles
+
+
+class MeshAnalysis:
+    """
+    Lazily analyzed triangle mesh
+
+    Args:
+        triangles: (n, 3, 3) triangle vertices in file units (may be memory-mapped)
+        units: Units the file was modelled in ('mm', 'cm' or 'in')
+        path: File the triangles came from, for consumers that need the raw bytes
+        stl_format: 'binary' or 'ascii', if known
+        stats: analyze_triangles-style statistics (in mm) already gathered elsewhere,
+               such as while the upload streamed in
+    """
+
+    def __init__(self, triangles, units='mm', path=None, stl_format=None, stats=None):
+        self.triangles = triangles
+        self.units = units
+        self.path = path
+        self.stl_format = stl_format
+        self.scale = UNIT_SCALE_MM.get(units, 1.0)
+        if stats is not None:
+            self.__dict__['stats'] = stats
+        self._slices = {}
+        self._checks = {}
+        self._weights = {}
+        self._supports = {}
+
+    @classmethod
+    def load(cls, stl_file_path, units='mm', stats=None):
+        """Open an STL file (binary files are memory-mapped, not read up front)"""
+        triangles, stl_format = load_triangles(stl_file_path)
+        return cls(triangles, units=units, path=stl_file_path, stl_format=stl_format, stats=stats)
+
+    @classmethod
+    def coerce(cls, source, units='mm'):
+        """Return `source` if it is already a MeshAnalysis, otherwise load it as a path"""
+        return source if isinstance(source, cls) else cls.load(source, units)
+
+    @property
+    def triangle_count(self):
+        return len(self.triangles)
+
+    @cached_property
+    def stats(self):
+        """Triangle count, volume (mm³), surface area (mm²), bounds and extents (mm)"""
+        return analyze_triangles(self.triangles, scale=self.scale)
+
+    @property
+    def volume_mm3(self):
+        return self.stats['volume_mm3']
+
+    @property
+    def surface_area_mm2(self):
+        return self.stats['surface_area_mm2']
+
+    @property
+    def bounds(self):
+        return self.stats['bounds']
+
+    @property
+    def extents(self):
+        return self.stats['extents']
+
+    @cached_property
+    def welded(self):
+        """(vertices, faces) with bit-identical vertices merged"""
+        return weld_vertices(self.triangles)
+
+    @cached_property
+    def validation(self):
+        """Defect report in file units (see mesh_validation.validate_welded)"""
+        return validate_welded(*self.welded)
+
+    @property
+    def is_watertight(self):
+        return self.validation['watertight']
+
+    @cached_property
+    def components(self):
+        """Number of connected pieces (triangles sharing a vertex are connected)"""
+        vertices, faces = self.welded
+        if len(faces) == 0:
+            return 0
+        # Min-label propagation with pointer jumping: each round every face pulls its
+        # vertices (and their current roots) down to its smallest label
+        labels = np.arange(len(vertices))
+        flat = faces.ravel()
+        while True:
+            face_min = np.repeat(labels[faces].min(axis=1), 3)
+            updated = labels.copy()
+            np.minimum.at(updated, flat, face_min)
+            np.minimum.at(updated, labels[flat], face_min)
+            while True:
+                jumped = updated[updated]
+                if np.array_equal(jumped, updated):
+                    break
+                updated = jumped
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        return int(len(np.unique(labels[flat])))
+
+    def check(self, repair=True, max_faces=REPAIR_MAX_FACES, time_budget=REPAIR_SECONDS):
+        """Validation report in mm, repaired within budget if needed (see mesh_validation.check_welded)"""
+        key = (repair, max_faces, time_budget)
+        if key not in self._checks:
+            self._checks[key] = check_welded(*self.welded, scale=self.scale, repair=repair,
+                                             max_faces=max_faces, time_budget=time_budget,
+                                             report=self.validation)
+        return self._checks[key]
+
+    def slices(self, layer_height):
+        """Layer cross-sections at `layer_height` mm (see slicer.slice_layers)"""
+        if layer_height not in self._slices:
+            self._slices[layer_height] = slice_layers(self.triangles, layer_height, scale=self.scale)
+        return self._slices[layer_height]
+
+    def estimate_weight(self, infill_percentage, material_density, **settings):
+        """In-process weight estimate (see weight_engine.estimate_weight_from_triangles)"""
+        key = (infill_percentage, material_density, tuple(sorted(settings.items())))
+        if key not in self._weights:
+            self._weights[key] = estimate_weight_from_triangles(self.triangles, infill_percentage, material_density,
+                                                                scale=self.scale, **settings)
+        return self._weights[key]
+
+    def estimate_support(self, rotation=None, **settings):
+        """Support volume in the orientation given by `rotation` (see support.estimate_support)"""
+        orientation = None if rotation is None else tuple(np.asarray(rotation, dtype=np.float64).ravel().tolist())
+        key = (orientation, tuple(sorted(settings.items())))
+        if key not in self._supports:
+            self._supports[key] = estimate_support(self.triangles, scale=self.scale, rotation=rotation, **settings)
+        return self._supports[key]
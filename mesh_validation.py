@@ -0,0 +1,345 @@
+"""
+Mesh validation and bounded repair.
+
+Vertices are welded by sorting their raw float bits, and every edge is
+hashed to a single int64 key, so boundary (open), non-manifold and
+inconsistently wound edges all fall out of two sorts over the edge list,
+with no mesh object or graph library. Repair (degenerate faces, winding,
+inversion, hole filling) only runs on meshes under a face budget, and
+stops between steps once its time budget is spent.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+from stl_analysis import CHUNK_TRIANGLES, UNIT_SCALE_MM, TriangleStats, load_triangles
+
+# Repair is skipped above this many faces, and stops once this many seconds have passed
+REPAIR_MAX_FACES = 200000
+REPAIR_SECONDS = 2.0
+
+# Open or non-manifold edges (as a fraction of all edges) a volume is still "approximate" with
+APPROXIMATE_DEFECT_FRACTION = 0.01
+
+
+def weld_vertices(triangles):
+    """
+    Merge bit-identical vertices of a triangle soup
+
+    Returns:
+        tuple: ((v, 3) float32 unique vertices, (n, 3) int64 face vertex indices)
+    """
+    # Adding 0.0 turns -0.0 into 0.0 so both weld together
+    points = np.asarray(triangles, dtype=np.float32).reshape(-1, 3) + np.float32(0.0)
+    if len(points) == 0:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64)
+    bits = points.view(np.uint32)
+    order = np.lexsort((bits[:, 2], bits[:, 1], bits[:, 0]))
+    sorted_bits = bits[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any(sorted_bits[1:] != sorted_bits[:-1], axis=1)
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(first) - 1
+    return points[order[first]], inverse.reshape(-1, 3)
+
+
+def _directed_edges(faces):
+    """(3n, 2) directed edges in face winding order, edge k belonging to face k // 3"""
+    return np.stack([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]], axis=1).reshape(-1, 2)
+
+
+def _degenerate_faces(vertices, faces):
+    """Mask of faces with a repeated vertex or (numerically) zero area"""
+    degenerate = ((faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) |
+                  (faces[:, 2] == faces[:, 0]))
+    if len(vertices) == 0:
+        return degenerate
+    extent = float(np.ptp(vertices, axis=0).max()) or 1.0
+    tolerance = (extent * 1e-9) ** 2
+    for start in range(0, len(faces), CHUNK_TRIANGLES):
+        corners = vertices[faces[start:start + CHUNK_TRIANGLES]].astype(np.float64)
+        cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        degenerate[start:start + CHUNK_TRIANGLES] |= np.einsum('ij,ij->i', cross, cross) <= tolerance
+    return degenerate
+
+
+def _edge_topology(faces, vertex_count):
+    """
+    Hash edges and classify them
+
+    Returns:
+        dict: Undirected edge keys (sorted), their use counts, and per directed
+              edge whether another face uses it in the same direction
+    """
+    directed = _directed_edges(faces)
+    low = np.minimum(directed[:, 0], directed[:, 1])
+    high = np.maximum(directed[:, 0], directed[:, 1])
+    undirected_keys, undirected_inverse, counts = np.unique(
+        low * vertex_count + high, return_inverse=True, return_counts=True)
+
+    # A consistently wound closed surface uses each directed edge exactly once
+    directed_keys, directed_inverse, directed_counts = np.unique(
+        directed[:, 0] * vertex_count + directed[:, 1], return_inverse=True, return_counts=True)
+
+    return {
+        'directed': directed,
+        'keys': undirected_keys,
+        'counts': counts,
+        'edge_uses': counts[undirected_inverse],
+        'same_direction': directed_counts[directed_inverse] > 1,
+    }
+
+
+def validate_welded(vertices, faces):
+    """
+    Defect report for an indexed mesh (see validate_triangles)
+    """
+    face_count = len(faces)
+    degenerate = _degenerate_faces(vertices, faces)
+    topology = _edge_topology(faces, max(len(vertices), 1))
+    counts = topology['counts']
+
+    boundary_edges = int((counts == 1).sum())
+    non_manifold_edges = int((counts > 2).sum())
+    inconsistent_edges = int(np.unique(topology['directed'][topology['same_direction']], axis=0).shape[0]) \
+        if topology['same_direction'].any() else 0
+    flipped = topology['same_direction'].reshape(-1, 3).any(axis=1)
+
+    stats = TriangleStats()
+    stats.add(vertices[faces])
+    signed_volume = stats.signed_volume
+    extents = stats.result()['extents']
+
+    edge_count = len(counts)
+    watertight = face_count > 0 and boundary_edges == 0 and non_manifold_edges == 0
+    winding_consistent = inconsistent_edges == 0
+    defect_fraction = (boundary_edges + non_manifold_edges) / edge_count if edge_count else 1.0
+    if watertight and winding_consistent:
+        reliability = 'exact'
+    elif winding_consistent and defect_fraction <= APPROXIMATE_DEFECT_FRACTION:
+        reliability = 'approximate'
+    else:
+        reliability = 'unreliable'
+
+    return {
+        'triangle_count': face_count,
+        'vertex_count': len(vertices),
+        'edge_count': edge_count,
+        'boundary_edges': boundary_edges,
+        'non_manifold_edges': non_manifold_edges,
+        'inconsistent_edges': inconsistent_edges,
+        'flipped_faces': int(flipped.sum()),
+        'degenerate_faces': int(degenerate.sum()),
+        'inverted': bool(signed_volume < 0),
+        'watertight': bool(watertight),
+        'winding_consistent': bool(winding_consistent),
+        'volume_mm3': abs(float(signed_volume)),
+        'extents': extents,
+        'reliability': reliability,
+    }
+
+
+def validate_triangles(triangles):
+    """
+    Check a triangle soup for the defects that make its volume unreliable
+
+    Returns:
+        dict: Counts of open (boundary), non-manifold and inconsistently wound edges,
+              flipped and degenerate faces, plus 'watertight', 'volume_mm3' and
+              'extents' (in file units) and a 'reliability' of 'exact', 'approximate'
+              or 'unreliable'
+    """
+    vertices, faces = weld_vertices(triangles)
+    return validate_welded(vertices, faces)
+
+
+def _fix_winding(faces, deadline):
+    """Flip faces so every component agrees with its first face; None if out of time"""
+    topology = _edge_topology(faces, int(faces.max()) + 1)
+    directed = topology['directed']
+    low = np.minimum(directed[:, 0], directed[:, 1])
+    high = np.maximum(directed[:, 0], directed[:, 1])
+    order = np.lexsort((high, low))
+    sorted_low, sorted_high = low[order], high[order]
+
+    # Pairs of consecutive sorted entries sharing a manifold edge
+    shared = (sorted_low[1:] == sorted_low[:-1]) & (sorted_high[1:] == sorted_high[:-1])
+    shared &= topology['edge_uses'][order[1:]] == 2
+    first, second = order[:-1][shared], order[1:][shared]
+    # Neighbours agree when they traverse the shared edge in opposite directions
+    flip_relative = directed[first, 0] == directed[second, 0]
+
+    face_a, face_b = first // 3, second // 3
+    neighbours = np.concatenate([face_a, face_b])
+    others = np.concatenate([face_b, face_a])
+    relative = np.concatenate([flip_relative, flip_relative])
+    by_face = np.argsort(neighbours, kind='stable')
+    neighbours, others, relative = neighbours[by_face], others[by_face], relative[by_face]
+    starts = np.searchsorted(neighbours, np.arange(len(faces) + 1))
+
+    flip = np.zeros(len(faces), dtype=bool)
+    visited = np.zeros(len(faces), dtype=bool)
+    others = others.tolist()
+    relative = relative.tolist()
+    starts = starts.tolist()
+    steps = 0
+    for seed in range(len(faces)):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = deque([seed])
+        while queue:
+            face = queue.popleft()
+            for i in range(starts[face], starts[face + 1]):
+                other = others[i]
+                if not visited[other]:
+                    visited[other] = True
+                    flip[other] = flip[face] ^ relative[i]
+                    queue.append(other)
+            steps += 1
+            if steps % 10000 == 0 and time.perf_counter() > deadline:
+                return None
+
+    faces = faces.copy()
+    faces[flip] = faces[flip][:, ::-1]
+    return faces
+
+
+def _fill_holes(vertices, faces, deadline):
+    """Close each simple boundary loop with a fan around its centroid; None if out of time"""
+    topology = _edge_topology(faces, len(vertices))
+    boundary = topology['directed'][topology['edge_uses'] == 1]
+    # Walking a hole runs against the winding of the faces around it. A vertex
+    # where two holes touch has several successors; each walk still closes.
+    successors = {}
+    for start, end in boundary.tolist():
+        successors.setdefault(end, []).append(start)
+
+    new_vertices = []
+    new_faces = []
+    vertex_count = len(vertices)
+    while successors:
+        if time.perf_counter() > deadline:
+            return None
+        origin = next(iter(successors))
+        loop = [origin]
+        current = origin
+        while True:
+            following = successors.get(current)
+            if not following:
+                break
+            previous, current = current, following.pop()
+            if not following:
+                del successors[previous]
+            if current == origin:
+                break
+            loop.append(current)
+        if current != origin or len(loop) < 3:
+            continue  # Open chain along non-manifold edges; leave it
+        centroid_index = vertex_count + len(new_vertices)
+        new_vertices.append(vertices[loop].mean(axis=0))
+        for a, b in zip(loop, loop[1:] + loop[:1]):
+            new_faces.append((a, b, centroid_index))
+
+    if not new_faces:
+        return vertices, faces
+    return (np.concatenate([vertices, np.array(new_vertices, dtype=vertices.dtype)]),
+            np.concatenate([faces, np.array(new_faces, dtype=faces.dtype)]))
+
+
+def repair_welded(vertices, faces, max_faces=REPAIR_MAX_FACES, time_budget=REPAIR_SECONDS):
+    """
+    Repair an indexed mesh within a size and time budget
+
+    Steps run in order (drop degenerate faces, unify winding, fix inversion,
+    fill holes); if the budget runs out the last completed state is kept.
+
+    Returns:
+        tuple: ((n, 3, 3) repaired triangles or None if repair was skipped,
+                log dict with 'attempted', 'steps', 'timedOut' and the new 'report')
+    """
+    if len(faces) == 0 or len(faces) > max_faces:
+        return None, {'attempted': False, 'steps': [], 'timedOut': False,
+                      'reason': f'{len(faces)} faces is outside the repair budget of {max_faces}'}
+
+    deadline = time.perf_counter() + time_budget
+    steps = []
+    timed_out = False
+
+    keep = ~_degenerate_faces(vertices, faces)
+    if not keep.all():
+        faces = faces[keep]
+        steps.append('remove_degenerate')
+
+    if len(faces):
+        fixed = _fix_winding(faces, deadline)
+        if fixed is None:
+            timed_out = True
+        else:
+            if not np.array_equal(fixed, faces):
+                steps.append('fix_winding')
+            faces = fixed
+
+    if not timed_out and len(faces):
+        stats = TriangleStats()
+        stats.add(vertices[faces])
+        if stats.signed_volume < 0:
+            faces = faces[:, ::-1].copy()
+            steps.append('fix_inversion')
+
+    if not timed_out and len(faces):
+        filled = _fill_holes(vertices, faces, deadline)
+        if filled is None:
+            timed_out = True
+        elif len(filled[1]) != len(faces):
+            vertices, faces = filled
+            steps.append('fill_holes')
+
+    report = validate_welded(vertices, faces)
+    return vertices[faces], {'attempted': True, 'steps': steps, 'timedOut': timed_out,
+                             'report': report}
+
+
+def repair_triangles(triangles, max_faces=REPAIR_MAX_FACES, time_budget=REPAIR_SECONDS):
+    """Repair a triangle soup within a size and time budget (see repair_welded)"""
+    vertices, faces = weld_vertices(triangles)
+    return repair_welded(vertices, faces, max_faces=max_faces, time_budget=time_budget)
+
+
+def check_welded(vertices, faces, scale=1.0, repair=True, max_faces=REPAIR_MAX_FACES,
+                 time_budget=REPAIR_SECONDS, report=None):
+    """
+    Validate an indexed mesh and, if its volume isn't exact, try a bounded repair
+
+    Args:
+        scale: Factor converting file units to mm
+        report: validate_welded result for this mesh, if already computed
+
+    Returns:
+        dict: validate_welded report in mm units, with 'repair' details when a repair
+              was attempted and reliability 'repaired' when it produced a closed mesh
+    """
+    report = dict(report) if report is not None else validate_welded(vertices, faces)
+
+    if repair and report['reliability'] != 'exact':
+        _, log = repair_welded(vertices, faces, max_faces=max_faces, time_budget=time_budget)
+        repaired_report = log.pop('report', None)
+        report['repair'] = log
+        if repaired_report and repaired_report['watertight'] and repaired_report['winding_consistent']:
+            report['volume_mm3'] = repaired_report['volume_mm3']
+            report['reliability'] = 'repaired'
+
+    report['volume_mm3'] *= scale ** 3
+    report['extents'] = [extent * scale for extent in report['extents']]
+    return report
+
+
+def check_stl(stl_file_path, units='mm', repair=True, max_faces=REPAIR_MAX_FACES,
+              time_budget=REPAIR_SECONDS):
+    """Validate an STL file and repair it within budget if needed (see check_welded)"""
+    triangles, _ = load_triangles(stl_file_path)
+    vertices, faces = weld_vertices(triangles)
+    return check_welded(vertices, faces, scale=UNIT_SCALE_MM.get(units, 1.0), repair=repair,
+                        max_faces=max_faces, time_budget=time_budget)
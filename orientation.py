@@ -0,0 +1,297 @@
+"""
+Print-orientation search.
+
+Turning a part about the build plate's Z axis changes nothing that matters
+for printing, so an orientation is just the model direction that ends up
+pointing up. Candidate directions are spread evenly over the sphere, and
+each is scored from every face normal at once:
+
+- Z height: span of the vertices projected onto the direction
+- overhang area: faces that lean further than OVERHANG_ANGLE past vertical
+  (and don't rest on the plate)
+- support volume: each overhang's footprint times its height above the
+  plate, an upper bound that ignores support landing on the part itself
+- plate contact: area of faces lying flat on the plate, without which a
+  part balances on an edge or corner
+
+Directions are scored in chunks so the (faces × directions) intermediates
+stay small. Large meshes rank every candidate on an area-weighted sample of
+faces, then score the best few on the full mesh; the ranking pass is spread
+over a process pool that reads the face data from shared memory instead of
+pickling it per task.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from jobs import in_job_worker
+from mesh_analysis import MeshAnalysis
+
+# Candidate up-directions evaluated per model (0 disables the search)
+ORIENTATION_CANDIDATES = int(os.environ.get('ORIENTATION_CANDIDATES', 500))
+
+# Processes scoring candidates; 0 or 1 scores them in the calling process
+ORIENTATION_WORKERS = int(os.environ.get('ORIENTATION_WORKERS', os.cpu_count() or 1))
+
+# Below this many face × direction evaluations the pool costs more than it saves
+POOL_MIN_EVALUATIONS = 20_000_000
+
+# Degrees past vertical a surface can lean before it needs support
+OVERHANG_ANGLE = 45.0
+
+# Faces whose centre is within this many mm of the plate rest on it...
+PLATE_TOLERANCE_MM = 0.5
+
+# ...and count as plate contact if they face down within this many degrees
+CONTACT_ANGLE = 5.0
+
+# Score = support mm³ + OVERHANG_WEIGHT_MM × overhang mm² + HEIGHT_WEIGHT_MM2 × height mm
+#         - CONTACT_WEIGHT_MM × contact mm² (lower is better).
+# Overhangs also cost surface finish (about a 1 mm interface layer); every mm of
+# height adds layer changes, worth roughly a 10 mm² slab of material each; plate
+# contact saves the brim or raft a poorly seated part needs.
+OVERHANG_WEIGHT_MM = 1.0
+HEIGHT_WEIGHT_MM2 = 10.0
+CONTACT_WEIGHT_MM = 1.0
+
+# Larger meshes are ranked on this many area-weighted sample faces...
+SAMPLE_FACES = 50_000
+
+# ...and this many of the best-ranked candidates are then scored on every face
+REFINE_CANDIDATES = 8
+
+# Directions scored per NumPy pass
+CHUNK_DIRECTIONS = 8
+
+_pool = None
+
+
+def candidate_directions(count):
+    """
+    `count` up-directions: the six axis directions (as uploaded first), then a Fibonacci sphere
+
+    Returns:
+        ndarray: (count, 3) unit vectors
+    """
+    axes = np.array([[0, 0, 1], [0, 0, -1], [1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0]], dtype=float)
+    if count <= len(axes):
+        return axes[:max(count, 1)]
+    n = count - len(axes)
+    i = np.arange(n) + 0.5
+    z = 1.0 - 2.0 * i / n
+    r = np.sqrt(1.0 - z * z)
+    theta = math.pi * (3.0 - math.sqrt(5.0)) * i
+    sphere = np.column_stack([r * np.cos(theta), r * np.sin(theta), z])
+    return np.vstack([axes, sphere])
+
+
+def rotation_to_up(direction):
+    """Rotation matrix that turns `direction` to +Z (the smallest such rotation)"""
+    u = np.asarray(direction, dtype=float)
+    u = u / np.linalg.norm(u)
+    z = np.array([0.0, 0.0, 1.0])
+    axis = np.cross(u, z)
+    s = np.linalg.norm(axis)
+    c = float(u @ z)
+    if s < 1e-12:
+        # Already up, or upside down (half a turn about X)
+        return np.eye(3) if c > 0 else np.diag([1.0, -1.0, -1.0])
+    k = axis / s
+    K = np.array([[0, -k[2], k[1]], [k[2], 0, -k[0]], [-k[1], k[0], 0]])
+    return np.eye(3) + s * K + (1 - c) * (K @ K)
+
+
+def face_data(mesh, sample=None):
+    """
+    Per-face inputs for scoring, in file units
+
+    Args:
+        mesh: MeshAnalysis
+        sample: If set and the mesh has more faces, draw this many faces with
+                probability proportional to area instead (each standing for an
+                equal share of the surface), and keep only their vertices
+
+    Returns:
+        dict: 'vertices' (welded, float32), 'normals' (unit), 'areas' and
+              'centroids' (float32), degenerate faces dropped
+    """
+    vertices, faces = mesh.welded
+    triangles = vertices[faces]
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    doubled = np.linalg.norm(cross, axis=1)
+    keep = np.flatnonzero(doubled > 0)
+    areas = doubled[keep] / 2.0
+
+    if sample and len(keep) > sample:
+        # Fixed seed: the same upload always gets the same orientation
+        rng = np.random.default_rng(0)
+        picked = rng.choice(len(keep), size=sample, p=areas / areas.sum())
+        areas = np.full(sample, areas.sum() / sample)
+        keep = keep[picked]
+        vertices = vertices[np.unique(faces[keep])]
+
+    return {
+        'vertices': np.ascontiguousarray(vertices, dtype=np.float32),
+        'normals': np.ascontiguousarray(cross[keep] / doubled[keep, None], dtype=np.float32),
+        'areas': np.ascontiguousarray(areas, dtype=np.float32),
+        'centroids': np.ascontiguousarray(triangles[keep].mean(axis=1), dtype=np.float32),
+    }
+
+
+def score_directions(data, directions, scale=1.0):
+    """
+    Height, overhang area, support volume and plate contact for each direction
+
+    Args:
+        data: face_data() arrays
+        directions: (k, 3) unit up-directions
+        scale: File units to mm
+
+    Returns:
+        ndarray: (k, 4) height (mm), overhang area (mm²), support volume (mm³)
+                 and plate contact area (mm²)
+    """
+    directions = np.asarray(directions, dtype=np.float32).reshape(-1, 3)
+    limit = np.float32(math.sin(math.radians(OVERHANG_ANGLE)))
+    flat = np.float32(math.cos(math.radians(CONTACT_ANGLE)))
+    tolerance = np.float32(PLATE_TOLERANCE_MM / scale)
+    areas = data['areas'][:, None]
+    results = np.empty((len(directions), 4))
+
+    for start in range(0, len(directions), CHUNK_DIRECTIONS):
+        U = directions[start:start + CHUNK_DIRECTIONS].T
+        heights = data['vertices'] @ U
+        plate = heights.min(axis=0)
+        results[start:start + U.shape[1], 0] = heights.max(axis=0) - plate
+        del heights
+
+        # Height of every face centre above the plate, and how far each normal points down
+        above = data['centroids'] @ U
+        above -= plate
+        down = data['normals'] @ U
+        np.negative(down, out=down)
+        overhang = (down > limit) & (above > tolerance)
+        footprint = np.where(overhang, areas * down, 0)
+        results[start:start + U.shape[1], 1] = np.where(overhang, areas, 0).sum(axis=0)
+        results[start:start + U.shape[1], 2] = (footprint * above).sum(axis=0)
+        contact = (down > flat) & (above <= tolerance)
+        results[start:start + U.shape[1], 3] = np.where(contact, areas, 0).sum(axis=0)
+
+    return results * np.array([scale, scale ** 2, scale ** 3, scale ** 2])
+
+
+def _score_shared(spec, directions, scale):
+    """Pool task: score directions against face data in shared memory"""
+    blocks = []
+    try:
+        data = {}
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            data[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return score_directions(data, directions, scale)
+    finally:
+        data = None
+        for block in blocks:
+            block.close()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # Spawn keeps workers free of the parent's Firebase/gRPC threads (as in jobs.py)
+        _pool = ProcessPoolExecutor(max_workers=ORIENTATION_WORKERS,
+                                    mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _score_in_pool(data, directions, scale):
+    blocks = []
+    try:
+        spec = {}
+        for name, array in data.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            spec[name] = (block.name, array.shape, array.dtype.str)
+        chunks = np.array_split(directions, min(ORIENTATION_WORKERS, len(directions)))
+        futures = [_get_pool().submit(_score_shared, spec, chunk, scale) for chunk in chunks]
+        return np.vstack([future.result() for future in futures])
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _use_pool(face_count, direction_count):
+    # Background quote jobs already run one per core
+    return (ORIENTATION_WORKERS > 1 and not in_job_worker()
+            and face_count * direction_count >= POOL_MIN_EVALUATIONS)
+
+
+def _scores(metrics):
+    return (metrics[:, 2] + OVERHANG_WEIGHT_MM * metrics[:, 1] + HEIGHT_WEIGHT_MM2 * metrics[:, 0]
+            - CONTACT_WEIGHT_MM * metrics[:, 3])
+
+
+def _summary(direction, metrics, score):
+    height, overhang, support, contact = (float(value) for value in metrics)
+    return {
+        'up': [round(float(value), 4) for value in direction],
+        'rotation': np.round(rotation_to_up(direction), 6).tolist(),
+        'heightMm': round(height, 2),
+        'overhangAreaMm2': round(overhang, 1),
+        'supportVolumeMm3': round(support, 1),
+        'contactAreaMm2': round(contact, 1),
+        'score': round(float(score), 1),
+    }
+
+
+def optimize_orientation(source, units='mm', candidates=None):
+    """
+    Best print orientation among `candidates` up-directions
+
+    Args:
+        source: STL path or MeshAnalysis
+        candidates: Number of directions to try, defaults to ORIENTATION_CANDIDATES
+
+    Returns:
+        dict: The best orientation ('up' direction, 'rotation' matrix turning it to +Z,
+              heightMm, overhangAreaMm2, supportVolumeMm3, contactAreaMm2, score), the same metrics
+              'asUploaded', and how many 'candidates' were scored; None for a mesh without faces
+    """
+    mesh = MeshAnalysis.coerce(source, units)
+    if mesh.triangle_count == 0:
+        return None
+    candidates = ORIENTATION_CANDIDATES if candidates is None else candidates
+    directions = candidate_directions(candidates)
+
+    # Rank every candidate on a sample of the surface, then score the front-runners exactly
+    data = face_data(mesh, sample=SAMPLE_FACES)
+    metrics = None
+    if _use_pool(len(data['areas']) + len(data['vertices']), len(directions)):
+        try:
+            metrics = _score_in_pool(data, directions, mesh.scale)
+        except Exception as e:
+            print(f"Orientation pool failed, scoring in process: {e}")
+    if metrics is None:
+        metrics = score_directions(data, directions, mesh.scale)
+
+    exact = np.arange(len(directions))
+    if len(data['areas']) == SAMPLE_FACES:
+        ranked = np.argsort(_scores(metrics), kind='stable')[:REFINE_CANDIDATES]
+        exact = np.union1d(ranked, [0])
+        metrics[exact] = score_directions(face_data(mesh), directions[exact], mesh.scale)
+
+    scores = _scores(metrics)
+    # Ties keep the earliest candidate, so an already good upload isn't turned for nothing
+    best = int(exact[np.argmin(scores[exact])])
+    result = _summary(directions[best], metrics[best], scores[best])
+    result['asUploaded'] = _summary(directions[0], metrics[0], scores[0])
+    result['candidates'] = len(directions)
+    return result
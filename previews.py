@@ -0,0 +1,282 @@
+"""
+Decimated preview meshes for the browser viewer.
+
+Uploads are simplified to at most PREVIEW_MAX_TRIANGLES triangles and
+stored as quantized binary glTF (GLB), keyed by the SHA-256 of the STL, so
+the order page can fetch a small, immutable file instead of parsing the
+raw upload.
+
+Simplification is quadric-error vertex clustering (Lindstrom, "Out-of-core
+simplification of large polygonal models", 2000): vertices are bucketed
+into a uniform grid, each bucket collapses to the point minimizing the
+summed plane quadrics of its faces, and faces that collapse are dropped.
+Every step is a NumPy reduction, so a million-triangle model takes a
+second or two; the grid is refined until the triangle budget is met.
+"""
+
+import json
+import os
+import re
+import struct
+import tempfile
+import threading
+
+import numpy as np
+
+from mesh_analysis import MeshAnalysis
+
+PREVIEW_MAX_TRIANGLES = int(os.environ.get('PREVIEW_MAX_TRIANGLES', 50000))
+
+# Grid refinements tried before settling for the closest result under budget
+MAX_CLUSTER_PASSES = 6
+
+# Eigenvalues of a bucket's quadric below this fraction of its largest are treated as
+# zero, so flat and straight-edge buckets stay at their mean along the free directions
+QUADRIC_RCOND = 1e-3
+
+# Rotates the STL's +Z up to glTF's +Y up (-90° about X), as an x, y, z, w quaternion
+Z_UP_TO_Y_UP = [-0.7071067811865476, 0.0, 0.0, 0.7071067811865476]
+
+GLB_CONTENT_TYPE = 'model/gltf-binary'
+
+_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def face_quadrics(triangles):
+    """
+    Area-weighted plane quadric of every face: Q = n nᵀ and b = n d, with n·x + d = 0
+
+    Returns:
+        ndarray: (n, 12) with Q's nine entries then b
+    """
+    tri = triangles.astype(np.float64)
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]) / 2.0
+    areas = np.linalg.norm(normals, axis=1)
+    unit = np.divide(normals, areas[:, None], out=np.zeros_like(normals), where=areas[:, None] > 0)
+    offsets = -(unit * tri[:, 0]).sum(axis=1)
+    return np.concatenate([
+        (areas[:, None, None] * unit[:, :, None] * unit[:, None, :]).reshape(-1, 9),
+        areas[:, None] * unit * offsets[:, None],
+    ], axis=1)
+
+
+def cluster_vertices(triangles, cell_size, quadrics=None):
+    """
+    Collapse a triangle soup onto a grid of `cell_size` cells
+
+    Args:
+        quadrics: face_quadrics(triangles), if already computed
+
+    Returns:
+        tuple: (vertices, faces) of the simplified mesh
+    """
+    if quadrics is None:
+        quadrics = face_quadrics(triangles)
+    corners = triangles.reshape(-1, 3).astype(np.float64)
+    cells = np.floor((corners - corners.min(axis=0)) / cell_size).astype(np.int64)
+    # One integer key per cell: sorting those is far faster than unique rows
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, labels = np.unique(keys, return_inverse=True)
+    labels = labels.reshape(-1, 3)
+    count = int(labels.max()) + 1
+
+    # Sum each face's quadric into the buckets of its three corners
+    flat = labels.ravel()
+    sums = np.stack([sum(np.bincount(labels[:, corner], weights=quadrics[:, k], minlength=count)
+                         for corner in range(3))
+                     for k in range(quadrics.shape[1])], axis=1)
+    means = np.stack([np.bincount(flat, weights=corners[:, k], minlength=count) for k in range(3)], axis=1)
+    means /= np.bincount(flat, minlength=count)[:, None]
+
+    # Minimize the quadric around the bucket mean: x = m - A⁺(A m + b)
+    A = sums[:, :9].reshape(-1, 3, 3)
+    b = sums[:, 9:]
+    eigenvalues, eigenvectors = np.linalg.eigh(A)
+    keep = eigenvalues > QUADRIC_RCOND * eigenvalues[:, -1:].clip(min=1e-30)
+    inverse = np.where(keep, 1.0 / np.where(keep, eigenvalues, 1.0), 0.0)
+    residual = np.einsum('kij,kj->ki', A, means) + b
+    step = np.einsum('kij,kj,kj->ki', eigenvectors, inverse,
+                     np.einsum('kji,kj->ki', eigenvectors, residual))
+    vertices = means - step
+    # A placement that strays outside its neighbourhood is worse than the mean
+    strayed = np.abs(vertices - means).max(axis=1) > cell_size
+    vertices[strayed] = means[strayed]
+
+    faces = labels[(labels[:, 0] != labels[:, 1]) & (labels[:, 1] != labels[:, 2]) & (labels[:, 0] != labels[:, 2])]
+    ordered = np.sort(faces, axis=1)
+    _, first = np.unique((ordered[:, 0] * count + ordered[:, 1]) * count + ordered[:, 2], return_index=True)
+    faces = faces[np.sort(first)]
+
+    # Drop buckets no surviving face uses
+    used, faces = np.unique(faces, return_inverse=True)
+    return vertices[used], faces.reshape(-1, 3)
+
+
+def decimate(triangles, max_triangles=PREVIEW_MAX_TRIANGLES):
+    """
+    Simplify a mesh to at most `max_triangles` triangles
+
+    Returns:
+        tuple: (vertices, faces); meshes already under budget are only welded
+    """
+    triangles = np.asarray(triangles)
+    corners = triangles.reshape(-1, 3)
+    extent = float((corners.max(axis=0) - corners.min(axis=0)).max()) if len(corners) else 0.0
+    if len(triangles) <= max_triangles or extent == 0.0:
+        vertices, inverse = np.unique(corners, axis=0, return_inverse=True)
+        return vertices.astype(np.float64), inverse.reshape(-1, 3)
+
+    # A surface clustered at cell size h keeps roughly 3·area/h² triangles
+    # (the trace of a face's quadric is its area)
+    quadrics = face_quadrics(triangles)
+    area = float(quadrics[:, [0, 4, 8]].sum())
+    cell_size = max(np.sqrt(3.0 * area / max_triangles), extent * 1e-6)
+
+    best = None
+    for _ in range(MAX_CLUSTER_PASSES):
+        vertices, faces = cluster_vertices(triangles, cell_size, quadrics)
+        if len(faces) <= max_triangles:
+            if best is None or len(faces) > len(best[1]):
+                best = (vertices, faces)
+            if len(faces) >= 0.9 * max_triangles:
+                break
+            cell_size *= max(np.sqrt(len(faces) / max_triangles), 0.5)
+        else:
+            cell_size *= np.sqrt(len(faces) / max_triangles) * 1.02
+    if best is None:
+        # Keep coarsening until it fits
+        while len(faces) > max_triangles:
+            cell_size *= 1.5
+            vertices, faces = cluster_vertices(triangles, cell_size, quadrics)
+        best = (vertices, faces)
+    return best
+
+
+def encode_glb(vertices, faces):
+    """
+    Binary glTF with 16-bit quantized positions (KHR_mesh_quantization)
+
+    Positions are stored as unsigned shorts over the bounding box; the node's
+    translation, rotation and scale map them back to the model's coordinates
+    (in file units, Z up turned to glTF's Y up). Normals are left to the viewer.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    low = vertices.min(axis=0)
+    span = np.maximum(vertices.max(axis=0) - low, 1e-12)
+    quantized = np.round((vertices - low) / span * 65535).astype(np.uint16)
+
+    # Vertex attributes must be 4-byte aligned: pad each 6-byte position to 8
+    positions = np.zeros((len(vertices), 4), dtype=np.uint16)
+    positions[:, :3] = quantized
+    index_type, index_dtype = (5123, np.uint16) if len(vertices) <= 65535 else (5125, np.uint32)
+    indices = faces.astype(index_dtype).tobytes()
+    padding = b'\0' * (-len(indices) % 4)
+    binary = positions.tobytes() + indices + padding
+
+    x, y, z = low
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'outprint-previews'},
+        'extensionsUsed': ['KHR_mesh_quantization'],
+        'extensionsRequired': ['KHR_mesh_quantization'],
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{
+            'mesh': 0,
+            'translation': [float(x), float(z), float(-y)],
+            'rotation': Z_UP_TO_Y_UP,
+            'scale': (span / 65535).tolist(),
+        }],
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}, 'indices': 1, 'mode': 4}]}],
+        'buffers': [{'byteLength': len(binary)}],
+        'bufferViews': [
+            {'buffer': 0, 'byteOffset': 0, 'byteLength': positions.nbytes, 'byteStride': 8, 'target': 34962},
+            {'buffer': 0, 'byteOffset': positions.nbytes, 'byteLength': len(indices), 'target': 34963},
+        ],
+        'accessors': [
+            {'bufferView': 0, 'componentType': 5123, 'count': len(vertices), 'type': 'VEC3',
+             'min': quantized.min(axis=0).tolist(), 'max': quantized.max(axis=0).tolist()},
+            {'bufferView': 1, 'componentType': index_type, 'count': int(faces.size), 'type': 'SCALAR'},
+        ],
+    }
+    header = json.dumps(gltf, separators=(',', ':')).encode()
+    header += b' ' * (-len(header) % 4)
+    length = 12 + 8 + len(header) + 8 + len(binary)
+    return (struct.pack('<4sII', b'glTF', 2, length)
+            + struct.pack('<I4s', len(header), b'JSON') + header
+            + struct.pack('<I4s', len(binary), b'BIN\0') + binary)
+
+
+def is_content_hash(value):
+    """True for a lowercase hex SHA-256, the only names previews are stored under"""
+    return bool(_HASH_RE.match(value or ''))
+
+
+class PreviewStore:
+    """Directory of preview GLBs named by content hash, pruned oldest first past max_bytes"""
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, content_hash):
+        if not is_content_hash(content_hash):
+            raise ValueError('Invalid preview hash')
+        return os.path.join(self.cache_dir, f'{content_hash}.glb')
+
+    def exists(self, content_hash):
+        return is_content_hash(content_hash) and os.path.exists(self.path(content_hash))
+
+    def put(self, content_hash, data):
+        """Store a preview (write then rename, so readers never see a partial file)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(content_hash))
+        self.prune()
+
+    def prune(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.glb'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                    total -= size
+                except OSError:
+                    pass
+
+
+def generate_preview(stl_file_path, content_hash, cache_dir, max_bytes=512 * 1024 * 1024,
+                     max_triangles=PREVIEW_MAX_TRIANGLES):
+    """
+    Decimate an STL and store its GLB preview
+
+    Top-level so background job workers can run it.
+
+    Returns:
+        dict: hash, triangle counts before and after, and the GLB size in bytes
+    """
+    mesh = MeshAnalysis.load(stl_file_path)
+    vertices, faces = decimate(mesh.triangles, max_triangles)
+    data = encode_glb(vertices, faces)
+    PreviewStore(cache_dir, max_bytes).put(content_hash, data)
+    return {
+        'hash': content_hash,
+        'sourceTriangles': mesh.triangle_count,
+        'triangles': int(len(faces)),
+        'bytes': len(data),
+    }
@@ -0,0 +1,171 @@
+"""
+Print-time estimates for every printer preset.
+
+The extrusion path of a model is derived from its sliced layers the same
+way the slicer fallback derives volumes: wall loops from the contour
+lengths, and solid skin and sparse infill from their areas divided by the
+line width. Those path lengths are then turned into hours for every preset
+in printers-presets.js in one NumPy pass, so quoting time for all printers
+costs no more than quoting it for one.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from slicer import shell_and_infill_volumes
+
+PRESETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'printers-presets.js')
+
+# Fraction of a preset's avgSpeed each feature is printed at (outer walls and skins are slowed down)
+FEATURE_SPEED_FACTORS = {'walls': 0.5, 'skin': 0.8, 'infill': 1.0}
+
+# Travel moves, retractions and acceleration as a fraction of extrusion time
+TRAVEL_OVERHEAD = 0.15
+
+# Z hop, layer change and minimum layer time, per layer
+LAYER_CHANGE_SECONDS = 2.0
+
+# Heating, bed levelling and purge line, once per print
+STARTUP_SECONDS = 300.0
+
+_JS_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_$][\w$]*)
+  | (?P<punct>[\[\]{}:,=;.])
+  | (?P<space>\s+)
+""", re.VERBOSE | re.DOTALL)
+
+
+def parse_js_literal(source):
+    """
+    Parse the array or object literal assigned in a JavaScript file
+
+    Handles what printers-presets.js uses: comments, unquoted keys,
+    single-quoted strings and trailing commas.
+    """
+    tokens = []
+    for match in _JS_TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        if kind in ('comment', 'space'):
+            continue
+        tokens.append((kind, match.group()))
+
+    # Only the literal after the first '=' matters (window.PRINTER_PRESETS = [...])
+    start = next((i for i, (kind, text) in enumerate(tokens) if text == '='), -1) + 1
+    parts = []
+    for i, (kind, text) in enumerate(tokens[start:], start):
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind == 'string':
+            quote = text[0]
+            body = text[1:-1].replace(f'\\{quote}', quote)
+            parts.append(json.dumps(body))
+        elif kind == 'word':
+            parts.append(json.dumps(text) if following == ':' else
+                         {'true': 'true', 'false': 'false', 'null': 'null'}.get(text, 'null'))
+        elif text == ',' and following in (']', '}'):
+            continue
+        elif text == ';':
+            break
+        else:
+            parts.append(text)
+    return json.loads(''.join(parts))
+
+
+@lru_cache(maxsize=None)
+def load_printer_presets(path=PRESETS_PATH):
+    """
+    Printer presets with a usable speed and bed size
+
+    Returns:
+        tuple: Dicts with id, name, avgSpeed (mm/s) and bedSize {x, y, z} (mm)
+    """
+    with open(path, encoding='utf-8') as f:
+        presets = parse_js_literal(f.read())
+
+    usable = []
+    for preset in presets:
+        bed = preset.get('bedSize') or {}
+        values = [preset.get('avgSpeed'), bed.get('x'), bed.get('y'), bed.get('z')]
+        if not all(isinstance(value, (int, float)) and value > 0 for value in values):
+            continue  # The 'custom' entry and anything incomplete
+        usable.append({
+            'id': preset['id'],
+            'name': ' '.join(part for part in (preset.get('brand'), preset.get('model'), preset.get('version')) if part),
+            'avgSpeed': float(preset['avgSpeed']),
+            'bedSize': {axis: float(bed[axis]) for axis in ('x', 'y', 'z')},
+        })
+    return tuple(usable)
+
+
+def extrusion_path_lengths(slices, wall_thickness_mm=1.2, perimeters=2, top_bottom_layers=3, infill=0.2):
+    """
+    Extrusion path length per feature for one sliced model
+
+    The line width is the wall thickness split over the perimeters.
+
+    Returns:
+        dict: 'walls', 'skin' and 'infill' path lengths in mm
+    """
+    line_width = wall_thickness_mm / max(perimeters, 1)
+    layer_height = slices['layer_height']
+    volumes = shell_and_infill_volumes(slices, wall_thickness_mm, top_bottom_layers)
+    return {
+        'walls': float(slices['perimeter_mm'].sum()) * perimeters,
+        'skin': volumes['top_bottom_mm3'] / (line_width * layer_height),
+        'infill': volumes['sparse_mm3'] * infill / (line_width * layer_height),
+    }
+
+
+def estimate_print_times(slices, extents, wall_thickness_mm=1.2, perimeters=2, top_bottom_layers=3,
+                         infill=0.2, presets=None):
+    """
+    Estimate print hours on every printer preset
+
+    Args:
+        slices: slicer.slice_layers output for the model
+        extents: Model size along x, y, z in mm, used to check it fits each bed
+        presets: load_printer_presets()-style presets (defaults to printers-presets.js)
+
+    Returns:
+        dict: 'pathLengthMm' per feature, 'layers', and 'printers' sorted fastest first,
+              each with id, name, hours and whether the model fits its bed
+    """
+    presets = load_printer_presets() if presets is None else presets
+    lengths = extrusion_path_lengths(slices, wall_thickness_mm, perimeters, top_bottom_layers, infill)
+    layers = len(slices['z'])
+
+    features = list(FEATURE_SPEED_FACTORS)
+    path = np.array([lengths[feature] for feature in features])
+    factors = np.array([FEATURE_SPEED_FACTORS[feature] for feature in features])
+    speeds = np.array([preset['avgSpeed'] for preset in presets])
+    beds = np.array([[preset['bedSize'][axis] for axis in ('x', 'y', 'z')] for preset in presets]).reshape(-1, 3)
+
+    # (presets,) seconds: every feature's path at its share of each printer's speed
+    extrusion = (path / factors).sum() / speeds
+    seconds = extrusion * (1.0 + TRAVEL_OVERHEAD) + layers * LAYER_CHANGE_SECONDS + STARTUP_SECONDS
+
+    # The model may be turned 90° on the bed, so compare sorted XY footprints
+    footprint = np.sort(np.asarray(extents[:2], dtype=float))
+    bed_footprint = np.sort(beds[:, :2], axis=1)
+    fits = np.all(bed_footprint >= footprint, axis=1) & (beds[:, 2] >= extents[2])
+
+    order = np.argsort(seconds, kind='stable')
+    return {
+        'pathLengthMm': {feature: round(length, 1) for feature, length in lengths.items()},
+        'layers': layers,
+        'printers': [
+            {
+                'id': presets[i]['id'],
+                'name': presets[i]['name'],
+                'hours': round(float(seconds[i]) / 3600.0, 2),
+                'fits': bool(fits[i]),
+            }
+            for i in order
+        ],
+    }
@@ -0,0 +1,187 @@
+"""
+In-process index of accepted makers' printers.
+
+Every printer on an accepted `printer-applications` entry is filed under
+each material it prints, with its bed size sorted smallest axis first. A
+part fits a bed in some axis-aligned orientation exactly when its sorted
+extents are no larger than the sorted bed, axis by axis, so matching all 6
+orientations is one vectorised comparison per material. The collection is
+read once; after that, admin status changes add or remove single
+applications.
+"""
+
+import re
+import threading
+
+import numpy as np
+
+from print_time import load_printer_presets
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def normalize_material(name):
+    """Materials are matched case-insensitively ('pla' and 'PLA ' are the same)"""
+    return str(name).strip().upper()
+
+
+def parse_bed_size(value):
+    """
+    Bed size in mm as (x, y, z), or None if it can't be read
+
+    Accepts the presets' {'x', 'y', 'z'} dicts and the application form's
+    "256 x 256 x 256" text.
+    """
+    if isinstance(value, dict):
+        dims = [value.get(axis) for axis in ('x', 'y', 'z')]
+    elif isinstance(value, (list, tuple)):
+        dims = list(value)
+    else:
+        dims = _NUMBER_RE.findall(str(value or ''))
+    try:
+        dims = [float(dim) for dim in dims]
+    except (TypeError, ValueError):
+        return None
+    if len(dims) != 3 or not all(dim > 0 for dim in dims):
+        return None
+    return tuple(dims)
+
+
+def parse_materials(value):
+    """Material names from a list or the form's comma-separated text"""
+    if isinstance(value, str):
+        value = value.split(',')
+    return {normalize_material(name) for name in value or [] if str(name).strip()}
+
+
+class PrinterIndex:
+    """Accepted printers indexed by material and sorted bed dimensions"""
+
+    def __init__(self, db, collection='printer-applications'):
+        self.db = db
+        self.collection = collection
+        self.version = 0
+        self.loaded = False
+        self._applications = {}  # application id -> list of printer entries
+        self._by_material = {}   # material -> {(application id, printer number): entry}
+        self._arrays = {}        # material -> (sorted beds array, entries), rebuilt when that material changes
+        self._lock = threading.Lock()
+        self._presets = {preset['id']: preset for preset in load_printer_presets()}
+
+    def _printer_entries(self, app_id, application):
+        """One entry per usable printer on an application"""
+        default_materials = parse_materials(application.get('materials'))
+        entries = []
+        for number, printer in enumerate(application.get('printers') or []):
+            if not isinstance(printer, dict):
+                continue
+            # Trust the preset's bed over the form text, which custom printers type by hand
+            preset = self._presets.get(printer.get('model'))
+            bed = parse_bed_size(preset['bedSize']) if preset else parse_bed_size(printer.get('bedSize'))
+            if bed is None:
+                continue
+            materials = parse_materials(printer.get('materials')) or default_materials
+            if not materials:
+                continue
+            # Only capabilities are indexed: matches are served publicly, so no maker contact details
+            entries.append({
+                'applicationId': app_id,
+                'printer': number,
+                'model': printer.get('modelName') or printer.get('model'),
+                'quantity': printer.get('quantity') or 1,
+                'bedSize': dict(zip(('x', 'y', 'z'), bed)),
+                'materials': materials,
+                'dims': tuple(sorted(bed)),
+            })
+        return entries
+
+    def _remove_locked(self, app_id):
+        for entry in self._applications.pop(app_id, []):
+            for material in entry['materials']:
+                bucket = self._by_material.get(material)
+                if bucket is None:
+                    continue
+                bucket.pop((app_id, entry['printer']), None)
+                self._arrays.pop(material, None)
+                if not bucket:
+                    del self._by_material[material]
+
+    def _add_locked(self, app_id, application):
+        self._remove_locked(app_id)
+        entries = self._printer_entries(app_id, application)
+        if not entries:
+            return
+        self._applications[app_id] = entries
+        for entry in entries:
+            for material in entry['materials']:
+                self._by_material.setdefault(material, {})[(app_id, entry['printer'])] = entry
+                self._arrays.pop(material, None)
+
+    def add_application(self, app_id, application):
+        """Index (or re-index) one accepted application"""
+        with self._lock:
+            self._add_locked(app_id, application)
+            self.version += 1
+
+    def remove_application(self, app_id):
+        """Drop one application's printers, e.g. when it is denied or deleted"""
+        with self._lock:
+            if app_id in self._applications:
+                self._remove_locked(app_id)
+                self.version += 1
+
+    def ensure_loaded(self):
+        """Read the accepted applications once, on first use"""
+        if self.loaded:
+            return
+        docs = self.db.collection(self.collection).where('status', '==', 'accepted').stream()
+        with self._lock:
+            if self.loaded:
+                return
+            for doc in docs:
+                self._add_locked(doc.id, doc.to_dict())
+            self.loaded = True
+            self.version += 1
+        print(f"Printer index: {len(self._applications)} accepted makers (v{self.version})")
+
+    def _material_arrays(self, material):
+        arrays = self._arrays.get(material)
+        if arrays is None:
+            with self._lock:
+                entries = list(self._by_material.get(material, {}).values())
+                beds = np.array([entry['dims'] for entry in entries], dtype=float).reshape(-1, 3)
+                arrays = self._arrays[material] = (beds, entries)
+        return arrays
+
+    def match(self, extents, material):
+        """
+        Makers with a printer that can print a part in `material`
+
+        Args:
+            extents: Part size along x, y, z in mm (any orientation is allowed)
+            material: Material name
+
+        Returns:
+            list: One dict per maker (applicationId), each with the printers that
+                  fit, ordered by application id
+        """
+        self.ensure_loaded()
+        part = np.sort(np.asarray(extents, dtype=float))
+        beds, entries = self._material_arrays(normalize_material(material))
+        if not entries:
+            return []
+        fits = np.flatnonzero(np.all(beds >= part, axis=1))
+
+        makers = {}
+        for i in fits:
+            entry = entries[i]
+            maker = makers.setdefault(entry['applicationId'], {
+                'applicationId': entry['applicationId'],
+                'printers': [],
+            })
+            maker['printers'].append({
+                'model': entry['model'],
+                'quantity': entry['quantity'],
+                'bedSize': entry['bedSize'],
+            })
+        return [makers[app_id] for app_id in sorted(makers)]
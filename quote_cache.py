@@ -0,0 +1,167 @@
+"""
+Content-addressed cache for STL weight quotes.
+
+Quotes are keyed on the SHA-256 of the uploaded STL bytes plus the
+normalized print parameters, so re-uploading the same model with the same
+settings skips the temp file, mesh parse and external API call entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def hash_stl_bytes(data):
+    """Return the hex SHA-256 digest of raw STL bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_quote_params(params):
+    """Round and canonicalize print parameters so equivalent requests share a key"""
+    normalized = {}
+    for name, value in sorted(params.items()):
+        if isinstance(value, float):
+            value = round(value, 4)
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[name] = value
+    return normalized
+
+
+def make_quote_key(stl_hash, params):
+    """Build the cache key for an STL hash and its print parameters"""
+    payload = json.dumps([stl_hash, normalize_quote_params(params)],
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class QuoteCache:
+    """
+    Two-tier quote cache: an in-memory LRU bounded by total entry size, and an
+    optional directory of JSON files that survives restarts. Both tiers hold
+    at most max_bytes; the directory drops its least recently used files first.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_size = None
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_entries(self):
+        """(mtime, size, path) of every cached file in the directory"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _prune_disk(self):
+        """Delete the least recently used files until the directory fits in max_bytes"""
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_size = total
+
+    def _store_memory(self, key, encoded):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(encoded) > self.max_bytes:
+            return
+        self._entries[key] = encoded
+        self._size += len(encoded)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get(self, key):
+        """Return the cached quote for `key`, or None on a miss"""
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(encoded)
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    encoded = f.read()
+                value = json.loads(encoded)
+                # Touch the file so pruning treats it as recently used
+                os.utime(self._disk_path(key))
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._store_memory(key, encoded)
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a JSON-serializable quote under `key`"""
+        encoded = json.dumps(value, separators=(',', ':')).encode()
+        with self._lock:
+            self._store_memory(key, encoded)
+
+        if self.cache_dir and len(encoded) <= self.max_bytes:
+            try:
+                with self._disk_lock:
+                    if self._disk_size is None:
+                        self._disk_size = sum(size for _, size, _ in self._disk_entries())
+                    try:
+                        self._disk_size -= os.path.getsize(self._disk_path(key))
+                    except OSError:
+                        pass
+                    # Write then rename so readers never see a partial file
+                    fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(encoded)
+                    os.replace(tmp_path, self._disk_path(key))
+                    self._disk_size += len(encoded)
+                    if self._disk_size > self.max_bytes:
+                        self._prune_disk()
+            except OSError as e:
+                print(f"Quote cache write error: {e}")
+
+    def stats(self):
+        """Return hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'diskTier': bool(self.cache_dir),
+            }
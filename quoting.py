@@ -0,0 +1,430 @@
+"""
+STL weight quoting pipeline.
+
+Everything needed to turn an uploaded STL into a weight quote lives here,
+separate from app.py, so background worker processes can import it without
+initializing Flask or Firebase. Functions that take an `stl_file_path` also
+accept a MeshAnalysis, so one quote loads and analyzes the mesh only once.
+"""
+
+import os
+import time
+import requests
+from mesh_analysis import MeshAnalysis
+from slicer import shell_and_infill_volumes
+from print_time import estimate_print_times
+from orientation import ORIENTATION_CANDIDATES, optimize_orientation
+from support import support_weight
+from jobs import report_progress
+from http_client import http_client, CircuitOpenError
+
+# STL Weight Estimator API configuration
+STL_API_URL = "https://stl-api-66l8.onrender.com/estimate-weight"
+
+# Primary weight estimator for /upload-stl: 'api' (external STL API) or 'local' (in-process engine)
+WEIGHT_ESTIMATOR = os.environ.get('WEIGHT_ESTIMATOR', 'api').lower()
+
+# Mesh repair is skipped above this many faces and abandoned after this many seconds
+MESH_REPAIR_MAX_FACES = int(os.environ.get('MESH_REPAIR_MAX_FACES', 200000))
+MESH_REPAIR_SECONDS = float(os.environ.get('MESH_REPAIR_SECONDS', 2.0))
+# Quotes skip validation entirely above this many triangles (it alone takes seconds there)
+MESH_CHECK_MAX_TRIANGLES = int(os.environ.get('MESH_CHECK_MAX_TRIANGLES', 500000))
+
+def calculate_volume_with_trimesh(stl_file_path, units='mm'):
+    """
+    Model volume in cm³, repairing open or badly wound meshes within the repair budget
+
+    Kept under its old name for callers; validation and repair no longer go through trimesh.
+    """
+    try:
+        mesh = MeshAnalysis.coerce(stl_file_path, units)
+        report = mesh.check(max_faces=MESH_REPAIR_MAX_FACES, time_budget=MESH_REPAIR_SECONDS)
+        if report['reliability'] == 'unreliable':
+            print(f"Volume of {mesh.path} is unreliable: {report['boundary_edges']} open edges, "
+                  f"{report['non_manifold_edges']} non-manifold edges")
+        return report['volume_mm3'] / 1000.0
+    except Exception as e:
+        print(f"Volume calc failed: {e}")
+        return None
+
+def mesh_check_summary(report):
+    """Client-facing subset of a MeshAnalysis.check report"""
+    summary = {
+        'reliability': report['reliability'],
+        'watertight': report['watertight'],
+        'openEdges': report['boundary_edges'],
+        'nonManifoldEdges': report['non_manifold_edges'],
+        'flippedFaces': report['flipped_faces'],
+        'degenerateFaces': report['degenerate_faces'],
+    }
+    if 'repair' in report:
+        summary['repairSteps'] = report['repair']['steps']
+    return summary
+
+def weight_from_slices(slices, infill=0.2, wall_thickness_mm=1.2, top_bottom_layers=3, density=1.24):
+    """Turn sliced layers into shell/infill volumes (cm³) and weights (g)"""
+    volumes = shell_and_infill_volumes(slices, wall_thickness_mm, top_bottom_layers)
+    
+    total_volume_mm3 = volumes['total_mm3']
+    wall_volume_mm3 = volumes['wall_mm3']
+    top_bottom_volume_mm3 = volumes['top_bottom_mm3']
+    
+    # Total shell volume (walls + top/bottom skins)
+    shell_volume_mm3 = wall_volume_mm3 + top_bottom_volume_mm3
+    
+    # Inner volume (what gets infill)
+    inner_volume_mm3 = volumes['sparse_mm3']
+    
+    # Calculate material volume
+    # Shell is 100% infill, inner volume gets user's infill percentage
+    material_volume_mm3 = shell_volume_mm3 + (inner_volume_mm3 * infill)
+    
+    # Convert to cm³
+    shell_volume_cm3 = shell_volume_mm3 / 1000.0
+    inner_volume_cm3 = inner_volume_mm3 / 1000.0
+    total_volume_cm3 = total_volume_mm3 / 1000.0
+    material_volume_cm3 = material_volume_mm3 / 1000.0
+    
+    # Calculate weights
+    shell_weight = shell_volume_cm3 * density
+    infill_weight = inner_volume_cm3 * infill * density
+    total_weight = shell_weight + infill_weight
+    
+    return {
+        'material_volume_cm3': material_volume_cm3,
+        'shell_volume_cm3': shell_volume_cm3,
+        'wall_volume_cm3': wall_volume_mm3 / 1000.0,
+        'top_bottom_volume_cm3': top_bottom_volume_mm3 / 1000.0,
+        'inner_volume_cm3': inner_volume_cm3,
+        'total_volume_cm3': total_volume_cm3,
+        'shell_weight': shell_weight,
+        'infill_weight': infill_weight,
+        'total_weight': total_weight
+    }
+
+def calculate_wall_and_infill_volume(stl_file_path, infill=0.2, wall_thickness_mm=1.2, layer_height_mm=0.2, top_bottom_layers=3, perimeters=2, density=1.24, units='mm'):
+    """
+    Estimate shell and infill volumes from the model's actual layer cross-sections
+    
+    wall_thickness_mm is the total wall thickness (perimeters × line width).
+    """
+    # Slice at every layer and build walls, top/bottom skins and infill from the contours
+    slices = MeshAnalysis.coerce(stl_file_path, units).slices(layer_height_mm)
+    result = weight_from_slices(slices, infill, wall_thickness_mm, top_bottom_layers, density)
+    
+    print(f"Slicer: {result['total_weight']:.1f}g, {result['total_volume_cm3']:.1f}cm³, {len(slices['z'])} layers")
+    
+    return result
+
+def quote_combinations(stl_file_path, units, combinations):
+    """
+    Weigh one STL under many print settings, loading and slicing it as few times as possible
+    
+    Args:
+        stl_file_path: Path to the STL file
+        units: Units the file was modelled in
+        combinations: Parsed print parameters (infill, wallThickness, layerHeight, topBottomLayers, density)
+    
+    Returns:
+        list: One calculate_wall_and_infill_volume-style result per combination
+    """
+    mesh = MeshAnalysis.coerce(stl_file_path, units)
+    
+    # Slicing is the expensive part and only depends on layer height, so the mesh memoizes it
+    results = []
+    for combination in combinations:
+        results.append(weight_from_slices(
+            mesh.slices(combination['layerHeight']),
+            infill=combination['infill'],
+            wall_thickness_mm=combination['wallThickness'],
+            top_bottom_layers=combination['topBottomLayers'],
+            density=combination['density']
+        ))
+    return results
+
+def quote_print_times(mesh, params):
+    """Print hours on every printer preset for a quote's settings, or None if they can't be estimated"""
+    try:
+        return estimate_print_times(
+            mesh.slices(params['layerHeight']),
+            mesh.extents,
+            wall_thickness_mm=params['wallThickness'],
+            perimeters=params['perimeters'],
+            top_bottom_layers=params['topBottomLayers'],
+            infill=params['infill']
+        )
+    except Exception as e:
+        print(f"Print time estimate failed: {e}")
+        return None
+
+def call_stl_weight_api(stl_file_path, infill_percentage, material_density):
+    """
+    Call the external STL Weight Estimator API for accurate weight calculation
+    
+    Args:
+        stl_file_path: Path to the STL file
+        infill_percentage: Infill percentage (0-100)
+        material_density: Material density in g/cm³
+    
+    Returns:
+        float: Weight in grams, or None if failed
+    """
+    if isinstance(stl_file_path, MeshAnalysis):
+        stl_file_path = stl_file_path.path
+    try:
+        # Prepare the API request with fixed parameters
+        with open(stl_file_path, 'rb') as stl_file:
+            files = {'file': stl_file}
+            data = {
+                'infill_percentage': infill_percentage,
+                'material_density': material_density,
+                'line_thickness': 0.2,  # Fixed at 0.2mm
+                'layer_height': 0.2,    # Fixed at 0.2mm
+                'shell_count': 2        # Fixed at 2 shells
+            }
+            
+            # Make the API call
+            response = http_client.post('stl_api', STL_API_URL, files=files, data=data)
+            
+            if response.status_code == 200:
+                result = response.json()
+                weight_grams = result.get('weight_grams', 0)
+                print(f"STL API: {weight_grams:.1f}g")
+                return weight_grams
+            else:
+                print(f"STL API failed: {response.status_code}")
+                return None
+                
+    except CircuitOpenError:
+        print("STL API circuit open, skipping")
+        return None
+    except requests.exceptions.Timeout:
+        print("STL API timeout")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"STL API error: {e}")
+        return None
+    except Exception as e:
+        print(f"STL API unexpected error: {e}")
+        return None
+
+def call_local_weight_engine(stl_file_path, infill_percentage, material_density, units='mm'):
+    """
+    Estimate weight with the in-process engine using the same fixed parameters as the external API
+    
+    Returns:
+        float: Weight in grams, or None if failed
+    """
+    try:
+        result = MeshAnalysis.coerce(stl_file_path, units).estimate_weight(
+            infill_percentage=infill_percentage,
+            material_density=material_density,
+            line_thickness=0.2,
+            layer_height=0.2,
+            shell_count=2
+        )
+        weight_grams = result['weight_grams']
+        print(f"Local engine: {weight_grams:.1f}g")
+        return weight_grams
+    except Exception as e:
+        print(f"Local engine error: {e}")
+        return None
+
+def run_quote(stl_file_path, params, weight_estimator=None, stl_stats=None):
+    """
+    Quote an STL file: primary estimator, then slicer fallback, then emergency estimate
+    
+    Args:
+        stl_file_path: Path to the uploaded STL file
+        params: Print parameters (units, infill, wallThickness, layerHeight, topBottomLayers, perimeters,
+                density, and optionally orient to search for the best print orientation
+                and support to estimate support material)
+        weight_estimator: 'api' or 'local', defaults to WEIGHT_ESTIMATOR
+        stl_stats: Mesh statistics gathered while the upload streamed in, so they
+                   aren't computed again from the file
+    
+    Returns:
+        dict: Quote with weight, calculationMethod, apiUsed, meshCheck (how reliable the
+              model's volume is, see mesh_check_summary; None above MESH_CHECK_MAX_TRIANGLES,
+              with the reason in meshCheckSkipped) and printTime (hours per printer
+              preset, see print_time.estimate_print_times); emergency estimates carry a
+              warning instead of a print time. 'orientation' is the best print
+              orientation found (see orientation.optimize_orientation), or None unless
+              params['orient'] is set, and
+              'support' the support material it needs (see support.estimate_support,
+              plus its weight in grams), or None unless params['support'] is set;
+              'weight' excludes support.
+              'timings' holds seconds per stage reached, keyed validate, orient, support,
+              print_time, remote_api or local_engine, fallback and emergency; the last key is the stage that produced
+              the weight. Callers record and strip it before returning the quote.
+    """
+    weight_estimator = weight_estimator or WEIGHT_ESTIMATOR
+    if weight_estimator != 'local' and not http_client.available('stl_api'):
+        # The API has been failing; don't make this request wait on it
+        print("STL API circuit open, using local engine")
+        weight_estimator = 'local'
+    infill = params['infill']
+    density = params['density']
+    units = params['units']
+    
+    timings = {}
+    stage_started = time.perf_counter()
+
+    def end_stage(stage):
+        nonlocal stage_started
+        now = time.perf_counter()
+        timings[stage] = now - stage_started
+        stage_started = now
+    
+    # Load the mesh once: every path below shares it and whatever it has already computed.
+    # Check it up front, since every estimator's volume is only as good as the mesh.
+    report_progress('validating', 0.05)
+    mesh = mesh_report = mesh_check = mesh_check_skipped = None
+    try:
+        mesh = MeshAnalysis.load(stl_file_path, units, stats=stl_stats)
+        if mesh.triangle_count > MESH_CHECK_MAX_TRIANGLES:
+            mesh_check_skipped = (f'Mesh has {mesh.triangle_count} triangles; '
+                                  f'only meshes up to {MESH_CHECK_MAX_TRIANGLES} are validated')
+        else:
+            mesh_report = mesh.check(max_faces=MESH_REPAIR_MAX_FACES, time_budget=MESH_REPAIR_SECONDS)
+            mesh_check = mesh_check_summary(mesh_report)
+    except Exception as e:
+        print(f"Mesh check failed: {e}")
+    source = mesh if mesh is not None else stl_file_path
+    end_stage('validate')
+    
+    # The search costs seconds on big meshes, so only quotes that ask for it (orient) run it
+    orientation = None
+    if mesh is not None and params.get('orient') and ORIENTATION_CANDIDATES > 0:
+        report_progress('orienting', 0.08)
+        try:
+            orientation = optimize_orientation(mesh)
+        except Exception as e:
+            print(f"Orientation search failed: {e}")
+        end_stage('orient')
+    
+    # Support is material too: estimate it in the orientation the part would be printed in
+    support = None
+    if mesh is not None and params.get('support'):
+        report_progress('support', 0.09)
+        try:
+            # The mesh memoizes the estimate, so add to a copy
+            support = dict(mesh.estimate_support(rotation=orientation['rotation'] if orientation else None))
+            support['weight'] = round(support_weight(support, density), 2)
+            support['orientation'] = 'optimized' if orientation else 'as uploaded'
+        except Exception as e:
+            print(f"Support estimate failed: {e}")
+        end_stage('support')
+    
+    # Print time doesn't depend on the weight; its slices are shared with the slicer fallback
+    print_time = None
+    if mesh is not None:
+        print_time = quote_print_times(mesh, params)
+        end_stage('print_time')
+    
+    try:
+        if mesh is None:
+            # Empty or unreadable file: no estimator can give a real weight
+            raise ValueError('STL file could not be read')
+        
+        # First, try the primary weight estimator
+        infill_percentage = infill * 100
+        report_progress('estimating', 0.1)
+        
+        if weight_estimator == 'local':
+            # In-process engine: no network hop, file never leaves the server
+            weight_grams = call_local_weight_engine(
+                stl_file_path=source,
+                infill_percentage=infill_percentage,
+                material_density=density,
+                units=units
+            )
+            estimator_name = 'Local engine'
+        else:
+            # Call the external API
+            weight_grams = call_stl_weight_api(
+                stl_file_path=stl_file_path,
+                infill_percentage=infill_percentage,
+                material_density=density
+            )
+            estimator_name = 'External STL API'
+        end_stage('local_engine' if weight_estimator == 'local' else 'remote_api')
+        
+        if weight_grams is not None:
+            # Primary estimator successful - return the weight
+            calculation_method = f'{estimator_name} (infill {infill_percentage}%, density {density}g/cm³)'
+            
+            return {
+                'success': True,
+                'weight': weight_grams,
+                'calculationMethod': calculation_method,
+                'apiUsed': weight_estimator != 'local',
+                'meshCheck': mesh_check,
+                'meshCheckSkipped': mesh_check_skipped,
+                'orientation': orientation,
+                'support': support,
+                'printTime': print_time,
+                'timings': timings
+            }
+        
+        # Fallback to the layer slicer calculation
+        report_progress('slicing', 0.5)
+        result = calculate_wall_and_infill_volume(
+            source,
+            infill=infill,
+            wall_thickness_mm=params['wallThickness'],
+            layer_height_mm=params['layerHeight'],
+            top_bottom_layers=params['topBottomLayers'],
+            perimeters=params['perimeters'],
+            density=density,
+            units=units
+        )
+        calculation_method = f'Slicer fallback (infill {infill_percentage}%, density {density}g/cm³)'
+        end_stage('fallback')
+        
+        return {
+            'success': True,
+            'weight': result['total_weight'],
+            'calculationMethod': calculation_method,
+            'apiUsed': False,
+            'meshCheck': mesh_check,
+            'meshCheckSkipped': mesh_check_skipped,
+            'orientation': orientation,
+            'support': support,
+            'printTime': print_time,
+            'timings': timings
+        }
+    except Exception as e:
+        # Emergency fallback
+        report_progress('emergency', 0.8)
+        try:
+            if mesh_report and mesh_report['reliability'] != 'unreliable':
+                total_volume_cm3 = mesh_report['volume_mm3'] / 1000.0
+            else:
+                # No trustworthy volume: fall back to the bounding box
+                if mesh_report:
+                    extents = mesh_report['extents']
+                elif mesh is not None:
+                    extents = mesh.extents
+                else:
+                    extents = stl_stats['extents']
+                total_volume_cm3 = (extents[0] * extents[1] * extents[2]) / 1000.0
+        except Exception as fallback_error:
+            total_volume_cm3 = 10.0
+        
+        emergency_weight = total_volume_cm3 * 0.3 * density
+        # Time lost in whichever stage failed counts towards the emergency path
+        end_stage('emergency')
+        
+        return {
+            'success': True,
+            'weight': emergency_weight,
+            'calculationMethod': 'Emergency estimation',
+            'warning': 'Volume calculation failed, using fallback estimation',
+            'apiUsed': False,
+            'meshCheck': mesh_check,
+            'meshCheckSkipped': mesh_check_skipped,
+            'orientation': orientation,
+            'support': support,
+            'timings': timings
+        }
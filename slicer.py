@@ -0,0 +1,209 @@
+"""
+Vectorized layer slicer.
+
+Intersects a triangle soup with every layer plane in one batched pass:
+each (triangle, layer) pair that straddles a plane yields one contour
+segment, and segment lengths and signed shoelace terms are summed per
+layer with np.bincount. No Python loop runs per layer or per triangle.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from stl_analysis import load_triangles, UNIT_SCALE_MM
+
+# (triangle, layer) pairs processed per step; bounds peak memory on tall meshes
+PAIR_CHUNK = 1 << 20
+
+
+def _edge_slope(start, end, start_z, end_z):
+    """XY change per mm of z along an edge (zero for horizontal edges, which are never cut)"""
+    dz = end_z - start_z
+    return np.divide(end - start, dz, out=np.zeros_like(start), where=dz > 0)
+
+
+def _prepare_triangles(columns):
+    """
+    Sort each triangle's vertices by z and express its cut segment as a linear function of z
+
+    Every plane between the lowest and highest vertex cuts the long edge
+    (low -> high) and one short edge. Measured from the middle vertex's height
+    zm, the long-edge point is anchor + (z - zm) * long_slope and the segment
+    to the short-edge point is towards_mid + (z - zm) * (short_slope - long_slope),
+    where short_slope is the lower or upper short edge's slope depending on
+    which side of zm the plane is. The segment always points from the long
+    edge towards the middle vertex, so the orientation sign that puts the solid
+    on the segment's left is constant per triangle.
+    """
+    x0, y0, z0, x1, y1, z1, x2, y2, z2 = columns
+
+    # Outward normal from the original winding gives the contour direction (-n_y, n_x)
+    normal_x = (y1 - y0) * (z2 - z0) - (z1 - z0) * (y2 - y0)
+    normal_y = (z1 - z0) * (x2 - x0) - (x1 - x0) * (z2 - z0)
+
+    # Three compare-swaps sort the vertices by z without fancy indexing
+    low = [x0, y0, z0]
+    mid = [x1, y1, z1]
+    high = [x2, y2, z2]
+    for a, b in ((low, mid), (mid, high), (low, mid)):
+        swap = a[2] > b[2]
+        for i in range(3):
+            a[i], b[i] = np.where(swap, b[i], a[i]), np.where(swap, a[i], b[i])
+    (lx, ly, lz), (mx, my, mz), (hx, hy, hz) = low, mid, high
+
+    long_slope = (_edge_slope(lx, hx, lz, hz), _edge_slope(ly, hy, lz, hz))
+    anchor = (lx + (mz - lz) * long_slope[0], ly + (mz - lz) * long_slope[1])
+    towards_mid = (mx - anchor[0], my - anchor[1])
+    sign = np.sign(towards_mid[0] * -normal_y + towards_mid[1] * normal_x)
+
+    return {
+        'anchor': anchor,
+        'long_slope': long_slope,
+        'towards_mid': towards_mid,
+        'lower_spread': (_edge_slope(lx, mx, lz, mz) - long_slope[0], _edge_slope(ly, my, lz, mz) - long_slope[1]),
+        'upper_spread': (_edge_slope(mx, hx, mz, hz) - long_slope[0], _edge_slope(my, hy, mz, hz) - long_slope[1]),
+        'half_sign': 0.5 * sign,
+        'z_min': lz,
+        'z_mid': mz,
+        'z_max': hz,
+    }
+
+
+def _slice_pairs(edges, counts, plane_z):
+    """
+    Intersect each triangle with its run of planes
+
+    Pairs are grouped by triangle, so per-triangle values are expanded with
+    np.repeat rather than gathered.
+
+    Returns:
+        tuple: (segment lengths, signed area terms)
+    """
+    def expand(values):
+        return np.repeat(values, counts)
+
+    dz = plane_z - expand(edges['z_mid'])
+    upper = dz >= 0
+
+    # Point on the long edge, and segment from it to the short edge
+    ax = expand(edges['anchor'][0]) + dz * expand(edges['long_slope'][0])
+    ay = expand(edges['anchor'][1]) + dz * expand(edges['long_slope'][1])
+    sx = expand(edges['towards_mid'][0]) + dz * np.where(
+        upper, expand(edges['upper_spread'][0]), expand(edges['lower_spread'][0]))
+    sy = expand(edges['towards_mid'][1]) + dz * np.where(
+        upper, expand(edges['upper_spread'][1]), expand(edges['lower_spread'][1]))
+
+    lengths = np.hypot(sx, sy)
+    area_terms = (ax * sy - ay * sx) * expand(edges['half_sign'])
+    return lengths, area_terms
+
+
+def slice_layers(triangles, layer_height, scale=1.0):
+    """
+    Slice a mesh at the middle of every layer
+
+    Args:
+        triangles: (n, 3, 3) array of triangle vertices
+        layer_height: Layer height in mm
+        scale: Factor converting file units to mm
+
+    Returns:
+        dict: Layer mid-heights 'z' (mm), contour 'perimeter_mm' and cross-section 'area_mm2' per layer
+    """
+    if len(triangles) == 0:
+        empty = np.zeros(0)
+        return {'z': empty, 'perimeter_mm': empty, 'area_mm2': empty, 'layer_height': layer_height}
+
+    # One row per vertex coordinate (x0, y0, z0, x1, ...) in float64
+    columns = np.array(np.asarray(triangles).reshape(-1, 9).T, dtype=np.float64, order='C')
+    if scale != 1.0:
+        columns *= scale
+
+    # Center XY so shoelace terms don't lose precision far from the origin
+    for axis in (0, 1):
+        coordinates = columns[axis::3]
+        coordinates -= (coordinates.min() + coordinates.max()) / 2.0
+
+    edges = _prepare_triangles(columns)
+    del columns
+
+    z_bottom = edges['z_min'].min()
+    z_top = edges['z_max'].max()
+    layer_count = max(1, int(np.ceil((z_top - z_bottom) / layer_height - 1e-9)))
+    z_values = z_bottom + (np.arange(layer_count) + 0.5) * layer_height
+
+    # Layer planes each triangle spans: low <= z < high, so a plane through a
+    # vertex is counted exactly once
+    def first_layer_at_or_above(z):
+        layer = np.ceil((z - z_bottom) / layer_height - 0.5).astype(np.int64)
+        return np.clip(layer, 0, layer_count)
+
+    first = first_layer_at_or_above(edges['z_min'])
+    counts = np.maximum(first_layer_at_or_above(edges['z_max']) - first, 0)
+
+    perimeter = np.zeros(layer_count)
+    area = np.zeros(layer_count)
+
+    # Split triangles into groups of roughly PAIR_CHUNK (triangle, layer) pairs
+    cumulative = np.cumsum(counts)
+    total_pairs = int(cumulative[-1])
+    splits = np.searchsorted(cumulative, np.arange(PAIR_CHUNK, total_pairs, PAIR_CHUNK))
+    bounds = np.concatenate(([0], splits + 1, [len(counts)]))
+
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        chunk_counts = counts[lo:hi]
+        pair_count = int(chunk_counts.sum())
+        if pair_count == 0:
+            continue
+        chunk_edges = {name: tuple(v[lo:hi] for v in value) if isinstance(value, tuple) else value[lo:hi]
+                       for name, value in edges.items()}
+        run_start = np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        layer_index = np.repeat(first[lo:hi], chunk_counts) + (np.arange(pair_count) - run_start)
+
+        lengths, area_terms = _slice_pairs(chunk_edges, chunk_counts, z_values[layer_index])
+        perimeter += np.bincount(layer_index, weights=lengths, minlength=layer_count)
+        area += np.bincount(layer_index, weights=area_terms, minlength=layer_count)
+
+    return {
+        'z': z_values,
+        'perimeter_mm': perimeter,
+        'area_mm2': np.abs(area),
+        'layer_height': layer_height,
+    }
+
+
+def slice_stl(stl_file_path, layer_height, units='mm'):
+    """Slice an STL file at every layer (see slice_layers)"""
+    triangles, _ = load_triangles(stl_file_path)
+    return slice_layers(triangles, layer_height, scale=UNIT_SCALE_MM.get(units, 1.0))
+
+
+def shell_and_infill_volumes(slices, wall_thickness_mm, top_bottom_layers):
+    """
+    Split sliced layers into wall, top/bottom skin and sparse infill volumes
+
+    Walls are the contour length times the wall thickness (capped at the layer
+    area). A layer's interior is solid skin where it is not covered by the
+    layers within top_bottom_layers above and below it, approximated by the
+    minimum interior area over that window.
+
+    Returns:
+        dict: Volumes in mm³
+    """
+    layer_height = slices['layer_height']
+    area = slices['area_mm2']
+    wall_area = np.minimum(slices['perimeter_mm'] * wall_thickness_mm, area)
+    interior = area - wall_area
+
+    if len(interior) and top_bottom_layers > 0:
+        padded = np.pad(interior, top_bottom_layers)
+        covered = sliding_window_view(padded, 2 * top_bottom_layers + 1).min(axis=1)
+    else:
+        covered = interior
+
+    return {
+        'total_mm3': float(area.sum() * layer_height),
+        'wall_mm3': float(wall_area.sum() * layer_height),
+        'top_bottom_mm3': float((interior - covered).sum() * layer_height),
+        'sparse_mm3': float(covered.sum() * layer_height),
+    }
@@ -0,0 +1,164 @@
+"""
+In-memory static asset manifest.
+
+The site's HTML, JS and CSS files are read once at startup, hashed, and
+precompressed with gzip (and brotli when the module is installed). Every
+file is served from memory with a strong ETag, so a revalidation is a
+bodyless 304. Each asset is also reachable under a fingerprinted name
+(orders.3f2a1b9c.js) that is cached as immutable, and the HTML pages are
+rewritten to reference those names, so repeat visits only revalidate the
+page itself.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# File types kept in the manifest
+ASSET_EXTENSIONS = ('.html', '.js', '.css', '.svg', '.ico', '.png', '.jpg', '.jpeg', '.webp', '.woff2')
+
+# Types worth compressing (images and fonts are already compressed)
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.svg')
+
+# Larger files are left to send_from_directory
+MAX_ASSET_BYTES = 5 * 1024 * 1024
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+_ASSET_REFERENCE_RE = re.compile(r'''((?:src|href)=["'])/?([^"'/?#:]+\.(?:js|css))(["'])''')
+
+
+def _fingerprinted_name(name, digest):
+    stem, extension = os.path.splitext(name)
+    return f'{stem}.{digest[:8]}{extension}'
+
+
+class StaticAssets:
+    """Manifest of precompressed, content-hashed static files served from memory"""
+
+    def __init__(self, root='.', extensions=ASSET_EXTENSIONS, max_bytes=MAX_ASSET_BYTES):
+        self.root = root
+        self.extensions = extensions
+        self.max_bytes = max_bytes
+        self._assets = {}
+        self._fingerprinted = {}
+
+    def _make_asset(self, name, data):
+        digest = hashlib.sha256(data).hexdigest()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype == 'application/javascript':
+            mimetype += '; charset=utf-8'
+
+        variants = {None: data}
+        if name.endswith(COMPRESSIBLE_EXTENSIONS):
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    variants['br'] = compressed
+
+        return {
+            'name': name,
+            'digest': digest,
+            'mimetype': mimetype,
+            'variants': variants,
+            'fingerprinted': _fingerprinted_name(name, digest),
+        }
+
+    def build(self):
+        """Read, hash and compress every asset under the root (top level only)"""
+        assets = {}
+        pages = {}
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if not name.endswith(self.extensions) or not os.path.isfile(path):
+                continue
+            if os.path.getsize(path) > self.max_bytes:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            if name.endswith('.html'):
+                pages[name] = data
+            else:
+                assets[name] = self._make_asset(name, data)
+
+        # Pages reference scripts and styles by their fingerprinted names
+        def rewrite(match):
+            asset = assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f"{match.group(1)}{asset['fingerprinted']}{match.group(3)}"
+
+        for name, data in pages.items():
+            html = _ASSET_REFERENCE_RE.sub(rewrite, data.decode('utf-8'))
+            assets[name] = self._make_asset(name, html.encode('utf-8'))
+
+        self._assets = assets
+        self._fingerprinted = {asset['fingerprinted']: asset for asset in assets.values()}
+        total = sum(len(v) for asset in assets.values() for v in asset['variants'].values())
+        print(f"Static assets: {len(assets)} files, {total // 1024} KB in memory"
+              f"{'' if brotli else ' (brotli not installed)'}")
+        return self
+
+    def url_for(self, name):
+        """Fingerprinted URL for an asset, or its plain URL if it isn't in the manifest"""
+        asset = self._assets.get(name)
+        return '/' + (asset['fingerprinted'] if asset else name)
+
+    def response(self, path, request):
+        """
+        Build the response for a static path
+
+        Returns:
+            flask.Response: 200 with the best encoding the client accepts, 304 if its
+                            ETag still matches, or None if the path isn't in the manifest
+        """
+        asset = self._assets.get(path)
+        immutable = False
+        if asset is None:
+            asset = self._fingerprinted.get(path)
+            immutable = asset is not None
+        if asset is None:
+            return None
+
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset['variants'] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        # Each encoding is a different representation, so it gets its own strong ETag
+        etag = asset['digest'][:16] + ({'br': '-br', 'gzip': '-gz'}.get(encoding, ''))
+
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match and (request.if_none_match.star_tag or etag in request.if_none_match):
+            return Response(status=304, headers=headers)
+
+        body = asset['variants'][encoding]
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, status=200, headers=headers, content_type=asset['mimetype'])
+
+    def stats(self):
+        """Number of assets and bytes held per encoding"""
+        sizes = {}
+        for asset in self._assets.values():
+            for encoding, data in asset['variants'].items():
+                key = encoding or 'identity'
+                sizes[key] = sizes.get(key, 0) + len(data)
+        return {'assets': len(self._assets), 'bytes': sizes, 'brotli': brotli is not None}
@@ -0,0 +1,283 @@
+"""
+Streaming STL upload ingestion.
+
+Werkzeug hands multipart file data to the request's file stream in
+fixed-size chunks as it reads the body. STLUploadStream is that stream for
+.stl parts: every chunk is hashed and parsed into running volume/area/bounds
+totals as it arrives, size and triangle limits are enforced before the rest
+of the body is read, and the bytes are kept in memory only up to a small
+threshold before spilling to a temporary file. Consumers that need a path
+get that file; nothing is copied again.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from flask import Request, current_app
+
+from stl_analysis import (ASCII_VERTEX_RE, STL_HEADER_SIZE, STL_RECORD_DTYPE, UNIT_SCALE_MM,
+                          TriangleStats)
+
+# Bytes kept in memory before the upload spills to a temporary file
+DEFAULT_SPOOL_BYTES = 1 << 20
+
+# Longest partial ASCII line carried between chunks before giving up on ASCII parsing
+MAX_ASCII_LINE = 4096
+
+
+class UploadRejected(Exception):
+    """Raised while streaming when an upload exceeds the configured size or triangle limit"""
+
+
+class STLUploadStream(io.RawIOBase):
+    """
+    Writable/readable file object that hashes and analyzes an STL as it is written
+
+    Args:
+        max_bytes: Reject uploads larger than this (None for no limit)
+        max_triangles: Reject meshes with more triangles than this (None for no limit)
+        spool_bytes: Keep at most this many bytes in memory before using a temporary file
+    """
+
+    def __init__(self, max_bytes=None, max_triangles=None, spool_bytes=DEFAULT_SPOOL_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.max_triangles = max_triangles
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer = io.BytesIO()
+        self._path = None
+        self._owns_path = True
+        # Seconds spent per stage of write(), for the request metrics
+        self.timings = {'hash': 0.0, 'parse': 0.0, 'save': 0.0}
+
+        self._header = bytearray()
+        self._maybe_ascii = False
+        self._declared_count = None
+
+        # Binary records: partial record bytes carried between chunks
+        self._record_tail = b''
+        self._binary_stats = TriangleStats()
+
+        # ASCII facets: partial line and leftover vertices carried between chunks
+        self._ascii_tail = b''
+        self._ascii_vertices = np.zeros((0, 3), dtype=np.float32)
+        self._ascii_stats = TriangleStats()
+        self._ascii_valid = True
+
+    def _reject(self, message):
+        self.close()
+        raise UploadRejected(message)
+
+    def _check_triangles(self, count):
+        if self.max_triangles is not None and count > self.max_triangles:
+            self._reject(f'STL has more than {self.max_triangles} triangles')
+
+    def _parse_header(self, data):
+        needed = STL_HEADER_SIZE - len(self._header)
+        self._header += data[:needed]
+        if len(self._header) < STL_HEADER_SIZE:
+            return b''
+        self._maybe_ascii = bytes(self._header).lstrip().startswith(b'solid')
+        self._declared_count = int(np.frombuffer(bytes(self._header), dtype='<u4', count=1, offset=80)[0])
+        # A binary header declares its size up front, so oversized meshes stop here
+        if not self._maybe_ascii:
+            self._check_triangles(self._declared_count)
+        return data[needed:]
+
+    def _parse_records(self, data):
+        remaining = self._declared_count - self._binary_stats.triangle_count
+        if remaining <= 0:
+            return
+        if self._record_tail:
+            data = self._record_tail + data
+        record_size = STL_RECORD_DTYPE.itemsize
+        count = min(len(data) // record_size, remaining)
+        if count:
+            records = np.frombuffer(data, dtype=STL_RECORD_DTYPE, count=count)
+            self._binary_stats.add(records['vertices'])
+        self._record_tail = bytes(data[count * record_size:]) if count < remaining else b''
+        if not self._maybe_ascii:
+            self._check_triangles(self._binary_stats.triangle_count)
+
+    def _parse_ascii(self, data):
+        data = self._ascii_tail + data
+        cut = data.rfind(b'\n') + 1
+        self._ascii_tail = bytes(data[cut:])
+        if len(self._ascii_tail) > MAX_ASCII_LINE:
+            self._ascii_valid = False
+            return
+        coords = ASCII_VERTEX_RE.findall(data[:cut])
+        if not coords:
+            return
+        vertices = np.concatenate([self._ascii_vertices, np.array(coords, dtype=np.float32)])
+        complete = len(vertices) - len(vertices) % 3
+        self._ascii_stats.add(vertices[:complete].reshape(-1, 3, 3))
+        self._ascii_vertices = vertices[complete:]
+        self._check_triangles(self._ascii_stats.triangle_count)
+
+    def _spool(self, data):
+        if self._path is None and self._buffer.tell() + len(data) > self.spool_bytes:
+            self._roll_over()
+        if self._path is None:
+            self._buffer.write(data)
+        else:
+            self._file.write(data)
+
+    def _roll_over(self):
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.stl')
+        temp_file.write(self._buffer.getbuffer())
+        self._file = temp_file
+        self._path = temp_file.name
+        self._buffer = None
+
+    def writable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        """Hash, parse and spool the next chunk of the upload"""
+        data = bytes(data)
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self._reject(f'STL file is larger than {self.max_bytes} bytes')
+
+        started = time.perf_counter()
+        self._sha256.update(data)
+        hashed = time.perf_counter()
+        body = self._parse_header(data) if len(self._header) < STL_HEADER_SIZE else data
+        if self._ascii_valid and (self._maybe_ascii or self._declared_count is None):
+            self._parse_ascii(data)
+        if self._declared_count is not None and body:
+            self._parse_records(body)
+        parsed = time.perf_counter()
+        self._spool(data)
+        timings = self.timings
+        timings['hash'] += hashed - started
+        timings['parse'] += parsed - hashed
+        timings['save'] += time.perf_counter() - parsed
+        return len(data)
+
+    def _active(self):
+        return self._buffer if self._path is None else self._file
+
+    def read(self, size=-1):
+        return self._active().read(size)
+
+    def readinto(self, buffer):
+        data = self._active().read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._active().seek(offset, whence)
+
+    def tell(self):
+        return self._active().tell()
+
+    def flush(self):
+        if self._path is not None and not self._file.closed:
+            self._file.flush()
+
+    def sha256(self):
+        """Hex SHA-256 of everything written so far"""
+        return self._sha256.hexdigest()
+
+    def analysis(self, units='mm'):
+        """
+        Mesh statistics gathered while streaming
+
+        Returns:
+            dict: Same shape as stl_analysis.analyze_stl plus 'sha256' and 'size_bytes',
+                  or None if the upload is not a readable STL
+        """
+        if self._maybe_ascii and self._ascii_valid and self._ascii_tail:
+            self._parse_ascii(b'\n')
+
+        expected_size = None
+        if self._declared_count is not None:
+            expected_size = STL_HEADER_SIZE + self._declared_count * STL_RECORD_DTYPE.itemsize
+
+        if expected_size == self.size:
+            stats, stl_format = self._binary_stats, 'binary'
+        elif self._maybe_ascii:
+            if not self._ascii_valid or len(self._ascii_vertices) or self._ascii_stats.triangle_count == 0:
+                return None
+            stats, stl_format = self._ascii_stats, 'ascii'
+        elif self._declared_count is not None:
+            stats, stl_format = self._binary_stats, 'binary'
+        else:
+            return None
+
+        if stats.triangle_count == 0:
+            return None
+        # A binary file with a "solid" header is only recognised once it is complete
+        self._check_triangles(stats.triangle_count)
+        result = stats.result(scale=UNIT_SCALE_MM.get(units, 1.0))
+        result.update({'format': stl_format, 'sha256': self.sha256(), 'size_bytes': self.size})
+        return result
+
+    def path(self):
+        """Path of a file holding the upload, spilling the in-memory buffer to disk if needed"""
+        if self._path is None:
+            position = self._buffer.tell()
+            self._roll_over()
+            self._file.seek(position)
+        self.flush()
+        return self._path
+
+    def detach(self):
+        """Return the upload's path and hand its deletion over to the caller"""
+        path = self.path()
+        self._owns_path = False
+        return path
+
+    def close(self):
+        if self.closed:
+            return
+        if self._path is not None:
+            self._file.close()
+            if self._owns_path:
+                try:
+                    os.unlink(self._path)
+                except OSError:
+                    pass
+        super().close()
+
+
+class STLUploadRequest(Request):
+    """
+    Flask request that streams .stl file parts through STLUploadStream
+
+    Limits come from the app config keys STL_MAX_UPLOAD_BYTES,
+    STL_MAX_TRIANGLES and STL_SPOOL_BYTES.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename or not filename.lower().endswith('.stl'):
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        config = current_app.config
+        upload = STLUploadStream(
+            max_bytes=config.get('STL_MAX_UPLOAD_BYTES'),
+            max_triangles=config.get('STL_MAX_TRIANGLES'),
+            spool_bytes=config.get('STL_SPOOL_BYTES', DEFAULT_SPOOL_BYTES)
+        )
+        # Tracked so uploads parsed before a rejected one are cleaned up too
+        self.__dict__.setdefault('_stl_uploads', []).append(upload)
+        return upload
+
+    def close(self):
+        super().close()
+        for upload in self.__dict__.get('_stl_uploads', ()):
+            upload.close()
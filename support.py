@@ -0,0 +1,201 @@
+"""
+Support-material estimate from an XY height map.
+
+The mesh (in its print orientation) is rasterized onto a grid of columns:
+every face is sampled at the centres of the grid cells it covers, giving
+the heights where each column crosses the surface. Walking a column
+upward, a downward-facing sample enters the part and an upward-facing one
+leaves it, so the air gaps are known. Every overhang sample that closes an
+air gap, i.e. a face leaning further than the support angle past vertical,
+needs support down to the surface below it (or the plate). Those columns'
+heights times the cell area give the support volume.
+
+Rasterization is vectorized over triangles: each triangle's bounding box of
+cell centres is expanded into candidate samples, which are kept if they lie
+inside the triangle. Edge tests use a fill rule, so a sample on an edge
+shared by two faces is counted exactly once.
+"""
+
+import math
+import os
+
+import numpy as np
+
+# Degrees past vertical a surface can lean before it needs support
+SUPPORT_ANGLE = float(os.environ.get('SUPPORT_ANGLE', 45))
+
+# Grid cell size in mm; coarsened so neither side has more than SUPPORT_MAX_CELLS cells
+SUPPORT_RESOLUTION_MM = float(os.environ.get('SUPPORT_RESOLUTION_MM', 1.0))
+SUPPORT_MAX_CELLS = 1024
+
+# Fraction of the supported volume that is printed (support infill)
+SUPPORT_DENSITY = float(os.environ.get('SUPPORT_DENSITY', 0.15))
+
+# Gaps shorter than this (mm) are faces resting on the plate or on the part
+MIN_GAP_MM = 0.05
+
+# Candidate samples expanded per pass, to bound memory on large meshes
+SAMPLES_PER_PASS = 4_000_000
+
+
+def _edge_values(a, b, px, py):
+    """
+    Edge function of segment a-b at (px, py), computed from a canonical endpoint order
+
+    Two faces sharing an edge list its endpoints in opposite orders; ordering
+    them first makes both see bit-identical (negated) values. Returns the
+    value for the a->b direction and whether a sample exactly on the edge
+    belongs to the face on its left.
+    """
+    swap = (a[:, 0] > b[:, 0]) | ((a[:, 0] == b[:, 0]) & (a[:, 1] > b[:, 1]))
+    u = np.where(swap[:, None], b, a)
+    v = np.where(swap[:, None], a, b)
+    value = (v[:, 0] - u[:, 0]) * (py - u[:, 1]) - (v[:, 1] - u[:, 1]) * (px - u[:, 0])
+    value = np.where(swap, -value, value)
+    dx = b[:, 0] - a[:, 0]
+    dy = b[:, 1] - a[:, 1]
+    owns = (dy > 0) | ((dy == 0) & (dx < 0))
+    return value, owns
+
+
+def rasterize(triangles, origin, cell_size, shape):
+    """
+    Sample every non-vertical triangle at the grid cell centres it covers
+
+    Args:
+        triangles: (n, 3, 3) triangles in mm
+        origin: (x, y) of the grid's lower corner
+        cell_size: Cell side in mm
+        shape: (columns along x, rows along y)
+
+    Returns:
+        tuple: Flat cell index, z and face index of every sample
+    """
+    nx, ny = shape
+    xy = triangles[:, :, :2].astype(np.float64)
+    doubled = ((xy[:, 1, 0] - xy[:, 0, 0]) * (xy[:, 2, 1] - xy[:, 0, 1])
+               - (xy[:, 1, 1] - xy[:, 0, 1]) * (xy[:, 2, 0] - xy[:, 0, 0]))
+    faces = np.flatnonzero(doubled != 0)
+
+    # Range of cell centres (origin + (i + 0.5) * cell_size) inside each bounding box
+    lo = np.ceil((xy[faces].min(axis=1) - origin) / cell_size - 0.5).astype(np.int64)
+    hi = np.floor((xy[faces].max(axis=1) - origin) / cell_size - 0.5).astype(np.int64)
+    lo = np.maximum(lo, 0)
+    hi = np.minimum(hi, [nx - 1, ny - 1])
+    span = np.maximum(hi - lo + 1, 0)
+    counts = span[:, 0] * span[:, 1]
+
+    cells, heights, owners = [], [], []
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(faces):
+        # Take faces until their candidates fill one pass (always at least one face)
+        stop = max(int(np.searchsorted(ends, ends[start] - counts[start] + SAMPLES_PER_PASS, side='right')),
+                   start + 1)
+        chunk = np.arange(start, stop)
+        start = stop
+        chunk_counts = counts[chunk]
+        if chunk_counts.sum() == 0:
+            continue
+
+        local = np.repeat(chunk, chunk_counts)
+        offset = np.arange(len(local)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        i = lo[local, 0] + offset % span[local, 0]
+        j = lo[local, 1] + offset // span[local, 0]
+        px = origin[0] + (i + 0.5) * cell_size
+        py = origin[1] + (j + 0.5) * cell_size
+
+        face = faces[local]
+        tri = xy[face]
+        # Counter-clockwise faces (seen from above) have their inside on the left of every edge
+        orientation = np.sign(doubled[face])
+        inside = np.ones(len(face), dtype=bool)
+        weights = []
+        for k in range(3):
+            value, owns = _edge_values(tri[:, k], tri[:, (k + 1) % 3], px, py)
+            # Clockwise faces see every edge reversed: flip the sign and the ownership
+            value = value * orientation
+            owns = np.where(orientation > 0, owns, ~owns)
+            inside &= (value > 0) | ((value == 0) & owns)
+            weights.append(value)
+        if not inside.any():
+            continue
+
+        # Barycentric z: each vertex is weighted by the edge function of the opposite edge
+        w = np.stack([weights[1], weights[2], weights[0]], axis=1)[inside]
+        z = (w * triangles[face[inside], :, 2]).sum(axis=1) / (doubled[face[inside]] * orientation[inside])
+        cells.append(j[inside] * nx + i[inside])
+        heights.append(z)
+        owners.append(face[inside])
+
+    if not cells:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64)
+    return np.concatenate(cells), np.concatenate(heights), np.concatenate(owners)
+
+
+def estimate_support(triangles, scale=1.0, rotation=None, angle=SUPPORT_ANGLE,
+                     resolution_mm=SUPPORT_RESOLUTION_MM, max_cells=SUPPORT_MAX_CELLS):
+    """
+    Support volume needed to print a mesh
+
+    Args:
+        triangles: (n, 3, 3) triangles in file units
+        scale: File units to mm
+        rotation: Optional 3×3 matrix putting the mesh in its print orientation
+        angle: Degrees past vertical a face can lean before it needs support
+
+    Returns:
+        dict: volumeMm3 (solid support columns), areaMm2 (plate footprint of the
+              supported overhangs), angle and resolutionMm (the grid used)
+    """
+    triangles = np.asarray(triangles, dtype=np.float64) * scale
+    if rotation is not None:
+        triangles = triangles @ np.asarray(rotation, dtype=np.float64).T
+    if len(triangles) == 0:
+        return {'volumeMm3': 0.0, 'areaMm2': 0.0, 'angle': angle, 'resolutionMm': resolution_mm}
+
+    points = triangles.reshape(-1, 3)
+    low, high = points.min(axis=0), points.max(axis=0)
+    plate = low[2]
+    cell_size = max(resolution_mm, float(max(high[0] - low[0], high[1] - low[1])) / max_cells)
+    shape = (int(math.ceil((high[0] - low[0]) / cell_size)) + 1,
+             int(math.ceil((high[1] - low[1]) / cell_size)) + 1)
+
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    down = -np.divide(normals[:, 2], lengths, out=np.zeros(len(lengths)), where=lengths > 0)
+    overhang = down > math.sin(math.radians(angle))
+
+    cells, z, faces = rasterize(triangles, low[:2], cell_size, shape)
+    if len(cells) == 0:
+        return {'volumeMm3': 0.0, 'areaMm2': 0.0, 'angle': angle, 'resolutionMm': round(cell_size, 3)}
+
+    # Walk each column upward: downward faces enter the part (+1), upward faces leave it (-1)
+    order = np.lexsort((z, cells))
+    cells, z, faces = cells[order], z[order], faces[order]
+    enters = np.where(down[faces] > 0, 1, -1)
+    first = np.ones(len(cells), dtype=bool)
+    first[1:] = cells[1:] != cells[:-1]
+    depth = np.cumsum(enters)
+    column_start = np.maximum.accumulate(np.where(first, np.arange(len(cells)), 0))
+    before = depth - enters - (depth[column_start] - enters[column_start])
+
+    below = np.empty_like(z)
+    below[0] = plate
+    below[1:] = z[:-1]
+    below[first] = plate
+    gap = z - below
+    supported = overhang[faces] & (before <= 0) & (gap > MIN_GAP_MM)
+
+    cell_area = cell_size * cell_size
+    return {
+        'volumeMm3': round(float(gap[supported].sum() * cell_area), 1),
+        'areaMm2': round(float(supported.sum() * cell_area), 1),
+        'angle': angle,
+        'resolutionMm': round(cell_size, 3),
+    }
+
+
+def support_weight(support, density, infill=SUPPORT_DENSITY):
+    """Grams of support material for an estimate_support() result"""
+    return support['volumeMm3'] / 1000.0 * infill * density
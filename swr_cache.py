@@ -0,0 +1,91 @@
+"""
+Stale-while-revalidate cache for slow remote reads.
+
+A fresh value is served as is. Once it is older than the TTL, the cached
+value is still served right away while a single background thread fetches
+a new one. If that refresh fails, the last good value keeps being served,
+marked stale, until the remote recovers.
+"""
+
+import threading
+import time
+
+
+class StaleWhileRevalidateCache:
+    """Process-wide cache of loader results, refreshed in the background once stale"""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refresh_errors = 0
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = {'value': value, 'loaded_at': time.time(), 'error': None}
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception as e:
+            print(f"Cache refresh error for {key}: {e}")
+            with self._lock:
+                self.refresh_errors += 1
+                if key in self._entries:
+                    self._entries[key]['error'] = str(e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key, loader):
+        """
+        Return the value for `key`, calling `loader()` only when nothing is cached yet
+
+        Returns:
+            tuple: (value, info) where info has 'ageSeconds', 'stale' and the last
+                   refresh 'error' (None if the last refresh succeeded)
+
+        Raises:
+            Whatever `loader` raises when there is no cached value to fall back on
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.time() - entry['loaded_at']
+                expired = age > self.ttl
+                if expired:
+                    self.stale_hits += 1
+                    start_refresh = key not in self._refreshing
+                    if start_refresh:
+                        self._refreshing.add(key)
+                else:
+                    self.hits += 1
+                    start_refresh = False
+                value, error = entry['value'], entry['error']
+            else:
+                self.misses += 1
+
+        if entry is None:
+            value = loader()
+            self._store(key, value)
+            return value, {'ageSeconds': 0.0, 'stale': False, 'error': None}
+
+        if start_refresh:
+            threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+        return value, {'ageSeconds': round(age, 3), 'stale': expired, 'error': error}
+
+    def stats(self):
+        """Return hit/miss counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'staleHits': self.stale_hits,
+                'refreshErrors': self.refresh_errors,
+                'ttl': self.ttl,
+            }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the background email outbox against a local SMTP stand-in
+"""
+
+import socketserver
+import threading
+import time
+
+from email_outbox import EmailOutbox
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to accept mail; records sessions and messages"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.sessions = 0
+        self.messages = []
+        self.reject_data = 0
+        self.refuse = set()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.sessions += 1
+        self.reply('220 stand-in ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 stand-in')
+            elif command == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                address = line.split(':', 1)[1].strip('<> ')
+                if address in self.server.refuse:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b'.\r\n', b''):
+                        break
+                    lines.append(data_line)
+                if self.server.reject_data:
+                    self.server.reject_data -= 1
+                    self.reply('451 Try again later')
+                else:
+                    self.server.messages.append((recipients, b''.join(lines)))
+                    self.reply('250 Queued')
+            elif command == 'RSET' or command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+def make_outbox(server, **kwargs):
+    return EmailOutbox(host='127.0.0.1', port=server.server_address[1], use_tls=False,
+                       backoff=0.05, **kwargs)
+
+def test_batch_over_one_connection():
+    """Many queued messages share one SMTP session and enqueueing never blocks"""
+    print("=== Batched sending ===")
+    server = SMTPStandIn()
+    outbox = make_outbox(server)
+
+    started = time.perf_counter()
+    for i in range(10):
+        outbox.enqueue(f'customer{i}@example.com', f'Order {i}', 'Thanks!')
+    print(f"Enqueued 10 messages in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    assert outbox.wait_idle(timeout=10)
+    stats = outbox.stats()
+    print(f"Stats: {stats}")
+    assert len(server.messages) == 10 and stats['sent'] == 10
+    assert server.sessions == 1 and stats['connectionsOpened'] == 1
+    assert b'Subject: Order 3' in server.messages[3][1]
+    server.shutdown()
+
+def test_retry_then_dead_letter():
+    """Temporary failures are retried; permanent ones are dead-lettered"""
+    print("=== Retry and dead letter ===")
+    server = SMTPStandIn()
+    server.reject_data = 1
+    server.refuse = {'nobody@example.com'}
+    outbox = make_outbox(server, max_attempts=3)
+
+    outbox.enqueue('customer@example.com', 'Order', 'Thanks!')
+    outbox.enqueue('nobody@example.com', 'Order', 'Thanks!')
+    assert outbox.wait_idle(timeout=10)
+
+    stats = outbox.stats()
+    print(f"Stats: {stats}")
+    assert [m[0] for m in server.messages] == [['customer@example.com']]
+    assert stats['retried'] == 1
+    assert stats['deadLettered'] == 1
+    assert stats['deadLetters'][0]['to'] == 'nobody@example.com'
+    server.shutdown()
+
+def test_reconnects_after_server_restart():
+    """A connection dropped by the server is replaced transparently"""
+    print("=== Reconnect ===")
+    server = SMTPStandIn()
+    outbox = make_outbox(server)
+    outbox.enqueue('a@example.com', 'First', 'Thanks!')
+    assert outbox.wait_idle(timeout=10)
+
+    # Server closes the idle session from its side
+    outbox._connection.sock.shutdown(2)
+    outbox.enqueue('b@example.com', 'Second', 'Thanks!')
+    assert outbox.wait_idle(timeout=10)
+    stats = outbox.stats()
+    print(f"Stats: {stats}")
+    assert len(server.messages) == 2 and stats['deadLettered'] == 0
+    assert stats['connectionsOpened'] == 2
+    server.shutdown()
+
+if __name__ == "__main__":
+    test_batch_over_one_connection()
+    test_retry_then_dead_letter()
+    test_reconnects_after_server_restart()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the background health prober
+"""
+
+import time
+
+from health import HealthProber
+
+def test_snapshot_serves_cached_results():
+    """Slow checks run in the background and never block the snapshot"""
+    print("=== Cached health snapshot ===")
+    calls = []
+
+    def slow_check():
+        calls.append(time.time())
+        time.sleep(0.2)
+        return {'version': '1.0'}
+
+    def broken_check():
+        raise RuntimeError('connection refused')
+
+    prober = HealthProber()
+    prober.register('slow', slow_check, interval=60)
+    prober.register('broken', broken_check, interval=60, critical=False)
+
+    started = time.perf_counter()
+    snapshot = prober.snapshot()
+    elapsed = time.perf_counter() - started
+    print(f"First snapshot in {elapsed * 1000:.2f} ms: {snapshot['status']}")
+    assert elapsed < 0.1
+    assert snapshot['status'] == 'starting'
+
+    deadline = time.time() + 5
+    while time.time() < deadline and prober.snapshot()['status'] == 'starting':
+        time.sleep(0.05)
+
+    snapshot = prober.snapshot()
+    print(f"Snapshot: {snapshot}")
+    slow = snapshot['checks']['slow']
+    assert slow['healthy'] is True
+    assert slow['details'] == {'version': '1.0'}
+    assert slow['latencyMs'] >= 200
+    assert slow['ageSeconds'] >= 0
+    assert snapshot['checks']['broken']['healthy'] is False
+    assert snapshot['checks']['broken']['error'] == 'connection refused'
+    # A failing non-critical check doesn't degrade the service
+    assert snapshot['status'] == 'healthy'
+    assert len(calls) == 1
+    prober.stop()
+
+def test_critical_failure_degrades():
+    """A failing critical check marks the service degraded"""
+    print("=== Critical failure ===")
+    prober = HealthProber()
+    prober.register('database', lambda: {'healthy': False}, interval=60)
+    prober.run_check('database')
+    assert prober.snapshot()['status'] == 'degraded'
+    prober.stop()
+
+def test_live_endpoint():
+    """/health/live answers without touching any dependency"""
+    print("=== /health/live ===")
+    import app as app_module
+
+    response = app_module.app.test_client().get('/health/live')
+    print(f"Response: {response.get_json()}")
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'alive'}
+
+if __name__ == "__main__":
+    test_snapshot_serves_cached_results()
+    test_critical_failure_degrades()
+    test_live_endpoint()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled outbound HTTP client and its circuit breaker
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_client import HttpClient, CircuitOpenError
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers with the status code queued in the server's `statuses` list (200 when empty)"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    server.statuses = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/'
+
+def test_retries_and_keep_alive():
+    """5xx responses are retried, and all attempts share one pooled connection"""
+    print("=== Retries and keep-alive ===")
+    server, url = start_server()
+    try:
+        client = HttpClient()
+        client.register_endpoint('remote', timeout=2, retries=2, backoff=0.01)
+        server.statuses = [503, 502]
+        response = client.get('remote', url)
+        stats = client.stats()
+        print(f"Stats: {stats}")
+        assert response.status_code == 200
+        assert stats['endpoints']['remote']['retries'] == 2
+        assert stats['endpoints']['remote']['state'] == 'closed'
+        pool = next(iter(stats['pools'].values()))
+        assert pool['connectionsOpened'] == 1
+        assert pool['requests'] == 3
+    finally:
+        server.shutdown()
+
+def test_breaker_opens_and_recovers():
+    """Repeated failures open the breaker; a successful probe closes it"""
+    print("=== Circuit breaker ===")
+    server, url = start_server()
+    try:
+        client = HttpClient()
+        client.register_endpoint('remote', timeout=2, retries=0, failure_threshold=2, reset_timeout=0.2)
+        server.statuses = [500, 500]
+        assert client.get('remote', url).status_code == 500
+        assert client.get('remote', url).status_code == 500
+        assert not client.available('remote')
+
+        try:
+            client.get('remote', url)
+            raise AssertionError('expected CircuitOpenError')
+        except CircuitOpenError as e:
+            print(f"Short-circuited: {e}")
+        assert isinstance(CircuitOpenError(), requests.RequestException)
+
+        import time
+        time.sleep(0.25)
+        assert client.available('remote')
+        assert client.get('remote', url).status_code == 200
+        stats = client.stats()['endpoints']['remote']
+        print(f"Stats: {stats}")
+        assert stats['state'] == 'closed'
+        assert stats['shortCircuited'] == 1
+    finally:
+        server.shutdown()
+
+def test_connection_errors_raise():
+    """An unreachable host raises after its retries and counts towards the breaker"""
+    print("=== Unreachable host ===")
+    client = HttpClient()
+    client.register_endpoint('dead', timeout=0.5, retries=1, backoff=0.01, failure_threshold=1)
+    try:
+        client.get('dead', 'http://127.0.0.1:9/')
+        raise AssertionError('expected a connection error')
+    except CircuitOpenError:
+        raise AssertionError('breaker should not be open before the first call')
+    except requests.RequestException as e:
+        print(f"Error: {type(e).__name__}")
+    assert client.stats()['endpoints']['dead']['state'] == 'open'
+
+if __name__ == "__main__":
+    test_retries_and_keep_alive()
+    test_breaker_opens_and_recovers()
+    test_connection_errors_raise()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory materials catalog
+"""
+
+import threading
+import time
+
+from materials_catalog import MaterialsCatalog
+
+class FakeDoc:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeCollection:
+    """Stands in for a Firestore collection; counts reads and can push snapshots"""
+    def __init__(self, materials, listen=True):
+        self.materials = materials
+        self.listen = listen
+        self.reads = 0
+        self.callback = None
+        self.is_active = True
+        self.read_delay = 0
+
+    def stream(self):
+        self.reads += 1
+        time.sleep(self.read_delay)
+        return [FakeDoc(m) for m in self.materials]
+
+    def on_snapshot(self, callback):
+        if not self.listen:
+            raise RuntimeError('listener not supported')
+        self.callback = callback
+        self.push()
+        return self
+
+    def push(self):
+        self.callback([FakeDoc(m) for m in self.materials], [], None)
+
+    def unsubscribe(self):
+        self.callback = None
+
+class FakeDB:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def collection(self, name):
+        return self._collection
+
+MATERIALS = [
+    {'name': 'PLA', 'price': 0.03, 'density': 1.24, 'colors': [{'hex': '#FF0000', 'price': 0.05}, '#000000']},
+    {'name': 'ABS', 'price': 0.04, 'density': 1.04, 'colors': ['#FFFFFF']},
+]
+
+def test_listener_keeps_catalog_current():
+    """Lookups hit memory only, and pushed snapshots bump the version"""
+    print("=== Listener mode ===")
+    collection = FakeCollection([dict(m) for m in MATERIALS])
+    catalog = MaterialsCatalog(FakeDB(collection))
+
+    assert catalog.price_per_gram('PLA', '#FF0000') == 0.05
+    assert catalog.price_per_gram('PLA', '#000000') == 0.03
+    assert catalog.price_per_gram('ABS') == 0.04
+    assert catalog.get('Nylon') is None and catalog.price_per_gram('Nylon') is None
+    assert catalog.listening and collection.reads == 0
+    version = catalog.version
+
+    collection.materials[1]['price'] = 0.06
+    collection.push()
+    print(f"Version {version} -> {catalog.version}")
+    assert catalog.version == version + 1
+    assert catalog.price_per_gram('ABS') == 0.06
+    catalog.stop()
+
+def test_ttl_fallback():
+    """Without a listener the catalog is re-read in the background once stale"""
+    print("=== TTL mode ===")
+    collection = FakeCollection([dict(m) for m in MATERIALS], listen=False)
+    timed_reads = []
+    catalog = MaterialsCatalog(FakeDB(collection), ttl=0.1, on_read=timed_reads.append)
+
+    assert catalog.price_per_gram('PLA') == 0.03
+    assert not catalog.listening and collection.reads == 1
+    catalog.price_per_gram('PLA')
+    # Only collection reads are timed, not the in-memory lookups
+    assert collection.reads == 1 and len(timed_reads) == 1
+
+    collection.materials[0]['price'] = 0.02
+    time.sleep(0.15)
+    catalog.price_per_gram('PLA')  # Stale: served from memory, refreshed in the background
+    deadline = time.time() + 2
+    while catalog.price_per_gram('PLA') != 0.02 and time.time() < deadline:
+        time.sleep(0.01)
+    print(f"Reads: {collection.reads}, version: {catalog.version}")
+    assert catalog.price_per_gram('PLA') == 0.02
+
+def test_concurrent_first_load():
+    """Requests arriving during the first load wait for it instead of seeing an empty catalog"""
+    print("=== Concurrent first load ===")
+    collection = FakeCollection([dict(m) for m in MATERIALS], listen=False)
+    collection.read_delay = 0.2
+    catalog = MaterialsCatalog(FakeDB(collection))
+
+    prices = []
+    threads = [threading.Thread(target=lambda: prices.append(catalog.price_per_gram('PLA'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Prices: {prices}, reads: {collection.reads}")
+    assert prices == [0.03] * 4
+    assert collection.reads == 1
+
+def test_dead_listener_falls_back_to_ttl():
+    """Once the watch stops, the catalog polls like it would without a listener"""
+    print("=== Dead listener ===")
+    collection = FakeCollection([dict(m) for m in MATERIALS])
+    catalog = MaterialsCatalog(FakeDB(collection), ttl=0.1)
+    assert catalog.price_per_gram('PLA') == 0.03 and catalog.listening
+
+    collection.is_active = False
+    collection.materials[0]['price'] = 0.02
+    time.sleep(0.15)
+    deadline = time.time() + 2
+    while catalog.price_per_gram('PLA') != 0.02 and time.time() < deadline:
+        time.sleep(0.01)
+    print(f"Reads: {collection.reads}, listening: {catalog.listening}")
+    assert not catalog.listening
+    assert catalog.price_per_gram('PLA') == 0.02 and collection.reads >= 1
+
+def test_calculate_reports_version():
+    """/calculate prices from the catalog and reports its version"""
+    print("=== /calculate ===")
+    import app as app_module
+
+    collection = FakeCollection([dict(m) for m in MATERIALS])
+    original_catalog, original_db = app_module.materials_catalog, app_module.db
+    app_module.materials_catalog = MaterialsCatalog(FakeDB(collection))
+    app_module.db = FakeDB(collection)
+    try:
+        response = app_module.app.test_client().post('/calculate', json={
+            'material': 'PLA', 'color': '#FF0000', 'weight': 100
+        })
+        body = response.get_json()
+    finally:
+        app_module.materials_catalog, app_module.db = original_catalog, original_db
+
+    print(f"Response: {body}")
+    assert body['breakdown']['pricePerGram'] == 0.05
+    assert body['catalogVersion'] == 1
+    assert collection.reads == 0
+
+if __name__ == "__main__":
+    test_listener_keeps_catalog_current()
+    test_ttl_fallback()
+    test_concurrent_first_load()
+    test_dead_listener_falls_back_to_ttl()
+    test_calculate_reports_version()
+    print("Test completed.")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared, lazily computed MeshAnalysis
+"""
+
+import os
+import tempfile
+import trimesh
+
+import mesh_analysis
+import quoting
+from mesh_analysis import MeshAnalysis
+
+def write_test_stl(mesh):
+    with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+        f.write(trimesh.exchange.stl.export_stl(mesh))
+        return f.name
+
+def test_properties():
+    """Derived properties match trimesh and are memoized"""
+    print("=== Properties ===")
+    ball = trimesh.creation.icosphere(subdivisions=3, radius=10)
+    cube = trimesh.creation.box(extents=(4, 4, 4), transform=trimesh.transformations.translation_matrix([30, 0, 0]))
+    mesh = MeshAnalysis(trimesh.util.concatenate([ball, cube]).triangles, units='cm')
+
+    print(f"Volume {mesh.volume_mm3:.1f} mm³, {mesh.components} components")
+    assert mesh.components == 2
+    assert mesh.is_watertight
+    assert abs(mesh.volume_mm3 - (ball.volume + cube.volume) * 1000) < 1e-3
+    assert abs(mesh.extents[0] - 420.0) < 1e-3
+    assert mesh.slices(0.2) is mesh.slices(0.2)
+    assert mesh.check() is mesh.check()
+    assert mesh.check()['reliability'] == 'exact'
+    assert mesh.estimate_weight(20, 1.24) is mesh.estimate_weight(20, 1.24, **{})
+    assert mesh.estimate_weight(20, 1.24) is not mesh.estimate_weight(30, 1.24)
+    flipped = [[1, 0, 0], [0, -1, 0], [0, 0, -1]]
+    assert mesh.estimate_support(rotation=flipped) is mesh.estimate_support(rotation=[row[:] for row in flipped])
+    assert mesh.estimate_support() is not mesh.estimate_support(rotation=flipped)
+
+    seeded = MeshAnalysis(ball.triangles, stats={'volume_mm3': 1.0, 'extents': [1, 1, 1]})
+    assert seeded.volume_mm3 == 1.0
+
+def test_quote_loads_once():
+    """A quote that falls through every path still reads the file once"""
+    print("=== Single load per quote ===")
+    path = write_test_stl(trimesh.creation.box(extents=(20, 20, 20)))
+    loads = []
+    original_load = mesh_analysis.load_triangles
+    original_api = quoting.call_stl_weight_api
+
+    def counting_load(stl_file_path):
+        loads.append(stl_file_path)
+        return original_load(stl_file_path)
+
+    mesh_analysis.load_triangles = counting_load
+    quoting.call_stl_weight_api = lambda **kwargs: None
+    try:
+        params = {'units': 'mm', 'infill': 0.2, 'wallThickness': 1.2, 'layerHeight': 0.2,
+                  'topBottomLayers': 3, 'perimeters': 2, 'density': 1.24}
+        quote = quoting.run_quote(path, params, weight_estimator='api')
+        expected = quoting.calculate_wall_and_infill_volume(path)
+    finally:
+        mesh_analysis.load_triangles = original_load
+        quoting.call_stl_weight_api = original_api
+        os.unlink(path)
+
+    print(f"Quote: {quote['calculationMethod']}, {len(loads)} loads")
+    assert quote['calculationMethod'].startswith('Slicer fallback')
+    assert quote['meshCheck']['reliability'] == 'exact'
+    assert abs(quote['weight'] - expected['total_weight']) < 1e-9
+    # One load for the quote, one for the separate calculate_wall_and_infill_volume call
+    assert len(loads) == 2
+
+def test_large_mesh_skips_check():
+    """Meshes above the check budget are quoted without validation, and say why"""
+    print("=== Mesh check budget ===")
+    path = write_test_stl(trimesh.creation.icosphere(subdivisions=3, radius=10))
+    original_limit = quoting.MESH_CHECK_MAX_TRIANGLES
+    original_check = MeshAnalysis.check
+    quoting.MESH_CHECK_MAX_TRIANGLES = 100
+
+    def no_check(self, *args, **kwargs):
+        raise AssertionError('large meshes must not be validated')
+
+    MeshAnalysis.check = no_check
+    try:
+        params = {'units': 'mm', 'infill': 0.2, 'wallThickness': 1.2, 'layerHeight': 0.2,
+                  'topBottomLayers': 3, 'perimeters': 2, 'density': 1.24}
+        quote = quoting.run_quote(path, params, weight_estimator='local')
+    finally:
+        quoting.MESH_CHECK_MAX_TRIANGLES = original_limit
+        MeshAnalysis.check = original_check
+        os.unlink(path)
+
+    print(f"Skipped: {quote['meshCheckSkipped']}")
+    assert quote['calculationMethod'].startswith('Local engine')
+    assert quote['meshCheck'] is None
+    assert '1280 triangles' in quote['meshCheckSkipped']
+
+if __name__ == "__main__":
+    test_properties()
+    test_quote_loads_once()
+    test_large_mesh_skips_check()
+    print("Test completed.")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for mesh validation and bounded repair in mesh_validation.py
+"""
+
+import os
+import tempfile
+import numpy as np
+import trimesh
+
+from mesh_validation import check_stl, repair_triangles, validate_triangles
+
+SPHERE = trimesh.creation.icosphere(subdivisions=3, radius=10)
+
+def test_closed_mesh_is_exact():
+    """A closed, consistently wound sphere has no defects"""
+    print("=== Closed sphere ===")
+    report = validate_triangles(SPHERE.triangles)
+    print(f"{report['edge_count']} edges, volume {report['volume_mm3']:.2f} mm³ (trimesh {SPHERE.volume:.2f})")
+
+    assert report['reliability'] == 'exact'
+    assert report['watertight'] and report['winding_consistent']
+    assert report['boundary_edges'] == report['non_manifold_edges'] == 0
+    assert report['flipped_faces'] == report['degenerate_faces'] == 0
+    assert report['edge_count'] == len(SPHERE.edges_unique)
+    assert abs(report['volume_mm3'] - SPHERE.volume) / SPHERE.volume < 1e-6
+
+def test_defects_detected():
+    """Open edges, flipped faces, degenerate and non-manifold triangles are all counted"""
+    print("=== Defects ===")
+    holed = validate_triangles(SPHERE.triangles[5:])
+    print(f"Holed: {holed['boundary_edges']} open edges, {holed['reliability']}")
+    assert holed['boundary_edges'] == 9
+    assert not holed['watertight']
+
+    flipped = SPHERE.triangles.copy()
+    flipped[:3] = flipped[:3, ::-1]
+    report = validate_triangles(flipped)
+    print(f"Flipped: {report['flipped_faces']} faces touch {report['inconsistent_edges']} inconsistent edges")
+    assert report['inconsistent_edges'] > 0
+    assert report['reliability'] == 'unreliable'
+
+    inverted = validate_triangles(SPHERE.triangles[:, ::-1])
+    assert inverted['inverted'] and inverted['winding_consistent']
+
+    sliver = np.array([[[0, 0, 0], [1, 1, 1], [2, 2, 2]]], dtype=np.float32)
+    report = validate_triangles(np.concatenate([SPHERE.triangles, sliver]))
+    assert report['degenerate_faces'] == 1
+
+    # A face repeated twice makes its edges shared by three or more faces
+    report = validate_triangles(np.concatenate([SPHERE.triangles, SPHERE.triangles[:1]]))
+    assert report['non_manifold_edges'] == 3
+
+def test_repair():
+    """Holes, flipped faces and inversion are repaired within the budget"""
+    print("=== Repair ===")
+    broken = SPHERE.triangles[5:].copy()
+    broken[:40] = broken[:40, ::-1]
+    repaired, log = repair_triangles(broken[:, ::-1])
+    print(f"Steps: {log['steps']}")
+
+    assert log['attempted'] and not log['timedOut']
+    assert log['report']['reliability'] == 'exact'
+    assert not log['report']['inverted']
+    assert 'fill_holes' in log['steps']
+    assert abs(log['report']['volume_mm3'] - SPHERE.volume) / SPHERE.volume < 1e-3
+
+    skipped, log = repair_triangles(broken, max_faces=100)
+    assert skipped is None and not log['attempted']
+
+def test_check_stl():
+    """check_stl reports repaired volumes in mm"""
+    print("=== check_stl ===")
+    mesh = trimesh.Trimesh(SPHERE.vertices, SPHERE.faces[1:], process=False)
+    with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+        f.write(trimesh.exchange.stl.export_stl(mesh))
+    try:
+        report = check_stl(f.name, units='cm')
+        unrepaired = check_stl(f.name, units='cm', repair=False)
+    finally:
+        os.unlink(f.name)
+
+    print(f"{report['reliability']}: {report['volume_mm3'] / 1000.0:.2f} cm³")
+    assert report['reliability'] == 'repaired'
+    assert report['repair']['steps'] == ['fill_holes']
+    assert abs(report['volume_mm3'] / 1000.0 - SPHERE.volume) / SPHERE.volume < 1e-3
+    assert np.allclose(report['extents'], [200, 200, 200], rtol=1e-3)
+    assert unrepaired['reliability'] == 'approximate'
+
+if __name__ == "__main__":
+    test_closed_mesh_is_exact()
+    test_defects_detected()
+    test_repair()
+    test_check_stl()
+    print("Test completed.")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics registry and the /metrics endpoint
+"""
+
+import io
+import trimesh
+
+from metrics import MetricsRegistry
+from quote_cache import QuoteCache
+
+def test_text_format():
+    """Counters and histograms render in the Prometheus text format"""
+    print("=== Text format ===")
+    registry = MetricsRegistry()
+    requests_total = registry.counter('requests_total', 'Requests', ('route', 'status'))
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    requests_total.inc(route='/a', status=200)
+    requests_total.inc(2, route='/a', status=200)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, route='/a')
+
+    text = registry.render()
+    print(text)
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/a",status="200"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 5.55' in text
+
+    try:
+        requests_total.inc(route='/a')
+        assert False, 'missing label should raise'
+    except ValueError:
+        pass
+
+def test_metrics_endpoint():
+    """Uploads record route latency, upload/quote stages and the path that produced the weight"""
+    print("=== /metrics ===")
+    import app as app_module
+    import quoting
+
+    original_api = quoting.call_stl_weight_api
+    original_estimator = quoting.WEIGHT_ESTIMATOR
+    original_cache = app_module.quote_cache
+    quoting.call_stl_weight_api = lambda **kwargs: None  # Remote API failure: slicer fallback
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    app_module.quote_cache = QuoteCache()
+    try:
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+        client = app_module.app.test_client()
+        for _ in range(2):
+            form = {'file': (io.BytesIO(stl_bytes), 'cube.stl'), 'orient': '1', 'support': '1'}
+            response = client.post('/upload-stl', data=form, content_type='multipart/form-data')
+            assert response.status_code == 200
+            assert 'timings' not in response.get_json()
+        response = client.get('/metrics')
+    finally:
+        quoting.call_stl_weight_api = original_api
+        quoting.WEIGHT_ESTIMATOR = original_estimator
+        app_module.quote_cache = original_cache
+
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert 'http_requests_total{route="/upload-stl",method="POST",status="200"} 2' in text
+    assert 'http_request_duration_seconds_count{route="/upload-stl",method="POST"} 2' in text
+    assert 'http_requests_in_flight{route="/metrics"} 1' in text
+    for stage in ('hash', 'parse', 'save', 'validate', 'orient', 'support', 'print_time',
+                  'remote_api', 'fallback'):
+        assert f'quote_stage_seconds_count{{stage="{stage}"}}' in text, stage
+    # Fallback quotes are not cached, so both uploads ran the pipeline
+    assert 'quotes_total{path="fallback"} 2' in text
+    assert 'quotes_total{path="cache"}' not in text
+    print("\n".join(line for line in text.splitlines() if line.startswith('quotes_total')))
+
+if __name__ == "__main__":
+    test_text_format()
+    test_metrics_endpoint()
+    print("Test completed.")
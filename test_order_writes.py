@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for batched order writes and background side effects
+"""
+
+import threading
+
+from dispatcher import SideEffectDispatcher
+
+class FakeRef:
+    def __init__(self, path):
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+class FakeCollectionRef:
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            self.db.generated += 1
+            return FakeRef(f'{self.path}/auto{self.db.generated}')
+        return FakeDocumentRef(self.db, f'{self.path}/{doc_id}')
+
+    def add(self, data):
+        raise AssertionError('orders must be written through a batch')
+
+class FakeDocumentRef(FakeRef):
+    def __init__(self, db, path):
+        super().__init__(path)
+        self.db = db
+
+    def collection(self, name):
+        return FakeCollectionRef(self.db, f'{self.path}/{name}')
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref.path, dict(data)))
+
+    def commit(self):
+        self.db.commits += 1
+        if self.db.fail_commit:
+            raise RuntimeError('commit failed')
+        self.db.documents.update(self.writes)
+
+class FakeDB:
+    def __init__(self, fail_commit=False):
+        self.documents = {}
+        self.commits = 0
+        self.generated = 0
+        self.fail_commit = fail_commit
+
+    def collection(self, name):
+        return FakeCollectionRef(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+ORDER = {
+    'customer': {'name': 'Ada', 'email': 'ada@example.com'},
+    'shipping': {'method': 'standard'},
+    'items': [{'filename': 'part.stl', 'weight': 10.0}],
+    'total': 12.5,
+    'userId': 'user1',
+}
+
+def post_order(db, emails=None):
+    import app as app_module
+    original_db, original_send = app_module.db, app_module.send_order_confirmation_email
+    app_module.db = db
+    app_module.send_order_confirmation_email = (emails if emails is not None else []).append
+    try:
+        response = app_module.app.test_client().post('/api/orders', json=ORDER)
+        app_module.side_effects.wait_idle(timeout=5)
+        return response
+    finally:
+        app_module.db, app_module.send_order_confirmation_email = original_db, original_send
+
+def test_order_written_in_one_batch():
+    """Both order documents are committed together in a single round trip"""
+    print("=== Batched order write ===")
+    db = FakeDB()
+    emails = []
+    response = post_order(db, emails)
+    print(f"Documents: {list(db.documents)}")
+    assert response.status_code == 200
+    assert len(emails) == 1 and emails[0]['firestoreId'] == 'auto1'
+    assert db.commits == 1
+    assert set(db.documents) == {'orders/auto1', 'users/user1/orders/auto2'}
+    assert db.documents['users/user1/orders/auto2']['firestoreId'] == 'auto1'
+
+def test_failed_commit_writes_nothing():
+    """A failed commit leaves neither document behind, fails the request and sends no email"""
+    print("=== Failed commit ===")
+    db = FakeDB(fail_commit=True)
+    emails = []
+    response = post_order(db, emails)
+    print(f"Response: {response.status_code} {response.get_json()}")
+    assert response.status_code == 500
+    assert db.commits == 1 and db.documents == {}
+    assert emails == []
+
+def test_side_effects_run_in_background():
+    """Dispatched work runs off the calling thread and failures are only counted"""
+    print("=== Side effect dispatcher ===")
+    dispatcher = SideEffectDispatcher()
+    threads = []
+    dispatcher.dispatch('record', lambda: threads.append(threading.current_thread().name))
+    dispatcher.dispatch('broken', lambda: 1 / 0)
+    assert dispatcher.wait_idle(timeout=5)
+    stats = dispatcher.stats()
+    print(f"Stats: {stats}")
+    assert threads == ['side-effects-0']
+    assert stats['completed'] == 1 and stats['failed'] == 1
+
+if __name__ == "__main__":
+    test_order_written_in_one_batch()
+    test_failed_commit_writes_nothing()
+    test_side_effects_run_in_background()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the print-orientation search
+"""
+
+import io
+import time
+
+import numpy as np
+import trimesh
+
+import orientation
+import quoting
+from jobs import JobQueue
+from mesh_analysis import MeshAnalysis
+from orientation import optimize_orientation, rotation_to_up
+
+def make_tee(subdivisions=0):
+    """A 10×10 stem standing on the plate under a 30×30 cap, so the cap overhangs"""
+    stem = trimesh.creation.box(extents=(10, 10, 22), transform=trimesh.transformations.translation_matrix([0, 0, 11]))
+    cap = trimesh.creation.box(extents=(30, 30, 5), transform=trimesh.transformations.translation_matrix([0, 0, 22.5]))
+    mesh = trimesh.util.concatenate([stem, cap])
+    for _ in range(subdivisions):
+        mesh = mesh.subdivide()
+    return MeshAnalysis(mesh.triangles.astype(np.float32))
+
+def test_box_lies_flat():
+    """A tall box is laid down on its largest face"""
+    print("=== Box ===")
+    box = MeshAnalysis(trimesh.creation.box(extents=(10, 20, 40)).triangles.astype(np.float32))
+    result = optimize_orientation(box, candidates=50)
+    print(f"Up {result['up']}, height {result['asUploaded']['heightMm']} -> {result['heightMm']} mm")
+    assert result['heightMm'] == 10.0 and result['supportVolumeMm3'] == 0.0
+    assert result['asUploaded']['heightMm'] == 40.0
+
+    rotated = box.triangles.reshape(-1, 3) @ np.array(result['rotation']).T
+    assert abs(np.ptp(rotated[:, 2]) - 10.0) < 1e-4
+
+def test_overhang_is_flipped():
+    """The tee's cap needs support as uploaded; standing it on the cap avoids that"""
+    print("=== Tee ===")
+    result = optimize_orientation(make_tee(), candidates=100)
+    uploaded = result['asUploaded']
+    print(f"Support {uploaded['supportVolumeMm3']} -> {result['supportVolumeMm3']} mm³")
+    # The whole 30×30 underside of the cap hangs 20 mm over the plate
+    assert abs(uploaded['overhangAreaMm2'] - 900.0) < 1.0
+    assert abs(uploaded['supportVolumeMm3'] - 900.0 * 20) < 1.0
+    assert abs(uploaded['contactAreaMm2'] - 100.0) < 1.0
+    # Upside down, only the stem's end (overlapping the cap) faces down, 3 mm over the plate
+    assert result['up'] == [0.0, 0.0, -1.0]
+    assert abs(result['supportVolumeMm3'] - 100.0 * 3) < 1.0
+    assert abs(result['contactAreaMm2'] - 900.0) < 1.0
+
+    R = rotation_to_up([0.3, -0.5, 0.8])
+    assert np.allclose(R @ (np.array([0.3, -0.5, 0.8]) / np.linalg.norm([0.3, -0.5, 0.8])), [0, 0, 1])
+
+def test_sampled_ranking_and_pool():
+    """Ranking on a face sample and spreading it over the pool pick the exact answer"""
+    print("=== Sampling and pool ===")
+    tee = make_tee(subdivisions=3)
+    exact = optimize_orientation(tee, candidates=100)
+
+    sample_faces = orientation.SAMPLE_FACES
+    workers, min_evaluations = orientation.ORIENTATION_WORKERS, orientation.POOL_MIN_EVALUATIONS
+    try:
+        orientation.SAMPLE_FACES = 500
+        sampled = optimize_orientation(tee, candidates=100)
+        orientation.ORIENTATION_WORKERS, orientation.POOL_MIN_EVALUATIONS = 2, 0
+        pooled = optimize_orientation(tee, candidates=100)
+    finally:
+        orientation.SAMPLE_FACES = sample_faces
+        orientation.ORIENTATION_WORKERS, orientation.POOL_MIN_EVALUATIONS = workers, min_evaluations
+
+    print(f"{tee.triangle_count} faces: exact {exact['up']}, sampled {sampled['up']}, pooled {pooled['up']}")
+    assert sampled == exact
+    assert pooled == sampled
+
+def test_quotes_orient_on_request():
+    """Quotes only search orientations when asked, and big meshes are then quoted in the background"""
+    print("=== Opt-in orientation ===")
+    import app as app_module
+
+    assert optimize_orientation(MeshAnalysis(np.zeros((0, 3, 3), dtype=np.float32))) is None
+
+    originals = (quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR, app_module.quote_jobs,
+                 app_module.ANALYSIS_INLINE_MAX_TRIANGLES)
+    quoting.call_stl_weight_api = lambda **kwargs: 42.0
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    try:
+        client = app_module.app.test_client()
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 20, 40)))
+        upload = lambda **form: client.post('/upload-stl', data=dict(form, file=(io.BytesIO(stl_bytes), 'box.stl')),
+                                            content_type='multipart/form-data')
+        assert upload().get_json()['orientation'] is None
+        oriented = upload(orient='1').get_json()
+        assert oriented['orientation']['heightMm'] == 10.0
+
+        app_module.ANALYSIS_INLINE_MAX_TRIANGLES = 0
+        app_module.quote_jobs = JobQueue(max_workers=1)
+        response = upload(orient='1', infill='30')
+        assert response.status_code == 202
+        assert upload(infill='30').status_code == 200
+        status_url = response.get_json()['statusUrl']
+        deadline = time.time() + 60
+        while (job := client.get(status_url).get_json())['status'] not in ('done', 'failed'):
+            assert time.time() < deadline, 'orientation job did not finish'
+            time.sleep(0.2)
+        print(f"Job {job['status']}: height {job['result']['orientation']['heightMm']} mm")
+        assert job['result']['orientation']['heightMm'] == 10.0
+    finally:
+        (quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR, app_module.quote_jobs,
+         app_module.ANALYSIS_INLINE_MAX_TRIANGLES) = originals
+
+if __name__ == "__main__":
+    test_box_lies_flat()
+    test_overhang_is_flipped()
+    test_sampled_ranking_and_pool()
+    test_quotes_orient_on_request()
+    print("\n✅ All orientation tests passed")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for cursor-paginated Firestore list endpoints
+"""
+
+from datetime import datetime, timedelta
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, fields=None):
+        self.id = doc_id
+        self._data = data
+        self._fields = fields
+        self.exists = data is not None
+
+    def to_dict(self):
+        if self._fields:
+            return {k: v for k, v in self._data.items() if k in self._fields}
+        return dict(self._data)
+
+class FakeQuery:
+    """Minimal Firestore query: where, order_by, select, start_after and limit over in-memory docs"""
+    def __init__(self, docs, filters=(), order=None, fields=None, after=None, limit=None):
+        self.docs = docs
+        self.filters = list(filters)
+        self.order = order
+        self.fields = fields
+        self.after = after
+        self._limit = limit
+        self.streamed = 0
+        self.orderings = []
+
+    def _copy(self, **changes):
+        state = dict(filters=self.filters, order=self.order, fields=self.fields,
+                     after=self.after, limit=self._limit)
+        state.update(changes)
+        query = FakeQuery(self.docs, **state)
+        query.root = getattr(self, 'root', self)
+        return query
+
+    def where(self, field, op, value):
+        return self._copy(filters=self.filters + [(field, op, value)])
+
+    def order_by(self, field, direction='ASCENDING'):
+        getattr(self, 'root', self).orderings.append((field, direction))
+        return self._copy(order=(field, direction))
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def start_after(self, snapshot):
+        return self._copy(after=snapshot.id)
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def document(self, doc_id):
+        docs = self.docs
+        subcollections = getattr(self, 'subcollections', {})
+        class Ref:
+            def get(self):
+                return FakeSnapshot(doc_id, docs.get(doc_id))
+            def collection(self, name):
+                return subcollections[(doc_id, name)]
+        return Ref()
+
+    def stream(self):
+        getattr(self, 'root', self).streamed += 1
+        items = list(self.docs.items())
+        for field, op, value in self.filters:
+            if op == '==':
+                items = [(i, d) for i, d in items if d.get(field) == value]
+            elif op == 'in':
+                items = [(i, d) for i, d in items if d.get(field) in value]
+        if self.order:
+            field, direction = self.order
+            items.sort(key=lambda item: (item[1][field], item[0]), reverse=(direction == 'DESCENDING'))
+        if self.after is not None:
+            ids = [i for i, _ in items]
+            items = items[ids.index(self.after) + 1:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        return [FakeSnapshot(i, d, self.fields) for i, d in items]
+
+class FakeDB:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def collection(self, path):
+        return self.collections[path]
+
+def make_applications(count):
+    start = datetime(2025, 1, 1)
+    return {
+        f'app{i:03d}': {
+            'name': f'Applicant {i}',
+            'email': f'a{i}@example.com',
+            'status': ['pending', 'accepted', 'denied'][i % 3],
+            'submittedAt': start + timedelta(hours=i),
+            'printerCount': 1,
+            'printers': [{'model': 'Bambu X1C', 'buildVolume': [256, 256, 256]}],
+        }
+        for i in range(count)
+    }
+
+def test_admin_applications_pages():
+    """Pages follow nextCursor newest-first, filter by status and honour projection"""
+    print("=== /api/admin/applications pagination ===")
+    import app as app_module
+
+    collection = FakeQuery(make_applications(25))
+    original_db = app_module.db
+    app_module.db = FakeDB({'printer-applications': collection})
+    try:
+        client = app_module.app.test_client()
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/admin/applications?status=pending&limit=3&fields=name,status,submittedAt'
+            if cursor:
+                url += f'&startAfter={cursor}'
+            page = client.get(url).get_json()
+            seen.extend(page['applications'])
+            cursor = page['nextCursor']
+            if not cursor:
+                break
+
+        print(f"Fetched {len(seen)} pending applications in {collection.streamed} queries")
+        assert [a['id'] for a in seen] == [f'app{i:03d}' for i in range(24, -1, -1) if i % 3 == 0]
+        assert all(set(a) == {'id', 'name', 'status', 'submittedAt'} for a in seen)
+        assert collection.streamed == 3
+
+        history = client.get('/api/admin/applications?status=accepted,denied&limit=100').get_json()
+        assert len(history['applications']) == 16 and history['nextCursor'] is None
+        assert set(collection.orderings) == {('submittedAt', 'DESCENDING')}
+
+        response = client.get('/api/admin/applications?startAfter=missing')
+        assert response.status_code == 400
+    finally:
+        app_module.db = original_db
+
+def test_user_orders_pages():
+    """Orders come back newest first in pages, with an items-free summary view"""
+    print("=== GET /api/orders pagination ===")
+    import app as app_module
+
+    start = datetime(2025, 3, 1)
+    orders = FakeQuery({
+        f'order{i:02d}': {
+            'orderNumber': f'ORD{i:03d}',
+            'status': 'pending',
+            'createdAt': (start + timedelta(days=i)).isoformat(),
+            'total': 10.0 + i,
+            'itemCount': 2,
+            'items': [{'filename': 'part.stl', 'weight': 12.5}] * 2,
+        }
+        for i in range(7)
+    })
+    users = FakeQuery({'user1': {}})
+    users.subcollections = {('user1', 'orders'): orders}
+    original_db = app_module.db
+    app_module.db = FakeDB({'users': users})
+    try:
+        client = app_module.app.test_client()
+        first = client.get('/api/orders?userId=user1&limit=5&view=summary').get_json()
+        print(f"First page: {[o['orderNumber'] for o in first['orders']]}")
+        assert [o['orderNumber'] for o in first['orders']] == ['ORD006', 'ORD005', 'ORD004', 'ORD003', 'ORD002']
+        assert all('items' not in o for o in first['orders'])
+        assert first['count'] == 5 and first['nextCursor'] == 'order02'
+
+        second = client.get(f"/api/orders?userId=user1&limit=5&startAfter={first['nextCursor']}").get_json()
+        assert [o['orderNumber'] for o in second['orders']] == ['ORD001', 'ORD000']
+        assert second['orders'][0]['items'] and second['nextCursor'] is None
+        assert set(orders.orderings) == {('createdAt', 'DESCENDING')}
+    finally:
+        app_module.db = original_db
+
+if __name__ == "__main__":
+    test_admin_applications_pages()
+    test_user_orders_pages()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for decimated GLB previews and GET /previews/<hash>
+"""
+
+import io
+import json
+import shutil
+import struct
+import tempfile
+import time
+
+import numpy as np
+import trimesh
+
+import quoting
+from jobs import JobQueue
+from previews import PreviewStore, decimate, encode_glb
+from quote_cache import QuoteCache
+
+def parse_glb(data):
+    """Split a GLB into its JSON document and binary chunk"""
+    magic, version, length = struct.unpack_from('<4sII', data, 0)
+    assert magic == b'glTF' and version == 2 and length == len(data)
+    json_length, = struct.unpack_from('<I', data, 12)
+    document = json.loads(data[20:20 + json_length])
+    binary_length, = struct.unpack_from('<I', data, 20 + json_length)
+    binary = data[28 + json_length:28 + json_length + binary_length]
+    return document, binary
+
+def test_decimate_keeps_shape():
+    """A dense sphere fits the triangle budget and keeps its volume and bounds"""
+    print("=== Decimation ===")
+    sphere = trimesh.creation.icosphere(subdivisions=6, radius=20)
+    vertices, faces = decimate(sphere.triangles.astype(np.float32), max_triangles=5000)
+    simplified = trimesh.Trimesh(vertices, faces, process=False)
+    print(f"{len(sphere.faces)} -> {len(faces)} triangles, volume {sphere.volume:.0f} -> {simplified.volume:.0f}")
+    assert 4000 <= len(faces) <= 5000
+    assert abs(simplified.volume - sphere.volume) / sphere.volume < 0.01
+    assert np.allclose(simplified.bounds, sphere.bounds, atol=0.2)
+
+    # Meshes already under budget are only welded
+    box = trimesh.creation.box(extents=(1, 2, 3))
+    vertices, faces = decimate(box.triangles, max_triangles=5000)
+    assert len(vertices) == 8 and len(faces) == 12
+
+def test_glb_layout():
+    """Positions are quantized to 16 bits and the node transform restores them, Y up"""
+    print("=== GLB ===")
+    box = trimesh.creation.box(extents=(10, 20, 30), transform=trimesh.transformations.translation_matrix([5, 0, 15]))
+    vertices, faces = decimate(box.triangles)
+    document, binary = parse_glb(encode_glb(vertices, faces))
+    assert document['extensionsRequired'] == ['KHR_mesh_quantization']
+
+    positions = np.frombuffer(binary, dtype=np.uint16, count=len(vertices) * 4).reshape(-1, 4)[:, :3]
+    node = document['nodes'][0]
+    scaled = positions * np.array(node['scale'])
+    # -90° about X: (x, y, z) -> (x, z, -y), then the translation
+    restored = np.column_stack([scaled[:, 0], scaled[:, 2], -scaled[:, 1]]) + node['translation']
+    original = np.column_stack([vertices[:, 0], vertices[:, 2], -vertices[:, 1]])
+    assert np.abs(restored - original).max() < 30 / 65535 + 1e-9
+    assert document['accessors'][1]['count'] == faces.size
+
+    loaded = trimesh.load(io.BytesIO(encode_glb(vertices, faces)), file_type='glb', force='mesh')
+    assert np.allclose(loaded.extents, [10, 30, 20], atol=1e-3)
+
+def test_preview_endpoint():
+    """Uploads get an immutable preview URL, decimated by a background job; cache hits don't spill"""
+    print("=== /previews ===")
+    import app as app_module
+    from stl_upload import STLUploadStream
+
+    originals = (quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR, app_module.quote_cache,
+                 app_module.preview_store, app_module.quote_jobs, app_module.preview_jobs, STLUploadStream.path)
+    cache_dir = tempfile.mkdtemp()
+    quoting.call_stl_weight_api = lambda **kwargs: 42.0
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    app_module.quote_cache = QuoteCache()
+    app_module.preview_store = PreviewStore(cache_dir)
+    # A full quote queue doesn't hold up previews, which have their own
+    app_module.quote_jobs = JobQueue(max_workers=1, max_pending=0)
+    app_module.preview_jobs = JobQueue(max_workers=1)
+    try:
+        client = app_module.app.test_client()
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.icosphere(subdivisions=3, radius=10))
+        upload = lambda: client.post('/upload-stl', data={'file': (io.BytesIO(stl_bytes), 'ball.stl')},
+                                     content_type='multipart/form-data').get_json()
+        body = upload()
+        print(body['preview'])
+        assert body['preview']['status'] == 'pending'
+        deadline = time.time() + 60
+        while (response := client.get(body['preview']['url'])).status_code != 200:
+            assert response.status_code == 202
+            assert time.time() < deadline, 'preview job did not finish'
+            time.sleep(0.2)
+
+        assert response.content_type == 'model/gltf-binary'
+        assert 'immutable' in response.headers['Cache-Control']
+        document, _ = parse_glb(response.data)
+        assert document['accessors'][1]['count'] == 1280 * 3
+        etag = response.headers['ETag']
+        assert client.get(body['preview']['url'], headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/previews/' + '0' * 64).status_code == 404
+        assert client.get('/previews/not-a-hash').status_code == 404
+
+        # A cache hit whose preview exists never writes the upload to disk
+        spills = []
+        original_path = STLUploadStream.path
+        STLUploadStream.path = lambda stream: spills.append(stream) or original_path(stream)
+        cached = upload()
+        assert cached['cached'] is True and cached['preview']['status'] == 'ready'
+        assert spills == []
+    finally:
+        (quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR, app_module.quote_cache,
+         app_module.preview_store, app_module.quote_jobs, app_module.preview_jobs, STLUploadStream.path) = originals
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_decimate_keeps_shape()
+    test_glb_layout()
+    test_preview_endpoint()
+    print("\n✅ All preview tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the preset-driven print-time estimator
+"""
+
+import trimesh
+
+from mesh_analysis import MeshAnalysis
+from materials_catalog import MaterialsCatalog
+from print_time import estimate_print_times, extrusion_path_lengths, load_printer_presets, parse_js_literal
+from test_materials_catalog import FakeCollection, FakeDB, MATERIALS
+
+def test_presets_parse():
+    """printers-presets.js is read server-side, skipping the incomplete 'custom' entry"""
+    print("=== Presets ===")
+    presets = load_printer_presets()
+    print(f"{len(presets)} presets, first: {presets[0]}")
+    assert len(presets) > 30
+    assert all(preset['id'] != 'custom' for preset in presets)
+    assert presets[0]['bedSize'] == {'x': 180.0, 'y': 180.0, 'z': 180.0}
+
+    parsed = parse_js_literal("window.X = [\n  // c\n  {a: 'it\\'s', b: [1, 2.5,], c: {d: true},},\n];")
+    assert parsed == [{'a': "it's", 'b': [1, 2.5], 'c': {'d': True}}]
+
+def test_estimates():
+    """Path lengths follow the slicer model; faster printers finish sooner; beds are checked"""
+    print("=== Estimates ===")
+    mesh = MeshAnalysis(trimesh.creation.box(extents=(20, 20, 20)).triangles)
+    slices = mesh.slices(0.2)
+
+    lengths = extrusion_path_lengths(slices, wall_thickness_mm=1.2, perimeters=2, infill=0.2)
+    print(f"Path lengths: {lengths}")
+    # 100 layers × 80 mm contour × 2 perimeters
+    assert abs(lengths['walls'] - 16000.0) < 1e-6
+    denser = extrusion_path_lengths(slices, wall_thickness_mm=1.2, perimeters=2, infill=0.4)
+    assert abs(denser['infill'] - 2 * lengths['infill']) < 1e-6
+
+    presets = (
+        {'id': 'slow', 'name': 'Slow', 'avgSpeed': 50.0, 'bedSize': {'x': 200.0, 'y': 200.0, 'z': 200.0}},
+        {'id': 'fast', 'name': 'Fast', 'avgSpeed': 200.0, 'bedSize': {'x': 200.0, 'y': 200.0, 'z': 200.0}},
+        {'id': 'tiny', 'name': 'Tiny', 'avgSpeed': 100.0, 'bedSize': {'x': 10.0, 'y': 300.0, 'z': 200.0}},
+    )
+    result = estimate_print_times(slices, mesh.extents, presets=presets)
+    print(result)
+    printers = {printer['id']: printer for printer in result['printers']}
+    assert [printer['id'] for printer in result['printers']] == ['fast', 'tiny', 'slow']
+    assert printers['fast']['hours'] < printers['slow']['hours']
+    assert printers['fast']['fits'] and not printers['tiny']['fits']
+    assert result['layers'] == 100
+
+def test_time_pricing():
+    """/calculate adds machine time when asked for time-based pricing"""
+    print("=== Time-based pricing ===")
+    import app as app_module
+
+    original_catalog, original_db = app_module.materials_catalog, app_module.db
+    app_module.db = FakeDB(FakeCollection(MATERIALS))
+    app_module.materials_catalog = MaterialsCatalog(app_module.db)
+    try:
+        client = app_module.app.test_client()
+        by_weight = client.post('/calculate', json={'material': 'PLA', 'weight': 100}).get_json()
+        by_time = client.post('/calculate', json={'material': 'PLA', 'weight': 100,
+                                                  'pricing': 'time', 'printHours': 2.5}).get_json()
+        missing = client.post('/calculate', json={'material': 'PLA', 'weight': 100, 'pricing': 'time'})
+    finally:
+        app_module.materials_catalog, app_module.db = original_catalog, original_db
+
+    print(by_time)
+    expected = (100 * 0.03 + 2.5 * app_module.PRINT_HOURLY_RATE) * app_module.PRICE_MULTIPLIER
+    assert abs(by_time['cost'] - round(expected, 2)) < 1e-9
+    assert by_time['breakdown']['printHours'] == 2.5
+    assert by_weight['breakdown']['calculationMethod'] == 'Weight × Price per gram'
+    assert missing.status_code == 400
+
+if __name__ == "__main__":
+    test_presets_parse()
+    test_estimates()
+    test_time_pricing()
+    print("Test completed.")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the accepted-printer matching index
+"""
+
+import time
+
+from printer_index import PrinterIndex, parse_bed_size
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeApplications:
+    """Stands in for the printer-applications collection; counts full reads"""
+    def __init__(self, applications):
+        self.applications = applications
+        self.reads = 0
+        self._status = None
+
+    def where(self, field, op, value):
+        self._status = value
+        return self
+
+    def stream(self):
+        self.reads += 1
+        return [FakeDoc(doc_id, data) for doc_id, data in self.applications.items()
+                if data.get('status') == self._status]
+
+class FakeDB:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def collection(self, name):
+        return self._collection
+
+APPLICATIONS = {
+    'mini': {
+        'name': 'Ada', 'email': 'ada@example.com', 'status': 'accepted', 'materials': 'PLA, PETG',
+        'printers': [{'model': 'bambu-a1-mini', 'modelName': 'Bambu Labs A1 Mini', 'quantity': 2,
+                      'bedSize': '180 x 180 x 180', 'materials': 'PLA, PETG, TPU, ABS'}],
+    },
+    'tall': {
+        'name': 'Grace', 'email': 'grace@example.com', 'status': 'accepted', 'materials': 'pla',
+        'printers': [{'model': 'custom', 'modelName': 'Custom', 'quantity': 1,
+                      'bedSize': '100 x 120 x 400', 'materials': ''}],
+    },
+    'pending': {
+        'name': 'Linus', 'email': 'linus@example.com', 'status': 'pending', 'materials': 'PLA',
+        'printers': [{'model': 'custom', 'bedSize': '500 x 500 x 500', 'materials': 'PLA'}],
+    },
+}
+
+def test_parse_bed_size():
+    print("=== Bed sizes ===")
+    assert parse_bed_size('256 x 256 x 256') == (256.0, 256.0, 256.0)
+    assert parse_bed_size({'x': 180, 'y': 180, 'z': 180}) == (180.0, 180.0, 180.0)
+    assert parse_bed_size('') is None and parse_bed_size('200 x 200') is None
+
+def test_match_any_orientation():
+    """Parts match in whichever axis-aligned orientation fits; materials ignore case"""
+    print("=== Matching ===")
+    collection = FakeApplications({k: dict(v) for k, v in APPLICATIONS.items()})
+    index = PrinterIndex(FakeDB(collection))
+
+    ids = lambda makers: [maker['applicationId'] for maker in makers]
+    assert ids(index.match([50, 50, 50], 'pla')) == ['mini', 'tall']
+    # 350 mm long only fits standing up on the tall custom printer
+    assert ids(index.match([350, 90, 110], 'PLA')) == ['tall']
+    assert ids(index.match([170, 20, 20], 'TPU')) == ['mini']
+    # Matches are public: no maker names or contact details
+    assert all(set(maker) == {'applicationId', 'printers'} for maker in index.match([50, 50, 50], 'PLA'))
+    assert index.match([600, 10, 10], 'PLA') == []
+    assert index.match([10, 10, 10], 'Nylon') == []
+    assert index.match([10, 10, 10], 'PLA')[0]['printers'][0]['quantity'] == 2
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.match([100, 80, 60], 'PLA')
+    per_match = (time.perf_counter() - started) / 1000
+    print(f"{per_match * 1e6:.0f} µs per match")
+    assert collection.reads == 1
+
+def test_incremental_updates():
+    """Status changes add or remove one application without re-reading the collection"""
+    print("=== Incremental updates ===")
+    collection = FakeApplications({k: dict(v) for k, v in APPLICATIONS.items()})
+    index = PrinterIndex(FakeDB(collection))
+    index.ensure_loaded()
+    version = index.version
+
+    index.add_application('pending', dict(APPLICATIONS['pending'], status='accepted'))
+    assert [maker['applicationId'] for maker in index.match([450, 450, 450], 'PLA')] == ['pending']
+    index.remove_application('tall')
+    assert [maker['applicationId'] for maker in index.match([50, 50, 50], 'PLA')] == ['mini', 'pending']
+    index.remove_application('missing')
+    assert index.version == version + 2
+    assert collection.reads == 1
+
+if __name__ == "__main__":
+    test_parse_bed_size()
+    test_match_any_orientation()
+    test_incremental_updates()
+    print("\n✅ All printer index tests passed")
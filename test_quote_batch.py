@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the /api/quote/batch endpoint
+"""
+
+import io
+import json
+import os
+import tempfile
+import trimesh
+
+from materials_catalog import MaterialsCatalog
+from test_materials_catalog import FakeCollection, FakeDB, MATERIALS
+
+def test_batch_matrix():
+    """Two files × three combinations, checked against the single-file slicer path"""
+    print("=== Batch quote matrix ===")
+    import app as app_module
+
+    original_catalog, original_db = app_module.materials_catalog, app_module.db
+    app_module.db = FakeDB(FakeCollection(MATERIALS))
+    app_module.materials_catalog = MaterialsCatalog(app_module.db)
+
+    meshes = {
+        'cube.stl': trimesh.creation.box(extents=(40, 40, 40)),
+        'ball.stl': trimesh.creation.icosphere(subdivisions=3, radius=20),
+    }
+    combinations = [
+        {'material': 'PLA', 'color': '#FF0000', 'infill': 20},
+        {'material': 'PLA', 'infill': 50, 'layerHeight': 0.1},
+        {'material': 'ABS', 'infill': 20},
+    ]
+    try:
+        client = app_module.app.test_client()
+        response = client.post('/api/quote/batch', data={
+            'files': [(io.BytesIO(trimesh.exchange.stl.export_stl(mesh)), name) for name, mesh in meshes.items()],
+            'combinations': json.dumps(combinations)
+        }, content_type='multipart/form-data')
+        body = response.get_json()
+    finally:
+        app_module.materials_catalog, app_module.db = original_catalog, original_db
+
+    print(json.dumps(body, indent=2))
+    assert response.status_code == 200
+    assert [f['filename'] for f in body['files']] == list(meshes)
+
+    for file_result, mesh in zip(body['files'], meshes.values()):
+        with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+            f.write(trimesh.exchange.stl.export_stl(mesh))
+        try:
+            expected = [
+                app_module.calculate_wall_and_infill_volume(f.name, infill=0.2, density=1.24),
+                app_module.calculate_wall_and_infill_volume(f.name, infill=0.5, layer_height_mm=0.1, density=1.24),
+                app_module.calculate_wall_and_infill_volume(f.name, infill=0.2, density=1.04),
+            ]
+        finally:
+            os.unlink(f.name)
+
+        quotes = file_result['quotes']
+        for quote, result in zip(quotes, expected):
+            assert abs(quote['weight'] - result['total_weight']) < 1e-9
+        # Color override, base price, and the /calculate response shape
+        assert quotes[0]['breakdown']['pricePerGram'] == 0.05
+        assert quotes[1]['breakdown']['pricePerGram'] == 0.03
+        assert quotes[2]['cost'] == round(quotes[2]['weight'] * 0.04 * app_module.PRICE_MULTIPLIER, 2)
+
+def test_batch_validation():
+    """Missing files and malformed combinations are rejected"""
+    import app as app_module
+    client = app_module.app.test_client()
+    assert client.post('/api/quote/batch', data={}).status_code == 400
+    response = client.post('/api/quote/batch', data={
+        'files': [(io.BytesIO(b'solid x'), 'x.stl')],
+        'combinations': 'not json'
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+
+    # Print parameters out of range are rejected before anything is sliced
+    stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+    for bad in ({'layerHeight': 0}, {'layerHeight': -0.2}, {'layerHeight': 0.001}, {'wallThickness': 0},
+                {'density': -1}, {'perimeters': 0}, {'topBottomLayers': -1}, {'layerHeight': 'nan'}):
+        response = client.post('/api/quote/batch', data={
+            'files': [(io.BytesIO(stl_bytes), 'cube.stl')],
+            'combinations': json.dumps([bad])
+        }, content_type='multipart/form-data')
+        assert response.status_code == 400, bad
+        single = client.post('/upload-stl', data=dict(bad, file=(io.BytesIO(stl_bytes), 'cube.stl')),
+                             content_type='multipart/form-data')
+        assert single.status_code == 400, bad
+    print(f"Rejected: {response.get_json()['error']}")
+
+def test_batch_limits():
+    """Oversized batches are rejected and a full job queue answers 503"""
+    import app as app_module
+    from jobs import JobQueue
+
+    client = app_module.app.test_client()
+    stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+
+    def post(count):
+        return client.post('/api/quote/batch', data={
+            'files': [(io.BytesIO(stl_bytes), f'part{i}.stl') for i in range(count)],
+            'combinations': json.dumps([{'infill': 20}])
+        }, content_type='multipart/form-data')
+
+    response = post(app_module.BATCH_MAX_FILES + 1)
+    assert response.status_code == 400
+    print(f"Rejected: {response.get_json()['error']}")
+
+    # The files need more slots than the queue has left, so nothing is queued
+    original_jobs = app_module.quote_jobs
+    app_module.quote_jobs = JobQueue(max_workers=1, max_pending=1)
+    try:
+        response = post(2)
+        assert response.status_code == 503
+        assert app_module.quote_jobs.pending_count() == 0
+    finally:
+        app_module.quote_jobs = original_jobs
+    print(f"Queue full: {response.get_json()['error']}")
+
+if __name__ == "__main__":
+    test_batch_matrix()
+    test_batch_validation()
+    test_batch_limits()
+    print("Test completed.")
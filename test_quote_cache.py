@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the STL quote cache
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import trimesh
+
+from quote_cache import QuoteCache, hash_stl_bytes, make_quote_key
+
+def test_lru_eviction():
+    """Entries are evicted oldest-first once the byte budget is exceeded"""
+    print("=== LRU eviction ===")
+    cache = QuoteCache(max_bytes=200)
+    for i in range(10):
+        cache.put(f"key{i}", {'weight': i, 'calculationMethod': 'test'})
+        cache.get("key0")  # Keep key0 hot
+
+    stats = cache.stats()
+    print(f"Cache stats: {stats}")
+    assert stats['bytes'] <= 200
+    assert cache.get("key0") == {'weight': 0, 'calculationMethod': 'test'}
+    assert cache.get("key1") is None
+    assert cache.get("key9") is not None
+
+def test_key_normalization():
+    """Equivalent parameters share a key, different ones do not"""
+    print("=== Key normalization ===")
+    stl_hash = hash_stl_bytes(b"solid test")
+    a = make_quote_key(stl_hash, {'infill': 0.2, 'units': 'mm', 'perimeters': 2})
+    b = make_quote_key(stl_hash, {'perimeters': 2, 'units': 'MM ', 'infill': 0.20000001})
+    c = make_quote_key(stl_hash, {'infill': 0.3, 'units': 'mm', 'perimeters': 2})
+    assert a == b
+    assert a != c
+
+def test_disk_tier():
+    """Quotes written to disk survive a new cache instance"""
+    print("=== Disk tier ===")
+    cache_dir = tempfile.mkdtemp()
+    try:
+        QuoteCache(cache_dir=cache_dir).put("abc", {'weight': 12.5})
+        restarted = QuoteCache(cache_dir=cache_dir)
+        assert restarted.get("abc") == {'weight': 12.5}
+        assert restarted.stats()['entries'] == 1
+
+        # The directory is bounded too, dropping the least recently used files
+        bounded = QuoteCache(max_bytes=200, cache_dir=cache_dir)
+        for i in range(10):
+            bounded.put(f"key{i}", {'weight': i, 'calculationMethod': 'test'})
+        files = os.listdir(cache_dir)
+        print(f"Files on disk: {sorted(files)}")
+        assert sum(os.path.getsize(os.path.join(cache_dir, name)) for name in files) <= 200
+        assert "key9.json" in files and "abc.json" not in files
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_upload_uses_cache():
+    """Second identical upload is served from the cache without calling the API"""
+    print("=== /upload-stl cache hit ===")
+    import app as app_module
+    import quoting
+
+    calls = []
+    def fake_api(stl_file_path, infill_percentage, material_density):
+        calls.append(stl_file_path)
+        return 42.0
+
+    original_api = quoting.call_stl_weight_api
+    original_estimator = quoting.WEIGHT_ESTIMATOR
+    quoting.call_stl_weight_api = fake_api
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    app_module.quote_cache = QuoteCache()
+    try:
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+        client = app_module.app.test_client()
+        responses = []
+        for _ in range(2):
+            response = client.post('/upload-stl', data={
+                'file': (io.BytesIO(stl_bytes), 'cube.stl'),
+                'infill': '20'
+            }, content_type='multipart/form-data')
+            responses.append(response.get_json())
+    finally:
+        quoting.call_stl_weight_api = original_api
+        quoting.WEIGHT_ESTIMATOR = original_estimator
+
+    print(f"Responses: {responses}")
+    assert len(calls) == 1
+    assert responses[0]['cached'] is False
+    assert responses[1]['cached'] is True
+    assert responses[1]['weight'] == 42.0
+    assert responses[1]['filename'] == 'cube.stl'
+
+def test_fallback_quotes_not_cached():
+    """Quotes made while the API is failing fall back to the slicer and are not cached"""
+    print("=== Fallback quotes bypass the cache ===")
+    import app as app_module
+    import quoting
+
+    original_api = quoting.call_stl_weight_api
+    original_estimator = quoting.WEIGHT_ESTIMATOR
+    quoting.call_stl_weight_api = lambda **kwargs: None
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    app_module.quote_cache = QuoteCache()
+    try:
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+        client = app_module.app.test_client()
+        responses = [client.post('/upload-stl', data={'file': (io.BytesIO(stl_bytes), 'cube.stl')},
+                                 content_type='multipart/form-data').get_json()
+                     for _ in range(2)]
+    finally:
+        quoting.call_stl_weight_api = original_api
+        quoting.WEIGHT_ESTIMATOR = original_estimator
+
+    print(f"Methods: {[r['calculationMethod'] for r in responses]}")
+    assert responses[0]['calculationMethod'].startswith('Slicer fallback')
+    assert responses[1]['cached'] is False
+    assert app_module.quote_cache.stats()['entries'] == 0
+
+def test_breaker_quotes_not_cached():
+    """Local engine quotes made because the API's breaker is open are not cached"""
+    print("=== Breaker-forced local quotes bypass the cache ===")
+    import app as app_module
+    import quoting
+    from http_client import http_client
+
+    calls = []
+    original_api = quoting.call_stl_weight_api
+    original_estimators = (quoting.WEIGHT_ESTIMATOR, app_module.WEIGHT_ESTIMATOR)
+    quoting.call_stl_weight_api = lambda **kwargs: calls.append(kwargs) or 42.0
+    quoting.WEIGHT_ESTIMATOR = app_module.WEIGHT_ESTIMATOR = 'api'
+    app_module.quote_cache = QuoteCache()
+    breaker = http_client._endpoints['stl_api']['breaker']
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(10, 10, 10)))
+        client = app_module.app.test_client()
+        response = client.post('/upload-stl', data={'file': (io.BytesIO(stl_bytes), 'cube.stl')},
+                               content_type='multipart/form-data').get_json()
+    finally:
+        breaker.record_success()
+        quoting.call_stl_weight_api = original_api
+        quoting.WEIGHT_ESTIMATOR, app_module.WEIGHT_ESTIMATOR = original_estimators
+
+    print(f"Method: {response['calculationMethod']}")
+    assert calls == []
+    assert response['calculationMethod'].startswith('Local engine')
+    assert app_module.quote_cache.stats()['entries'] == 0
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_key_normalization()
+    test_disk_tier()
+    test_upload_uses_cache()
+    test_fallback_quotes_not_cached()
+    test_breaker_quotes_not_cached()
+    print("Test completed.")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for asynchronous quote jobs
+"""
+
+import io
+import os
+import time
+import trimesh
+
+def wait_for_job(client, job_id, timeout=60):
+    """Poll /jobs/<id> until the job finishes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/jobs/{job_id}').get_json()
+        print(f"Job {job_id[:8]}: {job['status']} ({job['stage']}, {job['progress']:.0%})")
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.2)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+def test_async_upload():
+    """/upload-stl?async=1 returns a job id and the job produces the quote"""
+    print("=== Async upload ===")
+    import app as app_module
+    from quote_cache import QuoteCache
+    from jobs import JobQueue
+
+    # Workers are separate processes, so select the in-process engine through the environment;
+    # the app checks the same setting before caching the job's quote
+    os.environ['WEIGHT_ESTIMATOR'] = 'local'
+    original_estimator = app_module.WEIGHT_ESTIMATOR
+    app_module.WEIGHT_ESTIMATOR = 'local'
+    app_module.quote_cache = QuoteCache()
+    app_module.quote_jobs = JobQueue(max_workers=1)
+    client = app_module.app.test_client()
+    stl_bytes = trimesh.exchange.stl.export_stl(trimesh.creation.box(extents=(100, 100, 100)))
+
+    response = client.post('/upload-stl?async=1', data={
+        'file': (io.BytesIO(stl_bytes), 'cube.stl'),
+        'infill': '20'
+    }, content_type='multipart/form-data')
+    body = response.get_json()
+    print(f"Submit response: {response.status_code} {body}")
+    assert response.status_code == 202
+    assert body['statusUrl'] == f"/jobs/{body['jobId']}"
+
+    try:
+        job = wait_for_job(client, body['jobId'])
+    finally:
+        del os.environ['WEIGHT_ESTIMATOR']
+    assert job['status'] == 'done'
+    assert job['result']['calculationMethod'].startswith('Local engine')
+    assert abs(job['result']['weight'] - 271.808) < 1e-6
+
+    # The finished job populated the quote cache
+    try:
+        response = client.post('/upload-stl', data={
+            'file': (io.BytesIO(stl_bytes), 'cube.stl'),
+            'infill': '20'
+        }, content_type='multipart/form-data')
+    finally:
+        app_module.WEIGHT_ESTIMATOR = original_estimator
+    assert response.get_json()['cached'] is True
+
+    events = client.get(f"/jobs/{body['jobId']}/events").get_data(as_text=True)
+    assert events.startswith('data: ') and '"status": "done"' in events
+
+def test_unknown_job():
+    """Unknown job ids are a 404"""
+    import app as app_module
+    client = app_module.app.test_client()
+    assert client.get('/jobs/does-not-exist').status_code == 404
+
+if __name__ == "__main__":
+    test_async_upload()
+    test_unknown_job()
+    print("Test completed.")
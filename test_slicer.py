@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized layer slicer
+"""
+
+import math
+import os
+import tempfile
+import time
+import numpy as np
+import trimesh
+
+from slicer import slice_layers, shell_and_infill_volumes
+
+def test_cube_layers():
+    """100mm cube: every layer is a 100×100 square"""
+    print("=== 100mm cube at 0.2mm ===")
+    mesh = trimesh.creation.box(extents=(100, 100, 100))
+    slices = slice_layers(mesh.triangles, 0.2)
+    print(f"Layers: {len(slices['z'])}")
+    print(f"Perimeter: {slices['perimeter_mm'][0]}mm, area: {slices['area_mm2'][0]}mm²")
+    assert len(slices['z']) == 500
+    assert np.allclose(slices['perimeter_mm'], 400.0)
+    assert np.allclose(slices['area_mm2'], 10000.0)
+
+    volumes = shell_and_infill_volumes(slices, wall_thickness_mm=1.2, top_bottom_layers=3)
+    print(f"Volumes (mm³): {volumes}")
+    assert abs(volumes['total_mm3'] - 1e6) < 1e-6
+    assert abs(volumes['wall_mm3'] - 400 * 1.2 * 100) < 1e-6
+    assert abs(volumes['top_bottom_mm3'] - 6 * (10000 - 480) * 0.2) < 1e-6
+
+def test_hollow_and_offset_parts():
+    """Holes subtract area and coordinates far from the origin stay accurate"""
+    print("=== Tube and offset cube ===")
+    tube = trimesh.creation.annulus(r_min=10, r_max=20, height=30, sections=256)
+    slices = slice_layers(tube.triangles, 0.2)
+    middle = len(slices['z']) // 2
+    print(f"Tube area: {slices['area_mm2'][middle]:.1f}mm² (expected ~{math.pi * 300:.1f})")
+    assert abs(slices['area_mm2'][middle] - math.pi * 300) / (math.pi * 300) < 1e-3
+    assert abs(slices['perimeter_mm'][middle] - 2 * math.pi * 30) / (2 * math.pi * 30) < 1e-3
+
+    cube = trimesh.creation.box(extents=(10, 10, 10))
+    cube.apply_translation([1e4, -1e4, 500])
+    slices = slice_layers(cube.triangles, 0.2)
+    assert np.allclose(slices['area_mm2'], 100.0)
+
+def test_not_a_cube():
+    """An L-shaped part is priced from its real cross-section, not its bounding cube"""
+    print("=== L-shaped part ===")
+    import app as app_module
+
+    mesh = trimesh.util.concatenate([
+        trimesh.creation.box(extents=(100, 10, 10), transform=trimesh.transformations.translation_matrix([50, 5, 5])),
+        trimesh.creation.box(extents=(10, 90, 10), transform=trimesh.transformations.translation_matrix([5, 55, 5])),
+    ])
+    with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+        f.write(trimesh.exchange.stl.export_stl(mesh))
+    try:
+        result = app_module.calculate_wall_and_infill_volume(f.name, infill=0.2)
+    finally:
+        os.unlink(f.name)
+
+    print(f"Result: {result}")
+    assert abs(result['total_volume_cm3'] - 19.0) < 1e-6
+    assert result['shell_volume_cm3'] < result['total_volume_cm3']
+
+def test_speed():
+    """2,500 planes on a large mesh in one batched pass"""
+    print("=== Speed: 250mm tall part at 0.1mm ===")
+    mesh = trimesh.creation.icosphere(subdivisions=7, radius=125)
+    start = time.perf_counter()
+    slices = slice_layers(mesh.triangles, 0.1)
+    elapsed = time.perf_counter() - start
+    sliced_volume = slices['area_mm2'].sum() * 0.1
+    print(f"{len(mesh.faces)} triangles, {len(slices['z'])} layers in {elapsed * 1000:.0f}ms")
+    assert len(slices['z']) == 2500
+    assert abs(sliced_volume - mesh.volume) / mesh.volume < 1e-4
+
+if __name__ == "__main__":
+    test_cube_layers()
+    test_hollow_and_offset_parts()
+    test_not_a_cube()
+    test_speed()
+    print("Test completed.")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory static asset manifest
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+
+from flask import Flask
+
+from static_assets import StaticAssets
+
+def make_site():
+    root = tempfile.mkdtemp()
+    with open(os.path.join(root, 'index.html'), 'w') as f:
+        f.write('<link href="styles.css" rel="stylesheet"><script src="/orders.js"></script>'
+                '<script src="https://cdn.example.com/three.min.js"></script>' + ' ' * 2000)
+    with open(os.path.join(root, 'styles.css'), 'w') as f:
+        f.write('body { margin: 0; }\n' * 200)
+    with open(os.path.join(root, 'orders.js'), 'w') as f:
+        f.write('console.log("orders");\n' * 200)
+    with open(os.path.join(root, 'app.py'), 'w') as f:
+        f.write('secret = 1\n')
+    return root
+
+def make_app(assets):
+    app = Flask(__name__)
+
+    @app.route('/<path:filename>')
+    def serve(filename):
+        return assets.response(filename, __import__('flask').request) or ('missing', 404)
+
+    return app.test_client()
+
+def test_manifest_and_fingerprints():
+    """Pages point at fingerprinted assets, which are served as immutable"""
+    print("=== Manifest ===")
+    root = make_site()
+    try:
+        assets = StaticAssets(root).build()
+        client = make_app(assets)
+        stats = assets.stats()
+        print(f"Stats: {stats}")
+        assert stats['assets'] == 3
+
+        page = client.get('/index.html')
+        html = page.get_data(as_text=True)
+        css_url = assets.url_for('styles.css')
+        assert css_url != '/styles.css' and css_url[1:] in html
+        assert assets.url_for('orders.js')[1:] in html
+        assert 'https://cdn.example.com/three.min.js' in html
+        assert page.headers['Cache-Control'] == 'no-cache'
+
+        css = client.get(css_url)
+        assert css.status_code == 200
+        assert 'immutable' in css.headers['Cache-Control']
+        assert css.headers['Content-Type'].startswith('text/css')
+        assert client.get('/app.py').status_code == 404
+    finally:
+        shutil.rmtree(root)
+
+def test_etag_and_compression():
+    """Clients get gzip when they accept it and 304 when their ETag matches"""
+    print("=== ETags and compression ===")
+    root = make_site()
+    try:
+        assets = StaticAssets(root).build()
+        client = make_app(assets)
+
+        plain = client.get('/orders.js')
+        zipped = client.get('/orders.js', headers={'Accept-Encoding': 'gzip, deflate'})
+        print(f"orders.js: {len(plain.data)} bytes plain, {len(zipped.data)} gzipped")
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(zipped.data) == plain.data
+        assert zipped.headers['ETag'] != plain.headers['ETag']
+        assert zipped.headers['Vary'] == 'Accept-Encoding'
+
+        revalidated = client.get('/orders.js', headers={'Accept-Encoding': 'gzip',
+                                                        'If-None-Match': zipped.headers['ETag']})
+        assert revalidated.status_code == 304 and revalidated.data == b''
+        stale = client.get('/orders.js', headers={'If-None-Match': '"something-else"'})
+        assert stale.status_code == 200
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    test_manifest_and_fingerprints()
+    test_etag_and_compression()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the native STL reader in stl_analysis.py
+"""
+
+import os
+import tempfile
+import numpy as np
+import trimesh
+
+import quoting
+from stl_analysis import analyze_stl, load_triangles
+
+def write_test_stl(mesh, ascii=False):
+    """Export a trimesh object to a temporary STL file"""
+    with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+        f.write(trimesh.exchange.stl.export_stl_ascii(mesh).encode() if ascii
+                else trimesh.exchange.stl.export_stl(mesh))
+        return f.name
+
+def test_binary_cube():
+    """100mm cube read from a binary STL"""
+    print("=== Binary 100mm cube ===")
+    path = write_test_stl(trimesh.creation.box(extents=(100, 100, 100)))
+    try:
+        result = analyze_stl(path)
+    finally:
+        os.unlink(path)
+
+    print(f"Triangles: {result['triangle_count']}")
+    print(f"Volume: {result['volume_mm3']:.1f} mm³ (expected 1,000,000)")
+    print(f"Surface area: {result['surface_area_mm2']:.1f} mm² (expected 60,000)")
+    print(f"Extents: {result['extents']}")
+
+    assert result['format'] == 'binary'
+    assert result['triangle_count'] == 12
+    assert abs(result['volume_mm3'] - 1e6) < 1e-3
+    assert abs(result['surface_area_mm2'] - 6e4) < 1e-3
+    assert np.allclose(result['extents'], [100, 100, 100])
+
+def test_matches_trimesh():
+    """Sphere and ASCII output should agree with trimesh"""
+    print("=== Sphere vs trimesh ===")
+    mesh = trimesh.creation.icosphere(subdivisions=4, radius=25)
+    for ascii in (False, True):
+        path = write_test_stl(mesh, ascii=ascii)
+        try:
+            result = analyze_stl(path)
+            triangles, stl_format = load_triangles(path)
+        finally:
+            os.unlink(path)
+
+        print(f"{stl_format}: {result['volume_mm3']:.2f} mm³ vs trimesh {mesh.volume:.2f} mm³")
+        assert stl_format == ('ascii' if ascii else 'binary')
+        assert triangles.shape == (len(mesh.faces), 3, 3)
+        assert abs(result['volume_mm3'] - mesh.volume) / mesh.volume < 1e-4
+        assert abs(result['surface_area_mm2'] - mesh.area) / mesh.area < 1e-4
+        assert np.allclose(result['bounds'], mesh.bounds, atol=1e-4)
+
+def test_units():
+    """Units scale lengths into millimetres"""
+    print("=== Units ===")
+    path = write_test_stl(trimesh.creation.box(extents=(1, 1, 1)))
+    try:
+        inches = analyze_stl(path, units='in')
+        centimetres = analyze_stl(path, units='cm')
+    finally:
+        os.unlink(path)
+
+    print(f"1in cube: {inches['volume_mm3'] / 1000.0:.3f} cm³ (expected 16.387)")
+    assert abs(inches['volume_mm3'] / 1000.0 - 16.387) < 1e-3
+    assert abs(centimetres['volume_mm3'] - 1000.0) < 1e-6
+
+def test_unreadable_files():
+    """Empty, garbage and facet-less files are errors, and quotes for them take the emergency path"""
+    print("=== Unreadable files ===")
+    params = {'units': 'mm', 'infill': 0.2, 'wallThickness': 1.2, 'layerHeight': 0.2,
+              'topBottomLayers': 3, 'perimeters': 2, 'density': 1.24}
+    for data in (b'', b'not an stl at all', b'solid x\nendsolid x\n', bytes(84)):
+        with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+            f.write(data)
+        try:
+            try:
+                load_triangles(f.name)
+                assert False, f'{data[:20]!r} should not load'
+            except ValueError as e:
+                print(f"{data[:20]!r}: {e}")
+            quote = quoting.run_quote(f.name, params, weight_estimator='local')
+        finally:
+            os.unlink(f.name)
+        assert quote['calculationMethod'] == 'Emergency estimation'
+        assert quote['warning'] and quote['weight'] > 0
+
+if __name__ == "__main__":
+    test_binary_cube()
+    test_matches_trimesh()
+    test_units()
+    test_unreadable_files()
+    print("Test completed.")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming STL upload ingestion
+"""
+
+import io
+import os
+import trimesh
+
+from stl_analysis import analyze_triangles
+from stl_upload import STLUploadStream, UploadRejected
+from quote_cache import hash_stl_bytes
+
+def feed(stream, data, chunk_size):
+    """Write data the way werkzeug does, in fixed-size chunks"""
+    for start in range(0, len(data), chunk_size):
+        stream.write(data[start:start + chunk_size])
+    stream.seek(0)
+
+def test_binary_stream_matches_full_analysis():
+    """Chunk boundaries that split records don't change the results"""
+    print("=== Binary stream ===")
+    mesh = trimesh.creation.icosphere(subdivisions=3, radius=10.0)
+    data = mesh.export(file_type='stl')
+    expected = analyze_triangles(mesh.triangles)
+
+    stream = STLUploadStream(spool_bytes=1024)
+    feed(stream, data, 997)
+    analysis = stream.analysis()
+    print(f"Streamed: {analysis['triangle_count']} triangles, {analysis['volume_mm3']:.2f} mm³")
+
+    assert analysis['format'] == 'binary'
+    assert analysis['triangle_count'] == expected['triangle_count']
+    assert abs(analysis['volume_mm3'] - expected['volume_mm3']) < 1e-3
+    assert analysis['sha256'] == hash_stl_bytes(data)
+
+    # Larger than the spool threshold, so it was written to disk exactly once
+    path = stream.path()
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert stream.read() == data
+    stream.close()
+    assert not os.path.exists(path)
+
+def test_ascii_stream():
+    """ASCII uploads are parsed line by line across chunks"""
+    print("=== ASCII stream ===")
+    mesh = trimesh.creation.box(extents=(10, 20, 30))
+    data = trimesh.exchange.stl.export_stl_ascii(mesh).encode()
+
+    stream = STLUploadStream()
+    feed(stream, data, 64)
+    analysis = stream.analysis(units='cm')
+    print(f"Streamed: {analysis}")
+
+    assert analysis['format'] == 'ascii'
+    assert analysis['triangle_count'] == 12
+    assert abs(analysis['volume_mm3'] - 6000.0 * 1000) < 1e-3
+    # Small uploads stay in memory until a path is asked for
+    assert stream._path is None
+    path = stream.detach()
+    stream.close()
+    assert os.path.exists(path)
+    os.unlink(path)
+
+    # Headers without facets are not a readable STL
+    for data in (bytes(84), b'solid x\nendsolid x\n'):
+        stream = STLUploadStream()
+        feed(stream, data, 64)
+        assert stream.analysis() is None
+        stream.close()
+
+def test_limits_reject_early():
+    """Size and declared triangle count are enforced before the body is read"""
+    print("=== Limits ===")
+    data = trimesh.creation.icosphere(subdivisions=2).export(file_type='stl')
+
+    stream = STLUploadStream(max_triangles=100)
+    try:
+        stream.write(data[:100])
+        raise AssertionError('expected rejection')
+    except UploadRejected as e:
+        print(f"Rejected: {e}")
+    assert stream.closed
+
+    stream = STLUploadStream(max_bytes=1000)
+    try:
+        feed(stream, data, 512)
+        raise AssertionError('expected rejection')
+    except UploadRejected as e:
+        print(f"Rejected: {e}")
+
+def test_upload_route_limits():
+    """/upload-stl returns 413 for meshes over the triangle limit"""
+    print("=== /upload-stl limit ===")
+    import app as app_module
+
+    data = trimesh.creation.icosphere(subdivisions=2).export(file_type='stl')
+    app_module.app.config['STL_MAX_TRIANGLES'] = 100
+    try:
+        client = app_module.app.test_client()
+        response = client.post('/upload-stl', data={'file': (io.BytesIO(data), 'ball.stl')},
+                               content_type='multipart/form-data')
+    finally:
+        app_module.app.config['STL_MAX_TRIANGLES'] = 5000000
+    print(f"Response: {response.status_code} {response.get_json()}")
+    assert response.status_code == 413
+
+if __name__ == "__main__":
+    test_binary_stream_matches_full_analysis()
+    test_ascii_stream()
+    test_limits_reject_early()
+    test_upload_route_limits()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the height-map support estimate
+"""
+
+import io
+import math
+
+import numpy as np
+import trimesh
+
+import quoting
+from materials_catalog import MaterialsCatalog
+from support import estimate_support, rasterize, support_weight
+from test_materials_catalog import FakeCollection, FakeDB, MATERIALS
+from test_orientation import make_tee
+
+def test_rasterize_counts_shared_edges_once():
+    """With cell centres on every edge and vertex, each column crosses the box exactly twice"""
+    print("=== Rasterization ===")
+    box = trimesh.creation.box(extents=(8, 8, 4)).subdivide().subdivide()
+    triangles = box.triangles - box.bounds[0]
+    cells, z, faces = rasterize(triangles, np.array([-0.5, -0.5]), 1.0, (10, 10))
+    counts = np.bincount(cells, minlength=100).reshape(10, 10)
+    print(f"{len(cells)} samples")
+    assert set(np.unique(counts)) == {0, 2}
+    assert (counts == 2).sum() == 64
+
+def test_support_volumes():
+    """Only air under overhangs is supported, down to the plate or the part below"""
+    print("=== Support volumes ===")
+    # The cap's underside overhangs 20 mm, except where the stem holds it up
+    tee = make_tee()
+    assert estimate_support(tee.triangles)['volumeMm3'] == 800.0 * 20
+    assert estimate_support(tee.triangles, rotation=np.diag([1.0, -1.0, -1.0]))['volumeMm3'] == 0.0
+
+    # A slab bridging two pillars needs support only in the 20 mm gap
+    left = trimesh.creation.box((10, 10, 20), transform=trimesh.transformations.translation_matrix([-15, 0, 10]))
+    right = trimesh.creation.box((10, 10, 20), transform=trimesh.transformations.translation_matrix([15, 0, 10]))
+    slab = trimesh.creation.box((40, 10, 5), transform=trimesh.transformations.translation_matrix([0, 0, 22.5]))
+    bridge = estimate_support(trimesh.util.concatenate([left, right, slab]).triangles)
+    assert bridge['volumeMm3'] == 20 * 10 * 20 and bridge['areaMm2'] == 200.0
+
+    # Under a sphere, the cap within 45° of straight down: πR·ρ² - 2π/3·(R³ - (R² - ρ²)^1.5), ρ² = R²/2
+    R = 10.0
+    expected = math.pi * R * R * R / 2 - 2 * math.pi / 3 * (R ** 3 - (R * R / 2) ** 1.5)
+    sphere = estimate_support(trimesh.creation.icosphere(subdivisions=4, radius=R).triangles, resolution_mm=0.25)
+    print(f"Sphere: {sphere['volumeMm3']} mm³, expected {expected:.1f}")
+    assert abs(sphere['volumeMm3'] - expected) / expected < 0.05
+
+    # A cm file is scaled to mm before anything is measured
+    scaled = estimate_support(tee.triangles / 10.0, scale=10.0)
+    assert scaled['volumeMm3'] == 16000.0
+    assert abs(support_weight(scaled, 1.24, infill=0.15) - 16.0 * 0.15 * 1.24) < 1e-9
+
+def test_calculate_support_line():
+    """/calculate prices support material as its own breakdown line"""
+    print("=== /calculate support line ===")
+    import app as app_module
+
+    original_catalog, original_db = app_module.materials_catalog, app_module.db
+    app_module.db = FakeDB(FakeCollection(MATERIALS))
+    app_module.materials_catalog = MaterialsCatalog(app_module.db)
+    try:
+        client = app_module.app.test_client()
+        plain = client.post('/calculate', json={'material': 'PLA', 'weight': 100}).get_json()
+        supported = client.post('/calculate', json={'material': 'PLA', 'weight': 100, 'supportWeight': 12.5}).get_json()
+        invalid = client.post('/calculate', json={'material': 'PLA', 'weight': 100, 'supportWeight': -1})
+    finally:
+        app_module.materials_catalog, app_module.db = original_catalog, original_db
+
+    print(supported)
+    assert plain['breakdown']['supportWeight'] == 0
+    assert supported['breakdown']['supportWeight'] == 12.5
+    assert abs(supported['cost'] - round(112.5 * 0.03 * app_module.PRICE_MULTIPLIER, 2)) < 1e-9
+    assert invalid.status_code == 400
+
+def test_quotes_estimate_support_on_request():
+    """Quotes only estimate support when asked, in the searched orientation if there is one"""
+    print("=== Opt-in support ===")
+    import app as app_module
+
+    original_api, original_estimator = quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR
+    quoting.call_stl_weight_api = lambda **kwargs: 42.0
+    quoting.WEIGHT_ESTIMATOR = 'api'
+    try:
+        client = app_module.app.test_client()
+        triangles = make_tee().triangles
+        tee = trimesh.Trimesh(triangles.reshape(-1, 3), np.arange(triangles.size // 3).reshape(-1, 3), process=False)
+        stl_bytes = trimesh.exchange.stl.export_stl(tee)
+        upload = lambda **form: client.post('/upload-stl', data=dict(form, file=(io.BytesIO(stl_bytes), 'tee.stl')),
+                                            content_type='multipart/form-data').get_json()
+        plain = upload()
+        as_uploaded = upload(support='1')
+        oriented = upload(support='1', orient='1')
+    finally:
+        quoting.call_stl_weight_api, quoting.WEIGHT_ESTIMATOR = original_api, original_estimator
+
+    print(as_uploaded['support'], oriented['support'])
+    assert plain['support'] is None
+    assert as_uploaded['support']['volumeMm3'] == 16000.0 and as_uploaded['support']['orientation'] == 'as uploaded'
+    assert oriented['support']['orientation'] == 'optimized'
+    assert oriented['support']['volumeMm3'] < as_uploaded['support']['volumeMm3']
+
+if __name__ == "__main__":
+    test_rasterize_counts_shared_edges_once()
+    test_support_volumes()
+    test_calculate_support_line()
+    test_quotes_estimate_support_on_request()
+    print("\n✅ All support tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the stale-while-revalidate cache
+"""
+
+import time
+
+from swr_cache import StaleWhileRevalidateCache
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.01)
+
+def test_serves_stale_and_refreshes_in_background():
+    """Stale values are returned at once while one background refresh runs"""
+    print("=== Stale-while-revalidate ===")
+    cache = StaleWhileRevalidateCache(ttl=0.05)
+    calls = []
+
+    def loader():
+        calls.append(time.time())
+        time.sleep(0.1)
+        return len(calls)
+
+    value, info = cache.get('counters', loader)
+    assert value == 1 and not info['stale']
+    assert cache.get('counters', loader)[0] == 1
+
+    time.sleep(0.06)
+    started = time.perf_counter()
+    value, info = cache.get('counters', loader)
+    assert time.perf_counter() - started < 0.05
+    assert value == 1 and info['stale']
+    cache.get('counters', loader)  # Already refreshing: no second loader call
+
+    wait_for(lambda: cache.get('counters', loader)[0] == 2)
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert len(calls) == 2
+    assert stats['misses'] == 1
+    assert stats['staleHits'] >= 2
+
+def test_keeps_last_good_value_on_error():
+    """A failing refresh keeps serving the old value and reports the error"""
+    print("=== Refresh failure ===")
+    cache = StaleWhileRevalidateCache(ttl=0.01)
+    cache.get('counters', lambda: {'printers': 3})
+    time.sleep(0.02)
+
+    def failing():
+        raise ConnectionError('Sheets unreachable')
+
+    cache.get('counters', failing)
+    wait_for(lambda: cache.get('counters', failing)[1]['error'] is not None)
+    value, info = cache.get('counters', failing)
+    print(f"Value: {value}, info: {info}")
+    assert value == {'printers': 3}
+    assert info['stale'] and info['error'] == 'Sheets unreachable'
+    assert cache.stats()['refreshErrors'] >= 1
+
+def test_first_load_error_raises():
+    """With nothing cached yet, loader errors reach the caller"""
+    print("=== First load failure ===")
+    cache = StaleWhileRevalidateCache()
+    try:
+        cache.get('counters', lambda: 1 / 0)
+        raise AssertionError('expected ZeroDivisionError')
+    except ZeroDivisionError:
+        pass
+    assert cache.stats()['entries'] == 0
+
+if __name__ == "__main__":
+    test_serves_stale_and_refreshes_in_background()
+    test_keeps_last_good_value_on_error()
+    test_first_load_error_raises()
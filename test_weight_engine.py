@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process weight estimation engine
+"""
+
+import os
+import tempfile
+import time
+import trimesh
+
+from weight_engine import estimate_stl_weight, estimate_weight_from_triangles
+
+def test_100mm_cube():
+    """100mm cube with the external API's fixed parameters"""
+    print("=== 100mm cube, 20% infill, PLA ===")
+    mesh = trimesh.creation.box(extents=(100, 100, 100))
+    with tempfile.NamedTemporaryFile(suffix='.stl', delete=False) as f:
+        f.write(trimesh.exchange.stl.export_stl(mesh))
+    try:
+        result = estimate_stl_weight(f.name, infill_percentage=20, material_density=1.24)
+    finally:
+        os.unlink(f.name)
+
+    for key, value in result.items():
+        print(f"{key}: {value:.2f}")
+
+    # Walls: 4 faces × 100² × 0.4mm, top/bottom: 2 faces × 100² × 0.4mm
+    assert abs(result['wall_volume_cm3'] - 16.0) < 1e-6
+    assert abs(result['top_bottom_volume_cm3'] - 8.0) < 1e-6
+    assert abs(result['total_volume_cm3'] - 1000.0) < 1e-6
+    assert abs(result['infill_volume_cm3'] - 976.0 * 0.2) < 1e-6
+    assert abs(result['weight_grams'] - (24.0 + 195.2) * 1.24) < 1e-6
+
+def test_thin_part_is_solid():
+    """A plate thinner than the shell prints solid regardless of infill"""
+    print("=== 0.5mm plate ===")
+    mesh = trimesh.creation.box(extents=(50, 50, 0.5))
+    result = estimate_weight_from_triangles(mesh.triangles, infill_percentage=10, material_density=1.0)
+    print(f"Solid: {result['solid_volume_cm3']:.4f} of {result['total_volume_cm3']:.4f} cm³")
+    assert abs(result['solid_volume_cm3'] - result['total_volume_cm3']) < 1e-9
+    assert result['infill_volume_cm3'] == 0
+
+def test_speed():
+    """Large meshes should estimate in tens of milliseconds"""
+    print("=== Speed ===")
+    mesh = trimesh.creation.icosphere(subdivisions=7, radius=40)
+    start = time.perf_counter()
+    result = estimate_weight_from_triangles(mesh.triangles, infill_percentage=20, material_density=1.24)
+    elapsed = time.perf_counter() - start
+    print(f"{len(mesh.faces)} triangles: {result['weight_grams']:.1f}g in {elapsed * 1000:.1f}ms")
+    assert result['shell_volume_cm3'] < result['total_volume_cm3']
+
+if __name__ == "__main__":
+    test_100mm_cube()
+    test_thin_part_is_solid()
+    test_speed()
+    print("Test completed.")
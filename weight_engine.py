@@ -0,0 +1,117 @@
+"""
+In-process print weight estimator.
+
+Takes the same parameters as the external STL Weight Estimator API
+(line_thickness, layer_height, shell_count, infill_percentage,
+material_density) and returns a response in the same shape, so quotes can
+be produced locally without a network hop or uploading customer files.
+
+Shell volume is integrated over the surface instead of a voxel grid: a
+surface patch with unit normal n sits inside the perimeter shell up to a
+depth of wall_thickness * |n_xy| and inside the top/bottom skin up to
+skin_thickness * |n_z|, so each face contributes area * max(of the two).
+This is exact for prisms and needs one vectorized pass over the triangles.
+"""
+
+import numpy as np
+
+from stl_analysis import CHUNK_TRIANGLES, UNIT_SCALE_MM, load_triangles
+
+
+def integrate_shell_volumes(triangles, wall_thickness_mm, skin_thickness_mm, scale=1.0):
+    """
+    Integrate enclosed, wall and top/bottom skin volumes over a triangle soup
+
+    Returns:
+        tuple: (enclosed volume, wall volume, top/bottom volume) in mm³
+    """
+    enclosed = 0.0
+    wall = 0.0
+    top_bottom = 0.0
+
+    for start in range(0, len(triangles), CHUNK_TRIANGLES):
+        chunk = np.asarray(triangles[start:start + CHUNK_TRIANGLES], dtype=np.float64) * scale
+        v0, v1, v2 = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+        cross = np.cross(v1 - v0, v2 - v0)
+        enclosed += np.einsum('ij,ij->', v0, cross) / 6.0
+
+        # |cross| is twice the face area, and cross / |cross| is the unit normal,
+        # so area * |n_z| is just |cross_z| / 2
+        horizontal = 0.5 * np.hypot(cross[:, 0], cross[:, 1])
+        vertical = 0.5 * np.abs(cross[:, 2])
+        wall_depth = horizontal * wall_thickness_mm
+        skin_depth = vertical * skin_thickness_mm
+        is_wall = wall_depth >= skin_depth
+        wall += wall_depth[is_wall].sum()
+        top_bottom += skin_depth[~is_wall].sum()
+
+    return abs(float(enclosed)), float(wall), float(top_bottom)
+
+
+def estimate_weight_from_triangles(triangles, infill_percentage, material_density,
+                                   line_thickness=0.2, layer_height=0.2, shell_count=2,
+                                   top_bottom_layers=None, scale=1.0):
+    """
+    Estimate printed weight from raw triangle vertices
+
+    Args:
+        triangles: (n, 3, 3) array of triangle vertices
+        infill_percentage: Infill percentage (0-100)
+        material_density: Material density in g/cm³
+        line_thickness: Extrusion line width in mm
+        layer_height: Layer height in mm
+        shell_count: Number of perimeters
+        top_bottom_layers: Solid top/bottom layers (defaults to shell_count)
+        scale: Factor converting file units to mm
+
+    Returns:
+        dict: Weight and volume breakdown matching the external API response
+    """
+    if top_bottom_layers is None:
+        top_bottom_layers = shell_count
+    wall_thickness_mm = line_thickness * shell_count
+    skin_thickness_mm = layer_height * top_bottom_layers
+
+    total_mm3, wall_mm3, top_bottom_mm3 = integrate_shell_volumes(
+        triangles, wall_thickness_mm, skin_thickness_mm, scale=scale
+    )
+
+    # Thin parts are solid: the shell can never exceed the part itself
+    shell_mm3 = wall_mm3 + top_bottom_mm3
+    if shell_mm3 > total_mm3 and shell_mm3 > 0:
+        ratio = total_mm3 / shell_mm3
+        wall_mm3 *= ratio
+        top_bottom_mm3 *= ratio
+        shell_mm3 = total_mm3
+
+    infill_fraction = min(max(infill_percentage / 100.0, 0.0), 1.0)
+    inner_mm3 = total_mm3 - shell_mm3
+    infill_mm3 = inner_mm3 * infill_fraction
+    solid_mm3 = shell_mm3 + infill_mm3
+
+    return {
+        'weight_grams': solid_mm3 / 1000.0 * material_density,
+        'total_volume_cm3': total_mm3 / 1000.0,
+        'solid_volume_cm3': solid_mm3 / 1000.0,
+        'infill_volume_cm3': infill_mm3 / 1000.0,
+        'shell_volume_cm3': shell_mm3 / 1000.0,
+        'wall_volume_cm3': wall_mm3 / 1000.0,
+        'top_bottom_volume_cm3': top_bottom_mm3 / 1000.0,
+    }
+
+
+def estimate_stl_weight(stl_file_path, infill_percentage, material_density,
+                        line_thickness=0.2, layer_height=0.2, shell_count=2,
+                        top_bottom_layers=None, units='mm'):
+    """Estimate printed weight of an STL file in-process (see estimate_weight_from_triangles)"""
+    triangles, _ = load_triangles(stl_file_path)
+    return estimate_weight_from_triangles(
+        triangles,
+        infill_percentage=infill_percentage,
+        material_density=material_density,
+        line_thickness=line_thickness,
+        layer_height=layer_height,
+        shell_count=shell_count,
+        top_bottom_layers=top_bottom_layers,
+        scale=UNIT_SCALE_MM.get(units, 1.0),
+    )